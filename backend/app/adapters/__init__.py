@@ -1,4 +1,5 @@
 from .base_db import BaseDatabase
+from . import memory_db
 from .memory_db import InMemoryDatabase
 from app.config import settings
 
@@ -9,10 +10,30 @@ def get_database() -> BaseDatabase:
         from .supabase_db import SupabaseDatabase
 
         return SupabaseDatabase()
+    elif settings.DB_BACKEND == "postgres":
+        from .postgres_db import PostgresDatabase
+
+        return PostgresDatabase(
+            settings.DATABASE_URL, settings.PG_POOL_MIN_SIZE, settings.PG_POOL_MAX_SIZE
+        )
+    elif settings.DB_BACKEND == "log":
+        from .log_db import LogDatabase
+
+        return LogDatabase(
+            settings.LOG_DIR, settings.LOG_SEGMENT_BYTES, settings.LOG_FSYNC
+        )
+    elif settings.DB_BACKEND == "sqlite":
+        from .sqlite_db import SQLiteDatabase
+
+        return SQLiteDatabase(settings.SQLITE_PATH, settings.SQLITE_READERS)
     else:
         return InMemoryDatabase()
 
 
 db = get_database()
 
-__all__ = ["BaseDatabase", "InMemoryDatabase", "db", "get_database"]
+# Policies live in the configured database when it can store them (so the
+# SQLite backend shares them across workers), else in this process's memory
+policy_db = db if hasattr(db, "create_policy") else memory_db.db
+
+__all__ = ["BaseDatabase", "InMemoryDatabase", "db", "get_database", "policy_db"]
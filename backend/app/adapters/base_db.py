@@ -14,11 +14,28 @@ class BaseDatabase(ABC):
         """Append a new event (immutable, no updates)"""
         pass
 
+    @abstractmethod
+    async def create_events(self, events: list[Event]) -> list[Event]:
+        """Append several events in one write (bulk insert)"""
+        pass
+
     @abstractmethod
     async def get_events(
-        self, user_id: Optional[str] = None, limit: int = 100, offset: int = 0
+        self,
+        user_id: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0,
+        before: Optional[str] = None,
+        after: Optional[str] = None,
     ) -> list[Event]:
-        """Get events, optionally filtered by user_id"""
+        """
+        Get events newest first, optionally filtered by user_id.
+
+        Pages either by offset or, when a before/after event-id cursor is
+        given, by keyset (events strictly older than `before` / newer than
+        `after`; offset is then ignored). Raises ValueError for an unknown
+        cursor.
+        """
         pass
 
     @abstractmethod
@@ -69,3 +86,14 @@ class BaseDatabase(ABC):
     async def delete_api_key(self, key_id: str, user_id: str) -> bool:
         """Delete an API key"""
         pass
+
+    async def get_api_key_version(self) -> int:
+        """
+        Counter bumped by every API key deletion, shared by all workers.
+        Adapters whose keys live in one process can keep the default 0.
+        """
+        return 0
+
+    async def close(self) -> None:
+        """Flush and release any resources held by the database"""
+        pass
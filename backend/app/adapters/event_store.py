@@ -0,0 +1,330 @@
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timedelta, timezone
+from typing import Hashable, Optional
+
+from app.domain.event import Event
+from app.domain.ids import decode_ulid, encode_ulid
+from app.models.schemas import DecisionTrace, TriggeredPolicyInfo
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_NO_ID = bytes(16)
+# How far (in microseconds) an event's timestamp may sit from the millisecond
+# in its ULID and still be found by time; further off goes in _stray_rows
+_ID_TIME_SLACK = 2000
+
+# _trace_codes values; anything >= _TRACE_POLICY is _TRACE_POLICY + policy code
+_TRACE_NONE = 0
+_TRACE_NO_POLICY = 1
+_TRACE_POLICY = 2
+
+
+def to_micros(timestamp: datetime) -> int:
+    """Microseconds since the epoch, treating naive timestamps as UTC."""
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return (timestamp - _EPOCH) // _MICROSECOND
+
+
+def from_micros(micros: int) -> datetime:
+    """Naive UTC datetime for microseconds since the epoch."""
+    return _EPOCH + micros * _MICROSECOND
+
+
+class StringTable:
+    """Dictionary encoding: each distinct string is stored once, rows hold codes."""
+
+    __slots__ = ("values", "codes")
+
+    def __init__(self):
+        self.values: list[Optional[str]] = [None]
+        self.codes: dict[Optional[str], int] = {None: 0}
+
+    def encode(self, value: Optional[str]) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def lookup(self, value: Optional[str]) -> Optional[int]:
+        return self.codes.get(value)
+
+
+class StringColumn:
+    """Strings stored back to back as UTF-8, for values that rarely repeat."""
+
+    __slots__ = ("_data", "_ends", "_present")
+
+    def __init__(self):
+        self._data = bytearray()
+        self._ends = array("Q")
+        self._present = bytearray()
+
+    def append(self, value: Optional[str]) -> None:
+        if value is not None:
+            self._data += value.encode()
+        self._ends.append(len(self._data))
+        self._present.append(value is not None)
+
+    def __getitem__(self, row: int) -> Optional[str]:
+        if not self._present[row]:
+            return None
+        start = self._ends[row - 1] if row else 0
+        return self._data[start : self._ends[row]].decode()
+
+
+class EventIndex:
+    """
+    Id, time and user index over append-only rows.
+
+    Rows are numbered in arrival order and never move. Each row's id (ULIDs
+    packed into 16 bytes, other id formats in a side table), timestamp
+    (int64 microseconds since the epoch, naive UTC) and dictionary-encoded
+    user_id are kept in columns. Time order lives in separate row-number
+    arrays (global and per user) sorted on (timestamp, id), so pages are
+    slices of those arrays.
+
+    There is no id -> row map: a ULID carries its millisecond, which is the
+    event's timestamp for every id the engine mints, so a lookup bisects
+    the time order to that millisecond and compares the few ids there.
+    Only ids that aren't ULIDs, or whose time is off from the timestamp,
+    are kept in a (normally empty) dict.
+
+    Subclasses keep the rest of each row and build Events in _event().
+    """
+
+    def __init__(self):
+        self._ids = bytearray()
+        self._odd_ids: dict[int, str] = {}
+        self._timestamps = array("q")
+        self._user_ids = array("I")
+        self._user_table = StringTable()
+
+        # ULID value (or the raw id when it isn't a ULID) -> row, only for
+        # ids that can't be found from their time
+        self._stray_rows: dict[Hashable, int] = {}
+        self._order = array("I")
+        self._rows_by_user: dict[int, array] = {}
+
+    def __len__(self) -> int:
+        return len(self._timestamps)
+
+    def __contains__(self, event_id: str) -> bool:
+        return self._find(event_id) is not None
+
+    @staticmethod
+    def _id_key(event_id: str) -> Hashable:
+        value = decode_ulid(event_id)
+        return event_id if value is None else value
+
+    def _id(self, row: int) -> str:
+        odd = self._odd_ids.get(row)
+        if odd is not None:
+            return odd
+        return encode_ulid(int.from_bytes(self._ids[16 * row : 16 * row + 16], "big"))
+
+    def _sort_key(self, row: int) -> tuple[int, str]:
+        return self._timestamps[row], self._id(row)
+
+    def _timestamp(self, row: int) -> datetime:
+        return from_micros(self._timestamps[row])
+
+    def _user_id(self, row: int) -> str:
+        return self._user_table.values[self._user_ids[row]]
+
+    def _add_row(self, event_id: str, timestamp: int, user_id: str) -> int:
+        """Index a new row (timestamp in epoch microseconds), return its number."""
+        row = len(self._timestamps)
+
+        value = decode_ulid(event_id)
+        if value is None:
+            self._ids += _NO_ID
+            self._odd_ids[row] = event_id
+            self._stray_rows.setdefault(event_id, row)
+        else:
+            self._ids += value.to_bytes(16, "big")
+            if abs(timestamp - (value >> 80) * 1000) > _ID_TIME_SLACK:
+                self._stray_rows.setdefault(value, row)
+
+        user_code = self._user_table.encode(user_id)
+        self._timestamps.append(timestamp)
+        self._user_ids.append(user_code)
+
+        self._insert_ordered(self._order, row)
+        user_rows = self._rows_by_user.get(user_code)
+        if user_rows is None:
+            user_rows = self._rows_by_user[user_code] = array("I")
+        self._insert_ordered(user_rows, row)
+        return row
+
+    def _insert_ordered(self, rows: array, row: int) -> None:
+        # Events almost always arrive in order; only stragglers pay for a bisect
+        if rows:
+            last = rows[-1]
+            timestamp, last_timestamp = self._timestamps[row], self._timestamps[last]
+            if timestamp < last_timestamp or (
+                timestamp == last_timestamp and self._id(row) < self._id(last)
+            ):
+                insort(rows, row, key=self._sort_key)
+                return
+        rows.append(row)
+
+    def _event(self, row: int) -> Event:
+        raise NotImplementedError
+
+    def _find(self, event_id: str) -> Optional[int]:
+        """The row of an id, None if it isn't stored."""
+        key = self._id_key(event_id)
+        row = self._stray_rows.get(key)
+        if row is not None or isinstance(key, str):
+            return row
+        # Rows whose timestamp is within the slack of the id's millisecond
+        micros = (key >> 80) * 1000
+        wanted = key.to_bytes(16, "big")
+        timestamps, ids, order = self._timestamps, self._ids, self._order
+        at = bisect_left(order, micros - _ID_TIME_SLACK, key=timestamps.__getitem__)
+        while at < len(order):
+            row = order[at]
+            if timestamps[row] > micros + _ID_TIME_SLACK:
+                break
+            if ids[16 * row : 16 * row + 16] == wanted:
+                return row
+            at += 1
+        return None
+
+    def get(self, event_id: str) -> Optional[Event]:
+        row = self._find(event_id)
+        return None if row is None else self._event(row)
+
+    def _cursor_key(self, event_id: str) -> tuple[int, str]:
+        row = self._find(event_id)
+        if row is None:
+            raise ValueError(f"Unknown event cursor: {event_id}")
+        return self._sort_key(row)
+
+    def page(
+        self,
+        user_id: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0,
+        before: Optional[str] = None,
+        after: Optional[str] = None,
+    ) -> list[Event]:
+        """A newest-first page, by offset or by before/after cursor."""
+        rows = self._order
+        if user_id:
+            user_code = self._user_table.lookup(user_id)
+            rows = self._rows_by_user.get(user_code, array("I"))
+
+        # Slice bounds over the oldest-first rows; every page is O(limit)
+        if before or after:
+            start, end = 0, len(rows)
+            if before:
+                end = bisect_left(rows, self._cursor_key(before), key=self._sort_key)
+            if after:
+                start = bisect_right(rows, self._cursor_key(after), key=self._sort_key)
+            if before:
+                page = rows[max(start, end - limit) : end]
+            else:
+                # `after` alone: the events right after the cursor
+                page = rows[start : start + limit]
+        else:
+            end = max(0, len(rows) - offset)
+            page = rows[max(0, end - limit) : end]
+        return [self._event(row) for row in reversed(page)]
+
+
+class EventStore(EventIndex):
+    """
+    Column-oriented, append-only event storage.
+
+    Instead of one Event object (plus its __dict__, datetime and pydantic
+    trace) per event, every field lives in a typed column: on top of the
+    index columns, action_type, decision, reason and triggered policy (a
+    handful of distinct values each) are uint32 codes into per-column
+    string tables, resource_id and AI recommendation (mostly unique) are
+    UTF-8 in a StringColumn, ai_available is one byte, and metadata and
+    unusual traces go in sparse dicts. Event objects are only materialized for the
+    rows a read returns.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._action_types = array("I")
+        self._resource_ids = StringColumn()
+        self._decisions = array("I")
+        self._reasons = array("I")
+        self._ai_recommendations = StringColumn()
+        self._trace_codes = array("I")
+        self._ai_available = bytearray()
+        self._metadata: dict[int, dict] = {}
+        self._odd_traces: dict[int, DecisionTrace] = {}
+
+        self._strings = {
+            name: StringTable()
+            for name in (
+                "action_type",
+                "decision",
+                "reason",
+                "policy",
+            )
+        }
+
+    def _encode_trace(self, row: int, event: Event) -> int:
+        trace = event.trace
+        if trace is None:
+            return _TRACE_NONE
+        policy = trace.triggered_policy
+        if trace.ai_recommendation_summary == event.ai_recommendation and (
+            policy is None or policy.reason == event.reason
+        ):
+            # The usual engine-built trace: fully derivable from the row
+            if policy is None:
+                return _TRACE_NO_POLICY
+            return _TRACE_POLICY + self._strings["policy"].encode(policy.id)
+        self._odd_traces[row] = trace
+        return _TRACE_NO_POLICY
+
+    def append(self, event: Event) -> None:
+        row = self._add_row(event.id, to_micros(event.timestamp), event.user_id)
+        strings = self._strings
+        self._action_types.append(strings["action_type"].encode(event.action_type))
+        self._resource_ids.append(event.resource_id)
+        self._decisions.append(strings["decision"].encode(event.decision))
+        self._reasons.append(strings["reason"].encode(event.reason))
+        self._ai_recommendations.append(event.ai_recommendation)
+        self._trace_codes.append(self._encode_trace(row, event))
+        self._ai_available.append(event.ai_available)
+        if event.metadata is not None:
+            self._metadata[row] = event.metadata
+
+    def _event(self, row: int) -> Event:
+        strings = self._strings
+        reason = strings["reason"].values[self._reasons[row]]
+        ai_recommendation = self._ai_recommendations[row]
+
+        trace = self._odd_traces.get(row)
+        trace_code = self._trace_codes[row]
+        if trace is None and trace_code != _TRACE_NONE:
+            trace = DecisionTrace(ai_recommendation_summary=ai_recommendation)
+            if trace_code >= _TRACE_POLICY:
+                policy_id = strings["policy"].values[trace_code - _TRACE_POLICY]
+                trace.triggered_policy = TriggeredPolicyInfo(
+                    id=policy_id, reason=reason
+                )
+
+        return Event(
+            id=self._id(row),
+            action_type=strings["action_type"].values[self._action_types[row]],
+            resource_id=self._resource_ids[row],
+            user_id=self._user_id(row),
+            decision=strings["decision"].values[self._decisions[row]],
+            reason=reason,
+            ai_recommendation=ai_recommendation,
+            ai_available=bool(self._ai_available[row]),
+            metadata=self._metadata.get(row),
+            timestamp=self._timestamp(row),
+            trace=trace,
+        )
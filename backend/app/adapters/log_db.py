@@ -0,0 +1,528 @@
+from array import array
+from datetime import datetime
+from typing import Optional
+import asyncio
+import json
+import logging
+import mmap
+import os
+import struct
+import zlib
+
+from app.adapters.event_store import EventIndex, to_micros
+from app.adapters.memory_db import InMemoryDatabase
+from app.domain.event import Event
+from app.models.schemas import DecisionTrace
+
+logger = logging.getLogger(__name__)
+
+# Segment record: payload length, crc32(payload), then the JSON payload
+_RECORD = struct.Struct("<II")
+# Index entry: timestamp (us), offset, length, flags, id length, user_id length,
+# followed by the id and user_id bytes
+_ENTRY = struct.Struct("<qQIBHH")
+_IDX_MAGIC = b"ULIX1\n"
+# Index trailer: entry count, crc32 of everything between magic and trailer
+_IDX_TRAILER = struct.Struct("<QI")
+
+_APPROVE = 1
+_REJECT = 2
+_AI_AVAILABLE = 4
+
+
+def _flags(decision: str, ai_available: bool) -> int:
+    flags = _AI_AVAILABLE if ai_available else 0
+    if decision == "approve":
+        flags |= _APPROVE
+    elif decision == "reject":
+        flags |= _REJECT
+    return flags
+
+
+def _decision(flags: int) -> str:
+    if flags & _APPROVE:
+        return "approve"
+    if flags & _REJECT:
+        return "reject"
+    return ""
+
+
+def _encode_entry(
+    timestamp: int, offset: int, length: int, flags: int, event_id: str, user_id: str
+) -> bytes:
+    id_bytes, user_bytes = event_id.encode(), user_id.encode()
+    header = _ENTRY.pack(
+        timestamp, offset, length, flags, len(id_bytes), len(user_bytes)
+    )
+    return header + id_bytes + user_bytes
+
+
+def _decode_event(payload: bytes) -> Event:
+    data = json.loads(payload)
+    trace = data.get("trace")
+    return Event(
+        id=data["id"],
+        action_type=data["action_type"],
+        resource_id=data["resource_id"],
+        user_id=data["user_id"],
+        decision=data["decision"],
+        reason=data["reason"],
+        ai_recommendation=data.get("ai_recommendation"),
+        ai_available=data["ai_available"],
+        metadata=data.get("metadata"),
+        timestamp=datetime.fromisoformat(data["timestamp"]),
+        trace=DecisionTrace.model_validate(trace) if trace else None,
+    )
+
+
+class _PendingWrite:
+    __slots__ = ("records", "entries", "events", "future")
+
+    def __init__(self, records, entries, events, future):
+        self.records = records
+        self.entries = entries
+        self.events = events
+        self.future = future
+
+
+class _SegmentIndex(EventIndex):
+    """Event index whose rows point at (segment, offset, length) in the log."""
+
+    def __init__(self, read_record):
+        super().__init__()
+        self._segments = array("I")
+        self._offsets = array("Q")
+        self._lengths = array("I")
+        self._read_record = read_record
+
+    def add(
+        self,
+        event_id: str,
+        timestamp: int,
+        user_id: str,
+        segment: int,
+        offset: int,
+        length: int,
+    ) -> None:
+        self._add_row(event_id, timestamp, user_id)
+        self._segments.append(segment)
+        self._offsets.append(offset)
+        self._lengths.append(length)
+
+    def _event(self, row: int) -> Event:
+        payload = self._read_record(
+            self._segments[row], self._offsets[row], self._lengths[row]
+        )
+        return _decode_event(payload)
+
+
+class LogDatabase(InMemoryDatabase):
+    """
+    Durable local database: events go to a segmented append-only log on disk.
+
+    - Writes use group commit: concurrent create_event(s) calls that arrive
+      while an fsync is in progress are written and fsynced together, so
+      one fsync covers many events. A call returns once its events are
+      durable.
+    - Segments (events-NNNNNNNN.log) roll over at segment_bytes. A sealed
+      segment gets an .idx sidecar with each record's offset, timestamp, id
+      and user_id, so recovery loads indexes instead of parsing events; only
+      the active segment is scanned, and a torn tail from a crash is
+      truncated.
+    - Reads go through mmap: the in-memory index maps ids and (user, time)
+      order to record positions and only the returned events are decoded.
+    - Users and API keys are kept in memory and journaled to meta.log.
+      Policies stay in memory only, as with InMemoryDatabase.
+    """
+
+    def __init__(
+        self, directory: str, segment_bytes: int = 64 * 2**20, fsync: bool = True
+    ):
+        super().__init__()
+        self._dir = directory
+        self._segment_bytes = segment_bytes
+        self._fsync = fsync
+        self._events = _SegmentIndex(self._read_record)
+
+        self._active_segment = 0
+        self._active_file = None
+        self._active_size = 0
+        self._active_entries: list[bytes] = []
+        self._maps: dict[int, mmap.mmap] = {}
+
+        self._pending: list[_PendingWrite] = []
+        # id -> future of the pending write carrying that event
+        self._pending_ids: dict[str, asyncio.Future] = {}
+        self._flusher: Optional[asyncio.Task] = None
+        self.fsyncs = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._meta_path = os.path.join(directory, "meta.log")
+        self._recover_meta()
+        self._recover_events()
+
+    # --- Files ---
+
+    def _segment_path(self, segment: int, suffix: str = "log") -> str:
+        return os.path.join(self._dir, f"events-{segment:08d}.{suffix}")
+
+    def _sync(self, fd: int) -> None:
+        if self._fsync:
+            os.fsync(fd)
+
+    def _sync_dir(self) -> None:
+        # Make file creations and renames durable too
+        if self._fsync and hasattr(os, "O_DIRECTORY"):
+            fd = os.open(self._dir, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def _open_segment(self, segment: int) -> None:
+        self._active_segment = segment
+        self._active_file = open(self._segment_path(segment), "ab", buffering=0)
+        self._active_size = self._active_file.tell()
+        self._sync_dir()
+
+    def _read_record(self, segment: int, offset: int, length: int) -> bytes:
+        start = offset + _RECORD.size
+        end = start + length
+        mapped = self._maps.get(segment)
+        if mapped is None or len(mapped) < end:
+            # New segment, or the active one has grown since it was mapped
+            if mapped is not None:
+                mapped.close()
+            with open(self._segment_path(segment), "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[segment] = mapped
+        return mapped[start:end]
+
+    # --- Recovery ---
+
+    def _recover_events(self) -> None:
+        segments = sorted(
+            int(name[7:15])
+            for name in os.listdir(self._dir)
+            if name.startswith("events-") and name.endswith(".log")
+        )
+        for segment in segments[:-1]:
+            entries = self._load_index(segment)
+            if entries is None:
+                entries, _ = self._scan_segment(segment)
+                self._write_index(segment, entries)
+            self._index_entries(segment, entries)
+
+        if segments:
+            active = segments[-1]
+            self._active_entries, valid_size = self._scan_segment(active)
+            path = self._segment_path(active)
+            if os.path.getsize(path) > valid_size:
+                logger.warning(
+                    f"Truncating torn tail of {path} at byte {valid_size}"
+                )
+                with open(path, "r+b") as f:
+                    f.truncate(valid_size)
+                    self._sync(f.fileno())
+            self._index_entries(active, self._active_entries)
+        else:
+            active = 1
+        self._open_segment(active)
+        logger.info(f"Recovered {len(self._events)} events from {self._dir}")
+
+    def _load_index(self, segment: int) -> Optional[list[bytes]]:
+        try:
+            with open(self._segment_path(segment, "idx"), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        body = data[len(_IDX_MAGIC) : -_IDX_TRAILER.size]
+        if not data.startswith(_IDX_MAGIC) or len(data) < len(_IDX_MAGIC) + 12:
+            return None
+        count, crc = _IDX_TRAILER.unpack(data[-_IDX_TRAILER.size :])
+        if zlib.crc32(body) != crc:
+            logger.warning(f"Ignoring corrupt index for segment {segment}")
+            return None
+
+        entries = []
+        position = 0
+        while position < len(body):
+            *_, id_length, user_length = _ENTRY.unpack_from(body, position)
+            end = position + _ENTRY.size + id_length + user_length
+            entries.append(body[position:end])
+            position = end
+        return entries if len(entries) == count else None
+
+    def _scan_segment(self, segment: int) -> tuple[list[bytes], int]:
+        """Index entries for every intact record and the size they span."""
+        entries = []
+        offset = 0
+        with open(self._segment_path(segment), "rb") as f:
+            data = f.read()
+        while offset + _RECORD.size <= len(data):
+            length, crc = _RECORD.unpack_from(data, offset)
+            start = offset + _RECORD.size
+            payload = data[start : start + length]
+            if len(payload) < length or zlib.crc32(payload) != crc:
+                break
+            event = _decode_event(payload)
+            entries.append(
+                _encode_entry(
+                    to_micros(event.timestamp),
+                    offset,
+                    length,
+                    _flags(event.decision, event.ai_available),
+                    event.id,
+                    event.user_id,
+                )
+            )
+            offset = start + length
+        return entries, offset
+
+    def _index_entries(self, segment: int, entries: list[bytes]) -> None:
+        for entry in entries:
+            timestamp, offset, length, flags, id_length, _ = _ENTRY.unpack_from(entry)
+            id_end = _ENTRY.size + id_length
+            self._events.add(
+                entry[_ENTRY.size : id_end].decode(),
+                timestamp,
+                entry[id_end:].decode(),
+                segment,
+                offset,
+                length,
+            )
+            self._count_event(_decision(flags), bool(flags & _AI_AVAILABLE))
+
+    def _write_index(self, segment: int, entries: list[bytes]) -> None:
+        body = b"".join(entries)
+        path = self._segment_path(segment, "idx")
+        with open(path + ".tmp", "wb") as f:
+            f.write(_IDX_MAGIC + body)
+            f.write(_IDX_TRAILER.pack(len(entries), zlib.crc32(body)))
+            f.flush()
+            self._sync(f.fileno())
+        os.replace(path + ".tmp", path)
+        self._sync_dir()
+
+    def _recover_meta(self) -> None:
+        try:
+            with open(self._meta_path, "rb") as f:
+                lines = f.read().split(b"\n")
+        except FileNotFoundError:
+            return
+        valid = 0
+        for line in lines[:-1]:  # anything after the last newline is torn
+            self._apply_meta(json.loads(line))
+            valid += len(line) + 1
+        if valid < os.path.getsize(self._meta_path):
+            with open(self._meta_path, "r+b") as f:
+                f.truncate(valid)
+
+    def _apply_meta(self, record: dict) -> None:
+        op = record["op"]
+        if op == "delete_api_key":
+            self._remove_api_key(record["id"], record["user_id"])
+            return
+        row = dict(record["row"])
+        row["created_at"] = datetime.fromisoformat(row["created_at"])
+        if op == "create_user":
+            self._put_user(row)
+        elif op == "create_api_key":
+            self._put_api_key(row)
+
+    async def _journal(self, op: str, **fields) -> None:
+        line = json.dumps({"op": op, **fields}, default=str).encode() + b"\n"
+
+        def append():
+            with open(self._meta_path, "ab") as f:
+                f.write(line)
+                f.flush()
+                self._sync(f.fileno())
+
+        await asyncio.to_thread(append)
+
+    # --- Group commit ---
+
+    def _write_batch(
+        self, batch: list[_PendingWrite]
+    ) -> tuple[list[list[tuple]], Optional[Exception]]:
+        """
+        Append every record in batch, fsync once per touched segment.
+        Returns the position of each write's records and None, or on failure
+        the positions of the records a segment roll made durable before it
+        (possibly none) and the error.
+        """
+        start_size, start_entries = self._active_size, len(self._active_entries)
+        sealed: list[list[tuple]] = []
+        try:
+            return self._append_batch(batch, sealed), None
+        except Exception as e:
+            if sealed:
+                # Rolled: the active segment was started by this batch
+                start_size, start_entries = 0, 0
+            # Drop the unsealed part so the segment stays a clean prefix
+            if not self._active_file.closed:
+                self._active_file.truncate(start_size)
+                self._active_size = start_size
+                del self._active_entries[start_entries:]
+            return sealed, e
+
+    def _append_batch(
+        self, batch: list[_PendingWrite], sealed: list[list[tuple]]
+    ) -> list[list[tuple]]:
+        positions = []
+        chunk: list[bytes] = []
+        for write in batch:
+            placed = []
+            positions.append(placed)
+            for record, entry in zip(write.records, write.entries):
+                if self._active_size and (
+                    self._active_size + len(record) > self._segment_bytes
+                ):
+                    self._roll_segment(chunk)
+                    chunk = []
+                    # Everything placed so far is durable now
+                    sealed[:] = [list(done) for done in positions]
+                offset = self._active_size
+                length = len(record) - _RECORD.size
+                self._active_entries.append(entry(offset, length))
+                placed.append((self._active_segment, offset, length))
+                chunk.append(record)
+                self._active_size += len(record)
+        self._active_file.write(b"".join(chunk))
+        self._sync(self._active_file.fileno())
+        self.fsyncs += 1
+        return positions
+
+    def _roll_segment(self, chunk: list[bytes]) -> None:
+        """Seal the active segment (flushing chunk into it) and start the next."""
+        self._active_file.write(b"".join(chunk))
+        self._sync(self._active_file.fileno())
+        self._active_file.close()
+        try:
+            self._write_index(self._active_segment, self._active_entries)
+        except OSError as e:
+            # Only speeds up recovery, which scans a segment without one
+            logger.warning(f"Writing index of segment {self._active_segment}: {e!r}")
+        self._active_entries = []
+        self._open_segment(self._active_segment + 1)
+
+    async def _flush_pending(self) -> None:
+        while self._pending:
+            batch, self._pending = self._pending, []
+            try:
+                positions, error = await asyncio.to_thread(self._write_batch, batch)
+            except Exception as e:
+                positions, error = [], e
+            if error is not None:
+                logger.error(f"Event log write failed: {error!r}")
+            # After a failure, positions only cover the records already
+            # durable; those are indexed, their writes still fail (and a
+            # retry skips them by id)
+            positions += [[] for _ in range(len(batch) - len(positions))]
+            for write, placed in zip(batch, positions):
+                for event in write.events:
+                    # Stored or not, a later write may carry it again
+                    self._pending_ids.pop(event.id, None)
+                for event, (segment, offset, length) in zip(write.events, placed):
+                    self._events.add(
+                        event.id,
+                        to_micros(event.timestamp),
+                        event.user_id,
+                        segment,
+                        offset,
+                        length,
+                    )
+                    self._count_event(event.decision, event.ai_available)
+                if write.future.done():
+                    continue
+                if len(placed) == len(write.events):
+                    write.future.set_result(None)
+                else:
+                    write.future.set_exception(error)
+
+    async def _append(self, events: list[Event]) -> None:
+        # Idempotent by id, so a retried write doesn't log an event twice:
+        # ids already stored or on their way there are only waited for
+        fresh: dict[str, Event] = {}
+        waiting: set[asyncio.Future] = set()
+        for event in events:
+            if event.id in self._events or event.id in fresh:
+                continue
+            pending = self._pending_ids.get(event.id)
+            if pending is not None:
+                waiting.add(pending)
+            else:
+                fresh[event.id] = event
+
+        if fresh:
+            events = list(fresh.values())
+            records, entries = [], []
+            for event in events:
+                payload = json.dumps(
+                    event.to_dict(), separators=(",", ":"), default=str
+                ).encode()
+                records.append(
+                    _RECORD.pack(len(payload), zlib.crc32(payload)) + payload
+                )
+                entries.append(self._entry_builder(event))
+
+            future = asyncio.get_running_loop().create_future()
+            self._pending.append(_PendingWrite(records, entries, events, future))
+            for event_id in fresh:
+                self._pending_ids[event_id] = future
+            if self._flusher is None or self._flusher.done():
+                self._flusher = asyncio.create_task(self._flush_pending())
+            waiting.add(future)
+        # The writes go ahead even if this caller is cancelled
+        for future in waiting:
+            await asyncio.shield(future)
+
+    @staticmethod
+    def _entry_builder(event: Event):
+        timestamp = to_micros(event.timestamp)
+        flags = _flags(event.decision, event.ai_available)
+        return lambda offset, length: _encode_entry(
+            timestamp, offset, length, flags, event.id, event.user_id
+        )
+
+    # --- BaseDatabase ---
+
+    async def create_event(self, event: Event) -> Event:
+        await self._append([event])
+        return event
+
+    async def create_events(self, events: list[Event]) -> list[Event]:
+        await self._append(events)
+        return events
+
+    async def create_user(
+        self, email: str, password_hash: str, name: Optional[str] = None
+    ) -> dict:
+        user = await super().create_user(email, password_hash, name)
+        await self._journal("create_user", row=user)
+        return user
+
+    async def create_api_key(
+        self, user_id: str, name: str, key_hash: str, key_prefix: str
+    ) -> dict:
+        api_key = await super().create_api_key(user_id, name, key_hash, key_prefix)
+        await self._journal("create_api_key", row=api_key)
+        return api_key
+
+    async def delete_api_key(self, key_id: str, user_id: str) -> bool:
+        deleted = await super().delete_api_key(key_id, user_id)
+        if deleted:
+            await self._journal("delete_api_key", id=key_id, user_id=user_id)
+        return deleted
+
+    async def close(self) -> None:
+        if self._flusher is not None:
+            await self._flusher
+        if self._active_file is not None:
+            self._sync(self._active_file.fileno())
+            self._active_file.close()
+            self._active_file = None
+        for mapped in self._maps.values():
+            mapped.close()
+        self._maps.clear()
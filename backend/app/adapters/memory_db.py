@@ -3,6 +3,7 @@ from datetime import datetime
 import uuid
 
 from app.adapters.base_db import BaseDatabase
+from app.adapters.event_store import EventStore
 from app.domain.event import Event
 from app.models.schemas import Policy, PolicyCreate, PolicyUpdate
 
@@ -14,42 +15,69 @@ class InMemoryDatabase(BaseDatabase):
     """
 
     def __init__(self):
-        self._events: list[Event] = []
+        # Compact columnar storage, indexed by id and (user, time)
+        self._events = EventStore()
         self._users: dict[str, dict] = {}
         self._api_keys: dict[str, dict] = {}
+        # Secondary indexes, kept in step with every mutation above
+        self._user_ids_by_email: dict[str, str] = {}
+        self._key_ids_by_hash: dict[str, str] = {}
+        self._keys_by_user: dict[str, dict[str, dict]] = {}
+        # Running totals for get_metrics, bumped as events are stored
+        self._total_actions = 0
+        self._approved_count = 0
+        self._rejected_count = 0
+        self._ai_unavailable_count = 0
         self._policies: dict[str, Policy] = {}
+        # Bumped on every policy mutation so cached snapshots can detect staleness
+        self.policy_generation = 0
+
+    def _count_event(self, decision: str, ai_available: bool) -> None:
+        self._total_actions += 1
+        if decision == "approve":
+            self._approved_count += 1
+        elif decision == "reject":
+            self._rejected_count += 1
+        if not ai_available:
+            self._ai_unavailable_count += 1
+
+    def _store_event(self, event: Event) -> None:
+        # Idempotent by id, so a retried write doesn't store an event twice
+        if event.id in self._events:
+            return
+        self._events.append(event)
+        self._count_event(event.decision, event.ai_available)
 
     async def create_event(self, event: Event) -> Event:
-        self._events.append(event)
+        self._store_event(event)
         return event
 
+    async def create_events(self, events: list[Event]) -> list[Event]:
+        for event in events:
+            self._store_event(event)
+        return events
+
     async def get_events(
-        self, user_id: Optional[str] = None, limit: int = 100, offset: int = 0
+        self,
+        user_id: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0,
+        before: Optional[str] = None,
+        after: Optional[str] = None,
     ) -> list[Event]:
-        events = self._events
-        if user_id:
-            events = [e for e in events if e.user_id == user_id]
-        events = sorted(events, key=lambda e: e.timestamp, reverse=True)
-        return events[offset : offset + limit]
+        return self._events.page(user_id, limit, offset, before, after)
 
     async def get_event_by_id(self, event_id: str) -> Optional[Event]:
-        for event in self._events:
-            if event.id == event_id:
-                return event
-        return None
+        return self._events.get(event_id)
 
     async def get_metrics(self) -> dict:
-        total = len(self._events)
-        approved = sum(1 for e in self._events if e.decision == "approve")
-        rejected = sum(1 for e in self._events if e.decision == "reject")
-        ai_unavailable = sum(1 for e in self._events if not e.ai_available)
-
+        total = self._total_actions
         return {
             "total_actions": total,
-            "approved_count": approved,
-            "rejected_count": rejected,
-            "reject_rate": rejected / total if total > 0 else 0.0,
-            "ai_unavailable_count": ai_unavailable,
+            "approved_count": self._approved_count,
+            "rejected_count": self._rejected_count,
+            "reject_rate": self._rejected_count / total if total > 0 else 0.0,
+            "ai_unavailable_count": self._ai_unavailable_count,
         }
 
     async def create_user(
@@ -63,14 +91,16 @@ class InMemoryDatabase(BaseDatabase):
             "name": name,
             "created_at": datetime.utcnow(),
         }
-        self._users[user_id] = user
+        self._put_user(user)
         return user
 
+    def _put_user(self, user: dict) -> None:
+        self._users[user["id"]] = user
+        self._user_ids_by_email.setdefault(user["email"], user["id"])
+
     async def get_user_by_email(self, email: str) -> Optional[dict]:
-        for user in self._users.values():
-            if user["email"] == email:
-                return user
-        return None
+        user_id = self._user_ids_by_email.get(email)
+        return self._users.get(user_id) if user_id else None
 
     async def get_user_by_id(self, user_id: str) -> Optional[dict]:
         return self._users.get(user_id)
@@ -87,29 +117,44 @@ class InMemoryDatabase(BaseDatabase):
             "key_prefix": key_prefix,
             "created_at": datetime.utcnow(),
         }
-        self._api_keys[key_id] = api_key
+        self._put_api_key(api_key)
         return api_key
 
+    def _put_api_key(self, api_key: dict) -> None:
+        key_id = api_key["id"]
+        self._api_keys[key_id] = api_key
+        self._key_ids_by_hash.setdefault(api_key["key_hash"], key_id)
+        self._keys_by_user.setdefault(api_key["user_id"], {})[key_id] = api_key
+
     async def get_api_keys_by_user(self, user_id: str) -> list[dict]:
-        return [k for k in self._api_keys.values() if k["user_id"] == user_id]
+        return list(self._keys_by_user.get(user_id, {}).values())
 
     async def get_api_key_by_hash(self, key_hash: str) -> Optional[dict]:
-        for key in self._api_keys.values():
-            if key["key_hash"] == key_hash:
-                return key
-        return None
+        key_id = self._key_ids_by_hash.get(key_hash)
+        return self._api_keys.get(key_id) if key_id else None
 
     async def delete_api_key(self, key_id: str, user_id: str) -> bool:
-        if key_id in self._api_keys and self._api_keys[key_id]["user_id"] == user_id:
-            del self._api_keys[key_id]
-            return True
-        return False
+        return self._remove_api_key(key_id, user_id)
+
+    def _remove_api_key(self, key_id: str, user_id: str) -> bool:
+        api_key = self._api_keys.get(key_id)
+        if not api_key or api_key["user_id"] != user_id:
+            return False
+        del self._api_keys[key_id]
+        user_keys = self._keys_by_user[user_id]
+        del user_keys[key_id]
+        if not user_keys:
+            del self._keys_by_user[user_id]
+        if self._key_ids_by_hash.get(api_key["key_hash"]) == key_id:
+            del self._key_ids_by_hash[api_key["key_hash"]]
+        return True
 
     # --- Policy Management ---
 
     async def create_policy(self, policy_data: PolicyCreate) -> Policy:
         policy = Policy(**policy_data.model_dump())
         self._policies[policy.id] = policy
+        self.policy_generation += 1
         return policy
 
     async def get_policy(self, policy_id: str) -> Optional[Policy]:
@@ -129,11 +174,13 @@ class InMemoryDatabase(BaseDatabase):
         updated_policy = policy.model_copy(update=update_data)
         updated_policy.updated_at = datetime.utcnow()
         self._policies[policy_id] = updated_policy
+        self.policy_generation += 1
         return updated_policy
 
     async def delete_policy(self, policy_id: str) -> bool:
         if policy_id in self._policies:
             del self._policies[policy_id]
+            self.policy_generation += 1
             return True
         return False
 
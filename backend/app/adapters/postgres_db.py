@@ -0,0 +1,397 @@
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import AsyncIterator, Optional
+import uuid
+
+from psycopg import AsyncConnection
+from psycopg.rows import dict_row, tuple_row
+from psycopg.types.json import Jsonb
+from psycopg_pool import AsyncConnectionPool
+
+from app.adapters.base_db import BaseDatabase
+from app.domain.event import Event
+from app.models.schemas import DecisionTrace
+
+_EVENT_COLUMNS = (
+    "id, action_type, resource_id, user_id, decision, reason, "
+    "ai_recommendation, ai_available, metadata, timestamp, trace"
+)
+_INSERT_EVENT = (
+    f"insert into events ({_EVENT_COLUMNS}) "
+    "values (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s) "
+    "on conflict (id) do nothing"
+)
+# COPY can't skip conflicts, so batches are copied into a per-connection
+# staging table and moved over with on conflict do nothing: retrying a
+# batch that did commit stores nothing twice
+_CREATE_STAGING = (
+    "create temp table if not exists events_staging "
+    "(like events) on commit delete rows"
+)
+_COPY_EVENTS = f"copy events_staging ({_EVENT_COLUMNS}) from stdin"
+_MOVE_STAGED_EVENTS = (
+    f"insert into events ({_EVENT_COLUMNS}) "
+    f"select {_EVENT_COLUMNS} from events_staging on conflict (id) do nothing"
+)
+_SELECT_EVENT = f"select {_EVENT_COLUMNS} from events where id = %s"
+_SELECT_CURSOR = "select timestamp, id from events where id = %s"
+# Sum of the counter shards; all nulls when the shards aren't there
+_SELECT_COUNTERS = (
+    "select sum(total_actions)::bigint, sum(approved_count)::bigint, "
+    "sum(rejected_count)::bigint, sum(ai_unavailable_count)::bigint "
+    "from event_counters"
+)
+# Fallback when sql/001_event_counters.sql hasn't been applied: one scan,
+# all four counts computed by the server
+_COUNT_EVENTS = (
+    "select count(*), "
+    "count(*) filter (where decision = 'approve'), "
+    "count(*) filter (where decision = 'reject'), "
+    "count(*) filter (where not ai_available) "
+    "from events"
+)
+_INSERT_USER = (
+    "insert into users (id, email, password_hash, name, created_at) "
+    "values (%s, %s, %s, %s, %s)"
+)
+_SELECT_USER_BY_EMAIL = "select * from users where email = %s"
+_SELECT_USER_BY_ID = "select * from users where id = %s"
+_INSERT_API_KEY = (
+    "insert into api_keys (id, user_id, name, key_hash, key_prefix, created_at) "
+    "values (%s, %s, %s, %s, %s, %s)"
+)
+_SELECT_API_KEYS_BY_USER = (
+    "select * from api_keys where user_id = %s order by created_at, id"
+)
+_SELECT_API_KEY_BY_HASH = "select * from api_keys where key_hash = %s"
+_DELETE_API_KEY = "delete from api_keys where id = %s and user_id = %s"
+_SELECT_API_KEY_VERSION = "select version from api_key_version where id = 1"
+# The writes check versions first: see sql/004_metric_snapshots.sql
+_PUT_METRIC_SNAPSHOTS = (
+    "select put_metric_snapshots(%s, %s::text[], %s::bigint[], %s::bytea[], %s)"
+)
+_RETIRE_METRIC_SNAPSHOTS = (
+    "select retire_metric_snapshots("
+    "%s, %s, %s, %s::text[], %s::bigint[], %s::bytea[], %s)"
+)
+_SELECT_METRIC_SNAPSHOT_VERSIONS = "select worker, kind, version from metric_snapshots"
+_SELECT_METRIC_SNAPSHOTS = (
+    "select kind, version, data from metric_snapshots "
+    "where worker = %s and kind = any(%s)"
+)
+_DELETE_METRIC_SNAPSHOTS = (
+    "delete from metric_snapshots where worker = %s and kind = any(%s)"
+)
+
+def _utc(timestamp: datetime) -> datetime:
+    """Aware UTC datetime for a timestamp (naive ones are taken as UTC)."""
+    if timestamp.tzinfo is None:
+        return timestamp.replace(tzinfo=timezone.utc)
+    return timestamp
+
+
+def _naive_utc(timestamp: datetime) -> datetime:
+    return timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _event_row(event: Event) -> tuple:
+    return (
+        event.id,
+        event.action_type,
+        event.resource_id,
+        event.user_id,
+        event.decision,
+        event.reason,
+        event.ai_recommendation,
+        event.ai_available,
+        Jsonb(event.metadata) if event.metadata is not None else None,
+        _utc(event.timestamp),
+        Jsonb(event.trace.model_dump()) if event.trace else None,
+    )
+
+
+def _row_to_event(row: tuple) -> Event:
+    trace = row[10]
+    return Event(
+        id=row[0],
+        action_type=row[1],
+        resource_id=row[2],
+        user_id=row[3],
+        decision=row[4],
+        reason=row[5],
+        ai_recommendation=row[6],
+        ai_available=row[7],
+        metadata=row[8],
+        timestamp=_naive_utc(row[9]),
+        trace=DecisionTrace.model_validate(trace) if trace else None,
+    )
+
+
+def _row_to_dict(row: dict) -> dict:
+    row["created_at"] = _naive_utc(row["created_at"])
+    return row
+
+
+class PostgresDatabase(BaseDatabase):
+    """
+    PostgreSQL database over psycopg 3's native async driver.
+
+    - Connections come from an AsyncConnectionPool, opened on first use.
+    - Every statement is prepared server-side on first use per connection
+      (prepare_threshold=0), so hot queries skip parsing and planning.
+      Needs a direct connection or a session-mode pooler: transaction-mode
+      PgBouncer does not keep prepared statements.
+    - create_events streams the batch with COPY (via a staging table, so
+      it stays idempotent), a fixed few round trips however many rows.
+    - get_events pages by (timestamp, id) keyset, newest first.
+
+    Expects the schema in sql/ (000_schema.sql, 001_event_counters.sql,
+    003_api_key_version.sql, 004_metric_snapshots.sql).
+    """
+
+    def __init__(self, conninfo: str, min_size: int = 1, max_size: int = 10):
+        self._pool = AsyncConnectionPool(
+            conninfo,
+            min_size=min_size,
+            max_size=max_size,
+            kwargs={"prepare_threshold": 0},
+            open=False,
+        )
+
+    @asynccontextmanager
+    async def _connection(self) -> AsyncIterator[AsyncConnection]:
+        # The pool needs a running event loop, so it's opened here rather than
+        # in __init__; open() is a no-op once the pool is open
+        await self._pool.open()
+        async with self._pool.connection() as connection:
+            yield connection
+
+    async def _fetch_one(self, sql: str, *params, row_factory=tuple_row):
+        async with self._connection() as connection:
+            async with connection.cursor(row_factory=row_factory) as cursor:
+                await cursor.execute(sql, params)
+                return await cursor.fetchone()
+
+    async def close(self) -> None:
+        await self._pool.close()
+
+    # --- Events ---
+
+    async def create_event(self, event: Event) -> Event:
+        async with self._connection() as connection:
+            await connection.execute(_INSERT_EVENT, _event_row(event))
+        return event
+
+    async def create_events(self, events: list[Event]) -> list[Event]:
+        if not events:
+            return events
+        async with self._connection() as connection:
+            await connection.execute(_CREATE_STAGING, prepare=False)
+            async with connection.cursor() as cursor:
+                async with cursor.copy(_COPY_EVENTS) as copy:
+                    for event in events:
+                        await copy.write_row(_event_row(event))
+            await connection.execute(_MOVE_STAGED_EVENTS)
+        return events
+
+    async def get_events(
+        self,
+        user_id: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0,
+        before: Optional[str] = None,
+        after: Optional[str] = None,
+    ) -> list[Event]:
+        async with self._connection() as connection:
+            conditions, params = [], []
+            if user_id:
+                conditions.append("user_id = %s")
+                params.append(user_id)
+            # Keyset mode walks the (timestamp, id) indexes instead of skipping
+            # rows; `after` alone reads ascending from the cursor and is flipped
+            for cursor_id, op in ((before, "<"), (after, ">")):
+                if cursor_id:
+                    cursor = await connection.execute(_SELECT_CURSOR, (cursor_id,))
+                    row = await cursor.fetchone()
+                    if row is None:
+                        raise ValueError(f"Unknown event cursor: {cursor_id}")
+                    conditions.append(f"(timestamp, id) {op} (%s, %s)")
+                    params.extend(row)
+            ascending = bool(after and not before)
+
+            sql = f"select {_EVENT_COLUMNS} from events"
+            if conditions:
+                sql += " where " + " and ".join(conditions)
+            direction = "asc" if ascending else "desc"
+            sql += f" order by timestamp {direction}, id {direction} limit %s"
+            params.append(limit)
+            if not (before or after):
+                sql += " offset %s"
+                params.append(offset)
+
+            cursor = await connection.execute(sql, params)
+            events = [_row_to_event(row) for row in await cursor.fetchall()]
+        if ascending:
+            events.reverse()
+        return events
+
+    async def get_event_by_id(self, event_id: str) -> Optional[Event]:
+        row = await self._fetch_one(_SELECT_EVENT, event_id)
+        return _row_to_event(row) if row else None
+
+    async def get_metrics(self) -> dict:
+        # Counter shards kept current by the trigger in sql/001_event_counters.sql
+        row = await self._fetch_one(_SELECT_COUNTERS)
+        if row[0] is None:
+            row = await self._fetch_one(_COUNT_EVENTS)
+        total, approved, rejected, ai_unavailable = row
+        return {
+            "total_actions": total,
+            "approved_count": approved,
+            "rejected_count": rejected,
+            "reject_rate": rejected / total if total > 0 else 0.0,
+            "ai_unavailable_count": ai_unavailable,
+        }
+
+    # --- Users and API keys ---
+
+    async def create_user(
+        self, email: str, password_hash: str, name: Optional[str] = None
+    ) -> dict:
+        user = {
+            "id": str(uuid.uuid4()),
+            "email": email,
+            "password_hash": password_hash,
+            "name": name,
+            "created_at": datetime.utcnow(),
+        }
+        async with self._connection() as connection:
+            await connection.execute(
+                _INSERT_USER,
+                (user["id"], email, password_hash, name, _utc(user["created_at"])),
+            )
+        return user
+
+    async def get_user_by_email(self, email: str) -> Optional[dict]:
+        row = await self._fetch_one(_SELECT_USER_BY_EMAIL, email, row_factory=dict_row)
+        return _row_to_dict(row) if row else None
+
+    async def get_user_by_id(self, user_id: str) -> Optional[dict]:
+        row = await self._fetch_one(_SELECT_USER_BY_ID, user_id, row_factory=dict_row)
+        return _row_to_dict(row) if row else None
+
+    async def create_api_key(
+        self, user_id: str, name: str, key_hash: str, key_prefix: str
+    ) -> dict:
+        api_key = {
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "name": name,
+            "key_hash": key_hash,
+            "key_prefix": key_prefix,
+            "created_at": datetime.utcnow(),
+        }
+        async with self._connection() as connection:
+            await connection.execute(
+                _INSERT_API_KEY,
+                (
+                    api_key["id"],
+                    user_id,
+                    name,
+                    key_hash,
+                    key_prefix,
+                    _utc(api_key["created_at"]),
+                ),
+            )
+        return api_key
+
+    async def get_api_keys_by_user(self, user_id: str) -> list[dict]:
+        async with self._connection() as connection:
+            async with connection.cursor(row_factory=dict_row) as cursor:
+                await cursor.execute(_SELECT_API_KEYS_BY_USER, (user_id,))
+                return [_row_to_dict(row) for row in await cursor.fetchall()]
+
+    async def get_api_key_by_hash(self, key_hash: str) -> Optional[dict]:
+        row = await self._fetch_one(
+            _SELECT_API_KEY_BY_HASH, key_hash, row_factory=dict_row
+        )
+        return _row_to_dict(row) if row else None
+
+    async def delete_api_key(self, key_id: str, user_id: str) -> bool:
+        async with self._connection() as connection:
+            cursor = await connection.execute(_DELETE_API_KEY, (key_id, user_id))
+            return cursor.rowcount > 0
+
+    async def get_api_key_version(self) -> int:
+        # Bumped by the trigger in sql/003_api_key_version.sql
+        row = await self._fetch_one(_SELECT_API_KEY_VERSION)
+        return row[0] if row else 0
+
+    # --- Metric snapshots (see app.core.metric_sync) ---
+
+    async def put_metric_snapshots(
+        self,
+        worker: str,
+        snapshots: dict[str, tuple[int, bytes]],
+        expected: dict[str, Optional[int]],
+    ) -> bool:
+        """
+        Upsert a worker's snapshots, only if its rows of the `expected` kinds
+        still have those versions (None: no row). Returns whether it did.
+        """
+        kinds = list(snapshots)
+        row = await self._fetch_one(
+            _PUT_METRIC_SNAPSHOTS,
+            worker,
+            kinds,
+            [snapshots[kind][0] for kind in kinds],
+            [snapshots[kind][1] for kind in kinds],
+            Jsonb(expected),
+        )
+        return row[0]
+
+    async def get_metric_snapshot_versions(self) -> dict[tuple[str, str], int]:
+        async with self._connection() as connection:
+            cursor = await connection.execute(_SELECT_METRIC_SNAPSHOT_VERSIONS)
+            rows = await cursor.fetchall()
+        return {(worker, kind): version for worker, kind, version in rows}
+
+    async def get_metric_snapshots(
+        self, worker: str, kinds: list[str]
+    ) -> dict[str, tuple[int, bytes]]:
+        async with self._connection() as connection:
+            cursor = await connection.execute(
+                _SELECT_METRIC_SNAPSHOTS, (worker, kinds)
+            )
+            rows = await cursor.fetchall()
+        return {kind: (version, bytes(data)) for kind, version, data in rows}
+
+    async def delete_metric_snapshots(self, worker: str, kinds: list[str]) -> None:
+        async with self._connection() as connection:
+            await connection.execute(_DELETE_METRIC_SNAPSHOTS, (worker, kinds))
+
+    async def retire_metric_snapshots(
+        self,
+        worker: str,
+        versions: dict[str, int],
+        retired: str,
+        merged: dict[str, tuple[int, bytes]],
+        expected: dict[str, Optional[int]],
+    ) -> bool:
+        """
+        Replace a stopped worker's snapshots with `merged`, upserted as
+        `retired`'s, in one transaction. Only if the worker's rows still have
+        `versions` and `retired`'s the `expected` ones (None: no row).
+        """
+        kinds = list(merged)
+        row = await self._fetch_one(
+            _RETIRE_METRIC_SNAPSHOTS,
+            worker,
+            Jsonb(versions),
+            retired,
+            kinds,
+            [merged[kind][0] for kind in kinds],
+            [merged[kind][1] for kind in kinds],
+            Jsonb(expected),
+        )
+        return row[0]
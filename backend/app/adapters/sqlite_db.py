@@ -0,0 +1,664 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Optional, TypeVar
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from app.adapters.base_db import BaseDatabase
+from app.adapters.event_store import from_micros, to_micros
+from app.domain.event import Event
+from app.models.schemas import DecisionTrace, Policy, PolicyCreate, PolicyUpdate
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+# How often policy_generation re-reads the shared counter, so that policy
+# changes made by other workers reach this worker's snapshot
+_GENERATION_POLL_SECONDS = 1.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id TEXT PRIMARY KEY,
+    action_type TEXT NOT NULL,
+    resource_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    decision TEXT NOT NULL,
+    reason TEXT NOT NULL,
+    ai_recommendation TEXT,
+    ai_available INTEGER NOT NULL,
+    metadata TEXT,
+    timestamp INTEGER NOT NULL,  -- microseconds since the epoch, UTC
+    trace TEXT
+);
+CREATE INDEX IF NOT EXISTS events_timestamp_id ON events (timestamp, id);
+CREATE INDEX IF NOT EXISTS events_user_timestamp_id
+    ON events (user_id, timestamp, id);
+
+CREATE TABLE IF NOT EXISTS event_counters (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    total_actions INTEGER NOT NULL DEFAULT 0,
+    approved_count INTEGER NOT NULL DEFAULT 0,
+    rejected_count INTEGER NOT NULL DEFAULT 0,
+    ai_unavailable_count INTEGER NOT NULL DEFAULT 0
+);
+INSERT OR IGNORE INTO event_counters (id) VALUES (1);
+CREATE TRIGGER IF NOT EXISTS events_count AFTER INSERT ON events BEGIN
+    UPDATE event_counters SET
+        total_actions = total_actions + 1,
+        approved_count = approved_count + (NEW.decision = 'approve'),
+        rejected_count = rejected_count + (NEW.decision = 'reject'),
+        ai_unavailable_count = ai_unavailable_count + (NOT NEW.ai_available)
+    WHERE id = 1;
+END;
+
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY,
+    email TEXT NOT NULL,
+    password_hash TEXT NOT NULL,
+    name TEXT,
+    created_at INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS users_email ON users (email);
+
+CREATE TABLE IF NOT EXISTS api_keys (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    key_hash TEXT NOT NULL,
+    key_prefix TEXT NOT NULL,
+    created_at INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS api_keys_key_hash ON api_keys (key_hash);
+CREATE INDEX IF NOT EXISTS api_keys_user_id ON api_keys (user_id);
+
+CREATE TABLE IF NOT EXISTS policies (
+    id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS policy_generation (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    generation INTEGER NOT NULL DEFAULT 0
+);
+INSERT OR IGNORE INTO policy_generation (id) VALUES (1);
+
+CREATE TABLE IF NOT EXISTS api_key_version (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    version INTEGER NOT NULL DEFAULT 0
+);
+INSERT OR IGNORE INTO api_key_version (id) VALUES (1);
+CREATE TRIGGER IF NOT EXISTS api_keys_bump_version AFTER DELETE ON api_keys BEGIN
+    UPDATE api_key_version SET version = version + 1 WHERE id = 1;
+END;
+
+CREATE TABLE IF NOT EXISTS metric_snapshots (
+    worker TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (worker, kind)
+);
+"""
+
+# Statements are module constants so each connection's statement cache
+# (cached_statements) prepares them once and reuses them
+_INSERT_EVENT = (
+    "INSERT INTO events (id, action_type, resource_id, user_id, decision, reason, "
+    "ai_recommendation, ai_available, metadata, timestamp, trace) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+    # Not OR IGNORE: that would also skip rows breaking NOT NULL
+    "ON CONFLICT (id) DO NOTHING"
+)
+_EVENT_COLUMNS = (
+    "id, action_type, resource_id, user_id, decision, reason, "
+    "ai_recommendation, ai_available, metadata, timestamp, trace"
+)
+_SELECT_EVENT = f"SELECT {_EVENT_COLUMNS} FROM events WHERE id = ?"
+_SELECT_CURSOR = "SELECT timestamp, id FROM events WHERE id = ?"
+_SELECT_METRICS = (
+    "SELECT total_actions, approved_count, rejected_count, ai_unavailable_count "
+    "FROM event_counters WHERE id = 1"
+)
+_INSERT_USER = (
+    "INSERT INTO users (id, email, password_hash, name, created_at) "
+    "VALUES (?, ?, ?, ?, ?)"
+)
+_SELECT_USER_BY_EMAIL = "SELECT * FROM users WHERE email = ? ORDER BY rowid LIMIT 1"
+_SELECT_USER_BY_ID = "SELECT * FROM users WHERE id = ?"
+_INSERT_API_KEY = (
+    "INSERT INTO api_keys (id, user_id, name, key_hash, key_prefix, created_at) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+_SELECT_API_KEYS_BY_USER = "SELECT * FROM api_keys WHERE user_id = ? ORDER BY rowid"
+_SELECT_API_KEY_BY_HASH = (
+    "SELECT * FROM api_keys WHERE key_hash = ? ORDER BY rowid LIMIT 1"
+)
+_DELETE_API_KEY = "DELETE FROM api_keys WHERE id = ? AND user_id = ?"
+_SELECT_API_KEY_VERSION = "SELECT version FROM api_key_version WHERE id = 1"
+_UPSERT_METRIC_SNAPSHOT = (
+    "INSERT INTO metric_snapshots (worker, kind, version, data) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT (worker, kind) DO UPDATE SET "
+    "version = excluded.version, data = excluded.data"
+)
+_SELECT_METRIC_SNAPSHOT_VERSIONS = "SELECT worker, kind, version FROM metric_snapshots"
+_SELECT_METRIC_SNAPSHOT = (
+    "SELECT version, data FROM metric_snapshots WHERE worker = ? AND kind = ?"
+)
+_DELETE_METRIC_SNAPSHOT = "DELETE FROM metric_snapshots WHERE worker = ? AND kind = ?"
+_SELECT_WORKER_METRIC_SNAPSHOT_VERSIONS = (
+    "SELECT kind, version FROM metric_snapshots WHERE worker = ?"
+)
+_DELETE_WORKER_METRIC_SNAPSHOTS = "DELETE FROM metric_snapshots WHERE worker = ?"
+# An id that's taken replaces that policy, as in InMemoryDatabase (which the
+# other backends keep policies in); a plain INSERT would fail the request
+_INSERT_POLICY = (
+    "INSERT INTO policies (id, data) VALUES (?, ?) "
+    "ON CONFLICT (id) DO UPDATE SET data = excluded.data"
+)
+_UPDATE_POLICY = "UPDATE policies SET data = ? WHERE id = ?"
+_DELETE_POLICY = "DELETE FROM policies WHERE id = ?"
+_SELECT_POLICY = "SELECT data FROM policies WHERE id = ?"
+_SELECT_POLICIES = "SELECT data FROM policies ORDER BY rowid"
+_SELECT_GENERATION = "SELECT generation FROM policy_generation WHERE id = 1"
+_BUMP_GENERATION = (
+    "UPDATE policy_generation SET generation = generation + 1 WHERE id = 1 "
+    "RETURNING generation"
+)
+
+
+def _event_row(event: Event) -> tuple:
+    return (
+        event.id,
+        event.action_type,
+        event.resource_id,
+        event.user_id,
+        event.decision,
+        event.reason,
+        event.ai_recommendation,
+        event.ai_available,
+        json.dumps(event.metadata) if event.metadata is not None else None,
+        to_micros(event.timestamp),
+        event.trace.model_dump_json() if event.trace else None,
+    )
+
+
+def _row_to_event(row: tuple) -> Event:
+    metadata, timestamp, trace = row[8], row[9], row[10]
+    return Event(
+        id=row[0],
+        action_type=row[1],
+        resource_id=row[2],
+        user_id=row[3],
+        decision=row[4],
+        reason=row[5],
+        ai_recommendation=row[6],
+        ai_available=bool(row[7]),
+        metadata=json.loads(metadata) if metadata is not None else None,
+        timestamp=from_micros(timestamp),
+        trace=DecisionTrace.model_validate_json(trace) if trace else None,
+    )
+
+
+def _row_to_dict(row: sqlite3.Row) -> dict:
+    record = dict(row)
+    record["created_at"] = from_micros(record["created_at"])
+    return record
+
+
+def _versions_match(
+    connection: sqlite3.Connection, worker: str, expected: dict[str, Optional[int]]
+) -> bool:
+    """Whether a worker's snapshots have the expected versions (None: no row)."""
+    for kind, version in expected.items():
+        row = connection.execute(_SELECT_METRIC_SNAPSHOT, (worker, kind)).fetchone()
+        if (row[0] if row else None) != version:
+            return False
+    return True
+
+
+def _read_generation(connection: sqlite3.Connection) -> int:
+    return connection.execute(_SELECT_GENERATION).fetchone()[0]
+
+
+class SQLiteDatabase(BaseDatabase):
+    """
+    SQLite database shared by every worker process on a host.
+
+    - WAL mode: readers never wait for the writer, and commits only append
+      to the WAL (synchronous=NORMAL), so all workers see one consistent
+      store.
+    - All writes in this process go through one writer connection on one
+      thread; multi-row writes (create_events) run as a single transaction
+      with executemany. Writes from other workers are serialized by SQLite's
+      own lock (BEGIN IMMEDIATE plus busy_timeout).
+    - Reads run on a pool of read-only connections, one per reader thread.
+    - Queries run on those threads, never on the event loop.
+
+    Also stores policies. policy_generation is shared through the database,
+    so a policy change made by any worker invalidates every worker's
+    snapshot within a second: reading it returns the last value seen and
+    starts a re-read on a reader thread at most once a second.
+    """
+
+    def __init__(self, path: str, readers: int = 4, busy_timeout_ms: int = 5000):
+        self._path = path
+        self._busy_timeout_ms = busy_timeout_ms
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        connection = self._connect()
+        try:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(_SCHEMA)
+            self._policy_generation = _read_generation(connection)
+        finally:
+            connection.close()
+
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._writer = ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix="sqlite-writer",
+            initializer=self._open_thread_connection,
+            initargs=(False,),
+        )
+        self._readers = ThreadPoolExecutor(
+            max_workers=readers,
+            thread_name_prefix="sqlite-reader",
+            initializer=self._open_thread_connection,
+            initargs=(True,),
+        )
+
+        self._generation_checked = time.monotonic()
+        self._generation_refresh: Optional[asyncio.Task] = None
+
+    # --- Connections ---
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(
+            self._path,
+            isolation_level=None,  # transactions are explicit
+            check_same_thread=False,
+            cached_statements=256,
+        )
+        connection.row_factory = sqlite3.Row
+        connection.execute(f"PRAGMA busy_timeout={self._busy_timeout_ms}")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def _open_thread_connection(self, read_only: bool) -> None:
+        connection = self._connect()
+        if read_only:
+            connection.execute("PRAGMA query_only=ON")
+        self._local.connection = connection
+        with self._connections_lock:
+            self._connections.append(connection)
+
+    async def _run(
+        self, executor: ThreadPoolExecutor, func: Callable[..., T], *args
+    ) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            executor, lambda: func(self._local.connection, *args)
+        )
+
+    async def _read(self, func: Callable[..., T], *args) -> T:
+        return await self._run(self._readers, func, *args)
+
+    async def _write(self, func: Callable[..., T], *args) -> T:
+        """Run func(connection, *args) in one write transaction."""
+
+        def transaction(connection: sqlite3.Connection) -> T:
+            # IMMEDIATE takes the write lock up front instead of upgrading
+            # mid-transaction, which could fail with SQLITE_BUSY
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                result = func(connection, *args)
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+            return result
+
+        return await self._run(self._writer, transaction)
+
+    async def close(self) -> None:
+        if self._generation_refresh is not None:
+            await self._generation_refresh
+        self._writer.shutdown(wait=True)
+        self._readers.shutdown(wait=True)
+        with self._connections_lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+
+    # --- Events ---
+
+    async def create_event(self, event: Event) -> Event:
+        await self._write(
+            lambda connection: connection.execute(_INSERT_EVENT, _event_row(event))
+        )
+        return event
+
+    async def create_events(self, events: list[Event]) -> list[Event]:
+        if not events:
+            return events
+        rows = [_event_row(event) for event in events]
+        await self._write(
+            lambda connection: connection.executemany(_INSERT_EVENT, rows)
+        )
+        return events
+
+    @staticmethod
+    def _page(
+        connection: sqlite3.Connection,
+        user_id: Optional[str],
+        limit: int,
+        offset: int,
+        before: Optional[str],
+        after: Optional[str],
+    ) -> list[Event]:
+        conditions, params = [], []
+        if user_id:
+            conditions.append("user_id = ?")
+            params.append(user_id)
+        # Keyset mode walks the (timestamp, id) indexes instead of skipping
+        # rows; `after` alone reads ascending from the cursor and is flipped
+        for cursor, op in ((before, "<"), (after, ">")):
+            if cursor:
+                row = connection.execute(_SELECT_CURSOR, (cursor,)).fetchone()
+                if row is None:
+                    raise ValueError(f"Unknown event cursor: {cursor}")
+                conditions.append(f"(timestamp, id) {op} (?, ?)")
+                params.extend(row)
+        ascending = bool(after and not before)
+
+        sql = f"SELECT {_EVENT_COLUMNS} FROM events"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        direction = "ASC" if ascending else "DESC"
+        sql += f" ORDER BY timestamp {direction}, id {direction} LIMIT ?"
+        params.append(limit)
+        if not (before or after):
+            sql += " OFFSET ?"
+            params.append(offset)
+
+        events = [_row_to_event(row) for row in connection.execute(sql, params)]
+        if ascending:
+            events.reverse()
+        return events
+
+    async def get_events(
+        self,
+        user_id: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0,
+        before: Optional[str] = None,
+        after: Optional[str] = None,
+    ) -> list[Event]:
+        return await self._read(self._page, user_id, limit, offset, before, after)
+
+    async def get_event_by_id(self, event_id: str) -> Optional[Event]:
+        def get(connection: sqlite3.Connection) -> Optional[Event]:
+            row = connection.execute(_SELECT_EVENT, (event_id,)).fetchone()
+            return _row_to_event(row) if row else None
+
+        return await self._read(get)
+
+    async def get_metrics(self) -> dict:
+        # Maintained by the events_count trigger: O(1) however many events
+        row = await self._read(
+            lambda connection: connection.execute(_SELECT_METRICS).fetchone()
+        )
+        total, approved, rejected, ai_unavailable = row
+        return {
+            "total_actions": total,
+            "approved_count": approved,
+            "rejected_count": rejected,
+            "reject_rate": rejected / total if total > 0 else 0.0,
+            "ai_unavailable_count": ai_unavailable,
+        }
+
+    # --- Users and API keys ---
+
+    async def create_user(
+        self, email: str, password_hash: str, name: Optional[str] = None
+    ) -> dict:
+        user = {
+            "id": str(uuid.uuid4()),
+            "email": email,
+            "password_hash": password_hash,
+            "name": name,
+            "created_at": datetime.utcnow(),
+        }
+        row = (user["id"], email, password_hash, name, to_micros(user["created_at"]))
+        await self._write(lambda connection: connection.execute(_INSERT_USER, row))
+        return user
+
+    async def _fetch_one(self, sql: str, *params) -> Optional[dict]:
+        row = await self._read(
+            lambda connection: connection.execute(sql, params).fetchone()
+        )
+        return _row_to_dict(row) if row else None
+
+    async def get_user_by_email(self, email: str) -> Optional[dict]:
+        return await self._fetch_one(_SELECT_USER_BY_EMAIL, email)
+
+    async def get_user_by_id(self, user_id: str) -> Optional[dict]:
+        return await self._fetch_one(_SELECT_USER_BY_ID, user_id)
+
+    async def create_api_key(
+        self, user_id: str, name: str, key_hash: str, key_prefix: str
+    ) -> dict:
+        api_key = {
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "name": name,
+            "key_hash": key_hash,
+            "key_prefix": key_prefix,
+            "created_at": datetime.utcnow(),
+        }
+        row = (
+            api_key["id"],
+            user_id,
+            name,
+            key_hash,
+            key_prefix,
+            to_micros(api_key["created_at"]),
+        )
+        await self._write(lambda connection: connection.execute(_INSERT_API_KEY, row))
+        return api_key
+
+    async def get_api_keys_by_user(self, user_id: str) -> list[dict]:
+        rows = await self._read(
+            lambda connection: connection.execute(
+                _SELECT_API_KEYS_BY_USER, (user_id,)
+            ).fetchall()
+        )
+        return [_row_to_dict(row) for row in rows]
+
+    async def get_api_key_by_hash(self, key_hash: str) -> Optional[dict]:
+        return await self._fetch_one(_SELECT_API_KEY_BY_HASH, key_hash)
+
+    async def delete_api_key(self, key_id: str, user_id: str) -> bool:
+        cursor = await self._write(
+            lambda connection: connection.execute(_DELETE_API_KEY, (key_id, user_id))
+        )
+        return cursor.rowcount > 0
+
+    async def get_api_key_version(self) -> int:
+        row = await self._read(
+            lambda connection: connection.execute(_SELECT_API_KEY_VERSION).fetchone()
+        )
+        return row[0]
+
+    # --- Metric snapshots (see app.core.metric_sync) ---
+
+    async def put_metric_snapshots(
+        self,
+        worker: str,
+        snapshots: dict[str, tuple[int, bytes]],
+        expected: dict[str, Optional[int]],
+    ) -> bool:
+        """
+        Upsert a worker's snapshots, only if its rows of the `expected` kinds
+        still have those versions (None: no row). Returns whether it did.
+        """
+        rows = [
+            (worker, kind, version, data)
+            for kind, (version, data) in snapshots.items()
+        ]
+
+        def write(connection: sqlite3.Connection) -> bool:
+            if not _versions_match(connection, worker, expected):
+                return False
+            connection.executemany(_UPSERT_METRIC_SNAPSHOT, rows)
+            return True
+
+        return await self._write(write)
+
+    async def get_metric_snapshot_versions(self) -> dict[tuple[str, str], int]:
+        rows = await self._read(
+            lambda connection: connection.execute(
+                _SELECT_METRIC_SNAPSHOT_VERSIONS
+            ).fetchall()
+        )
+        return {(worker, kind): version for worker, kind, version in rows}
+
+    async def get_metric_snapshots(
+        self, worker: str, kinds: list[str]
+    ) -> dict[str, tuple[int, bytes]]:
+        def read(connection: sqlite3.Connection) -> dict[str, tuple[int, bytes]]:
+            snapshots = {}
+            for kind in kinds:
+                row = connection.execute(
+                    _SELECT_METRIC_SNAPSHOT, (worker, kind)
+                ).fetchone()
+                if row:
+                    snapshots[kind] = (row[0], row[1])
+            return snapshots
+
+        return await self._read(read)
+
+    async def delete_metric_snapshots(self, worker: str, kinds: list[str]) -> None:
+        rows = [(worker, kind) for kind in kinds]
+        await self._write(
+            lambda connection: connection.executemany(_DELETE_METRIC_SNAPSHOT, rows)
+        )
+
+    async def retire_metric_snapshots(
+        self,
+        worker: str,
+        versions: dict[str, int],
+        retired: str,
+        merged: dict[str, tuple[int, bytes]],
+        expected: dict[str, Optional[int]],
+    ) -> bool:
+        """
+        Replace a stopped worker's snapshots with `merged`, upserted as
+        `retired`'s, in one transaction. Only if the worker's rows still have
+        `versions` and `retired`'s the `expected` ones (None: no row).
+        """
+        rows = [
+            (retired, kind, version, data)
+            for kind, (version, data) in merged.items()
+        ]
+
+        def write(connection: sqlite3.Connection) -> bool:
+            held = connection.execute(
+                _SELECT_WORKER_METRIC_SNAPSHOT_VERSIONS, (worker,)
+            ).fetchall()
+            if dict(held) != versions:
+                return False
+            if not _versions_match(connection, retired, expected):
+                return False
+            connection.executemany(_UPSERT_METRIC_SNAPSHOT, rows)
+            connection.execute(_DELETE_WORKER_METRIC_SNAPSHOTS, (worker,))
+            return True
+
+        return await self._write(write)
+
+    # --- Policy Management ---
+
+    @property
+    def policy_generation(self) -> int:
+        now = time.monotonic()
+        refreshing = self._generation_refresh
+        if now - self._generation_checked >= _GENERATION_POLL_SECONDS and (
+            refreshing is None or refreshing.done()
+        ):
+            # Never queried inline: with a busy database even this one-row
+            # read could wait out busy_timeout, stalling the event loop
+            self._generation_checked = now
+            self._generation_refresh = asyncio.create_task(
+                self._refresh_generation()
+            )
+        return self._policy_generation
+
+    async def _refresh_generation(self) -> None:
+        try:
+            generation = await self._read(_read_generation)
+        except Exception as e:
+            logger.warning(f"Reading the policy generation failed: {e!r}")
+            return
+        # A policy write here may have moved it past what was read
+        self._policy_generation = max(self._policy_generation, generation)
+
+    async def _write_policy(self, sql: str, *params) -> bool:
+        def write(connection: sqlite3.Connection) -> tuple[bool, int]:
+            if connection.execute(sql, params).rowcount == 0:
+                return False, 0
+            return True, connection.execute(_BUMP_GENERATION).fetchone()[0]
+
+        changed, generation = await self._write(write)
+        if changed:
+            self._policy_generation = generation
+            self._generation_checked = time.monotonic()
+        return changed
+
+    async def create_policy(self, policy_data: PolicyCreate) -> Policy:
+        policy = Policy(**policy_data.model_dump())
+        await self._write_policy(_INSERT_POLICY, policy.id, policy.model_dump_json())
+        return policy
+
+    async def get_policy(self, policy_id: str) -> Optional[Policy]:
+        row = await self._read(
+            lambda connection: connection.execute(
+                _SELECT_POLICY, (policy_id,)
+            ).fetchone()
+        )
+        return Policy.model_validate_json(row[0]) if row else None
+
+    async def get_all_policies(self) -> list[Policy]:
+        rows = await self._read(
+            lambda connection: connection.execute(_SELECT_POLICIES).fetchall()
+        )
+        return [Policy.model_validate_json(row[0]) for row in rows]
+
+    async def update_policy(
+        self, policy_id: str, policy_data: PolicyUpdate
+    ) -> Optional[Policy]:
+        policy = await self.get_policy(policy_id)
+        if not policy:
+            return None
+
+        # Validate the merged fields so nested conditions stay models
+        update_data = policy_data.model_dump(exclude_unset=True)
+        updated_policy = Policy.model_validate(
+            {**policy.model_dump(), **update_data, "updated_at": datetime.utcnow()}
+        )
+        updated = await self._write_policy(
+            _UPDATE_POLICY, updated_policy.model_dump_json(), policy_id
+        )
+        return updated_policy if updated else None
+
+    async def delete_policy(self, policy_id: str) -> bool:
+        return await self._write_policy(_DELETE_POLICY, policy_id)
@@ -1,27 +1,57 @@
 from typing import Optional
 from datetime import datetime
+import asyncio
 import uuid
 
-from supabase import create_client, Client
+import httpx
+from supabase import AsyncClient, AsyncClientOptions
 
 from app.adapters.base_db import BaseDatabase
 from app.domain.event import Event
 from app.config import settings
 
 
+def _bytea(data: bytes) -> str:
+    """bytea in the hex text form it goes over PostgREST in."""
+    return "\\x" + data.hex()
+
+
 class SupabaseDatabase(BaseDatabase):
     """
     Supabase database implementation for production.
     Data persists across restarts.
+
+    Uses the async client, so a PostgREST round trip never blocks the event
+    loop. All requests share one keep-alive connection pool, and at most
+    SUPABASE_MAX_CONCURRENCY of them are in flight at once; the rest wait
+    their turn instead of piling onto the server.
     """
 
     def __init__(self):
-        self._client: Client = create_client(
-            settings.SUPABASE_URL, settings.SUPABASE_KEY
+        self._http = httpx.AsyncClient(
+            timeout=settings.SUPABASE_TIMEOUT_SECONDS,
+            limits=httpx.Limits(
+                max_connections=settings.SUPABASE_MAX_CONCURRENCY,
+                max_keepalive_connections=settings.SUPABASE_MAX_CONCURRENCY,
+            ),
+        )
+        self._client = AsyncClient(
+            settings.SUPABASE_URL,
+            settings.SUPABASE_KEY,
+            AsyncClientOptions(httpx_client=self._http),
         )
+        self._limit = asyncio.Semaphore(settings.SUPABASE_MAX_CONCURRENCY)
 
-    async def create_event(self, event: Event) -> Event:
-        data = {
+    async def _execute(self, query):
+        async with self._limit:
+            return await query.execute()
+
+    async def close(self) -> None:
+        await self._http.aclose()
+
+    @staticmethod
+    def _event_row(event: Event) -> dict:
+        return {
             "id": event.id,
             "action_type": event.action_type,
             "resource_id": event.resource_id,
@@ -33,25 +63,75 @@ class SupabaseDatabase(BaseDatabase):
             "timestamp": event.timestamp.isoformat(),
             "metadata": event.metadata or {},
         }
-        self._client.table("events").insert(data).execute()
+
+    async def create_event(self, event: Event) -> Event:
+        row = self._event_row(event)
+        await self._execute(self._insert_events(row))
         return event
 
+    async def create_events(self, events: list[Event]) -> list[Event]:
+        if not events:
+            return events
+        # PostgREST takes a JSON array as one multi-row INSERT
+        rows = [self._event_row(event) for event in events]
+        await self._execute(self._insert_events(rows))
+        return events
+
+    def _insert_events(self, rows):
+        # ON CONFLICT (id) DO NOTHING: retrying a write that did commit is a no-op
+        return self._client.table("events").upsert(
+            rows, on_conflict="id", ignore_duplicates=True
+        )
+
+    async def _cursor_row(self, event_id: str) -> dict:
+        result = await self._execute(
+            self._client.table("events").select("id, timestamp").eq("id", event_id)
+        )
+        if not result.data:
+            raise ValueError(f"Unknown event cursor: {event_id}")
+        return result.data[0]
+
+    async def _keyset_filter(self, event_id: str, op: str) -> str:
+        """PostgREST filter for rows before (lt) / after (gt) a cursor event."""
+        row = await self._cursor_row(event_id)
+        ts, cursor_id = row["timestamp"], row["id"]
+        return (
+            f'timestamp.{op}."{ts}",'
+            f'and(timestamp.eq."{ts}",id.{op}."{cursor_id}")'
+        )
+
     async def get_events(
-        self, user_id: Optional[str] = None, limit: int = 100, offset: int = 0
+        self,
+        user_id: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0,
+        before: Optional[str] = None,
+        after: Optional[str] = None,
     ) -> list[Event]:
+        # Keyset mode walks the (timestamp, id) index instead of skipping rows;
+        # `after` alone reads ascending from the cursor and is flipped below
+        ascending = bool(after and not before)
         query = (
             self._client.table("events")
             .select("*")
-            .order("timestamp", desc=True)
+            .order("timestamp", desc=not ascending)
+            .order("id", desc=not ascending)
             .limit(limit)
-            .offset(offset)
         )
+        if before or after:
+            if before:
+                query = query.or_(await self._keyset_filter(before, "lt"))
+            if after:
+                query = query.or_(await self._keyset_filter(after, "gt"))
+        else:
+            query = query.offset(offset)
         if user_id:
             query = query.eq("user_id", user_id)
-        result = query.execute()
+        result = await self._execute(query)
 
+        rows = reversed(result.data) if ascending else result.data
         events = []
-        for row in result.data:
+        for row in rows:
             events.append(
                 Event(
                     id=row["id"],
@@ -73,7 +153,9 @@ class SupabaseDatabase(BaseDatabase):
         return events
 
     async def get_event_by_id(self, event_id: str) -> Optional[Event]:
-        result = self._client.table("events").select("*").eq("id", event_id).execute()
+        result = await self._execute(
+            self._client.table("events").select("*").eq("id", event_id)
+        )
         if not result.data:
             return None
         row = result.data[0]
@@ -95,20 +177,18 @@ class SupabaseDatabase(BaseDatabase):
         )
 
     async def get_metrics(self) -> dict:
-        result = self._client.table("events").select("decision, ai_available").execute()
-        events = result.data
-
-        total = len(events)
-        approved = sum(1 for e in events if e["decision"] == "approve")
-        rejected = sum(1 for e in events if e["decision"] == "reject")
-        ai_unavailable = sum(1 for e in events if not e["ai_available"])
+        # Counted in the database by sql/002_event_metrics.sql: one row back
+        result = await self._execute(self._client.rpc("event_metrics"))
+        row = result.data[0]
 
+        total = row["total_actions"]
+        rejected = row["rejected_count"]
         return {
             "total_actions": total,
-            "approved_count": approved,
+            "approved_count": row["approved_count"],
             "rejected_count": rejected,
             "reject_rate": rejected / total if total > 0 else 0.0,
-            "ai_unavailable_count": ai_unavailable,
+            "ai_unavailable_count": row["ai_unavailable_count"],
         }
 
     async def create_user(
@@ -122,7 +202,7 @@ class SupabaseDatabase(BaseDatabase):
             "name": name,
             "created_at": datetime.utcnow().isoformat(),
         }
-        self._client.table("users").insert(user).execute()
+        await self._execute(self._client.table("users").insert(user))
         return {
             "id": user_id,
             "email": email,
@@ -132,7 +212,9 @@ class SupabaseDatabase(BaseDatabase):
         }
 
     async def get_user_by_email(self, email: str) -> Optional[dict]:
-        result = self._client.table("users").select("*").eq("email", email).execute()
+        result = await self._execute(
+            self._client.table("users").select("*").eq("email", email)
+        )
         if not result.data:
             return None
         row = result.data[0]
@@ -149,7 +231,9 @@ class SupabaseDatabase(BaseDatabase):
         }
 
     async def get_user_by_id(self, user_id: str) -> Optional[dict]:
-        result = self._client.table("users").select("*").eq("id", user_id).execute()
+        result = await self._execute(
+            self._client.table("users").select("*").eq("id", user_id)
+        )
         if not result.data:
             return None
         row = result.data[0]
@@ -177,7 +261,7 @@ class SupabaseDatabase(BaseDatabase):
             "key_prefix": key_prefix,
             "created_at": datetime.utcnow().isoformat(),
         }
-        self._client.table("api_keys").insert(api_key).execute()
+        await self._execute(self._client.table("api_keys").insert(api_key))
         return {
             "id": key_id,
             "user_id": user_id,
@@ -188,8 +272,8 @@ class SupabaseDatabase(BaseDatabase):
         }
 
     async def get_api_keys_by_user(self, user_id: str) -> list[dict]:
-        result = (
-            self._client.table("api_keys").select("*").eq("user_id", user_id).execute()
+        result = await self._execute(
+            self._client.table("api_keys").select("*").eq("user_id", user_id)
         )
         keys = []
         for row in result.data:
@@ -210,11 +294,10 @@ class SupabaseDatabase(BaseDatabase):
         return keys
 
     async def get_api_key_by_hash(self, key_hash: str) -> Optional[dict]:
-        result = (
+        result = await self._execute(
             self._client.table("api_keys")
             .select("*")
             .eq("key_hash", key_hash)
-            .execute()
         )
         if not result.data:
             return None
@@ -233,11 +316,103 @@ class SupabaseDatabase(BaseDatabase):
         }
 
     async def delete_api_key(self, key_id: str, user_id: str) -> bool:
-        result = (
+        result = await self._execute(
             self._client.table("api_keys")
             .delete()
             .eq("id", key_id)
             .eq("user_id", user_id)
-            .execute()
         )
         return len(result.data) > 0
+
+    async def get_api_key_version(self) -> int:
+        # Bumped by the trigger in sql/003_api_key_version.sql
+        result = await self._execute(
+            self._client.table("api_key_version").select("version").eq("id", 1)
+        )
+        return result.data[0]["version"] if result.data else 0
+
+    # --- Metric snapshots (see app.core.metric_sync) ---
+
+    async def put_metric_snapshots(
+        self,
+        worker: str,
+        snapshots: dict[str, tuple[int, bytes]],
+        expected: dict[str, Optional[int]],
+    ) -> bool:
+        """
+        Upsert a worker's snapshots, only if its rows of the `expected` kinds
+        still have those versions (None: no row). Returns whether it did.
+        """
+        # Checked and written in one transaction by sql/004_metric_snapshots.sql
+        kinds = list(snapshots)
+        result = await self._execute(
+            self._client.rpc(
+                "put_metric_snapshots",
+                {
+                    "p_worker": worker,
+                    "p_kinds": kinds,
+                    "p_versions": [snapshots[kind][0] for kind in kinds],
+                    "p_datas": [_bytea(snapshots[kind][1]) for kind in kinds],
+                    "p_expected": expected,
+                },
+            )
+        )
+        return result.data
+
+    async def get_metric_snapshot_versions(self) -> dict[tuple[str, str], int]:
+        result = await self._execute(
+            self._client.table("metric_snapshots").select("worker, kind, version")
+        )
+        return {(row["worker"], row["kind"]): row["version"] for row in result.data}
+
+    async def get_metric_snapshots(
+        self, worker: str, kinds: list[str]
+    ) -> dict[str, tuple[int, bytes]]:
+        result = await self._execute(
+            self._client.table("metric_snapshots")
+            .select("kind, version, data")
+            .eq("worker", worker)
+            .in_("kind", kinds)
+        )
+        return {
+            row["kind"]: (row["version"], bytes.fromhex(row["data"][2:]))
+            for row in result.data
+        }
+
+    async def delete_metric_snapshots(self, worker: str, kinds: list[str]) -> None:
+        await self._execute(
+            self._client.table("metric_snapshots")
+            .delete()
+            .eq("worker", worker)
+            .in_("kind", kinds)
+        )
+
+    async def retire_metric_snapshots(
+        self,
+        worker: str,
+        versions: dict[str, int],
+        retired: str,
+        merged: dict[str, tuple[int, bytes]],
+        expected: dict[str, Optional[int]],
+    ) -> bool:
+        """
+        Replace a stopped worker's snapshots with `merged`, upserted as
+        `retired`'s, in one transaction. Only if the worker's rows still have
+        `versions` and `retired`'s the `expected` ones (None: no row).
+        """
+        kinds = list(merged)
+        result = await self._execute(
+            self._client.rpc(
+                "retire_metric_snapshots",
+                {
+                    "p_worker": worker,
+                    "p_versions": versions,
+                    "p_retired": retired,
+                    "p_kinds": kinds,
+                    "p_merged_versions": [merged[kind][0] for kind in kinds],
+                    "p_datas": [_bytea(merged[kind][1]) for kind in kinds],
+                    "p_expected": expected,
+                },
+            )
+        )
+        return result.data
@@ -1,12 +1,22 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, status
 
 from app.models.schemas import ActionRequest, ActionResponse
 from app.core.engine import action_engine
+from app.core.event_writer import EventQueueFull
 from app.auth.api_key import require_api_key
+from app.config import settings
 
 router = APIRouter(prefix="/action", tags=["Action"])
 
 
+def _queue_full() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Audit log is backed up, try again shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
 @router.post("", response_model=ActionResponse)
 async def process_action(
     request: ActionRequest,
@@ -18,4 +28,30 @@ async def process_action(
     Returns approve/reject decision with immutable audit log.
     Requires API key authentication.
     """
-    return await action_engine.process_action(request)
+    try:
+        return await action_engine.process_action(request)
+    except EventQueueFull:
+        raise _queue_full()
+
+
+@router.post("/batch", response_model=list[ActionResponse])
+async def process_action_batch(
+    requests: list[ActionRequest],
+    user: dict = Depends(require_api_key),
+):
+    """
+    Process a batch of action requests.
+
+    Returns one decision per request, in the same order, each with the
+    same trace a single /action call would produce.
+    Requires API key authentication (checked once for the batch).
+    """
+    if len(requests) > settings.ACTION_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch exceeds maximum size of {settings.ACTION_BATCH_MAX_SIZE}",
+        )
+    try:
+        return await action_engine.process_actions(requests)
+    except EventQueueFull:
+        raise _queue_full()
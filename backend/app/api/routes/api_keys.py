@@ -3,7 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from app.models.schemas import APIKeyCreate, APIKeyResponse, APIKeyCreatedResponse
 from app.adapters import db
 from app.auth.jwt import get_current_user
-from app.auth.api_key import generate_api_key
+from app.auth.api_key import api_key_cache, generate_api_key
 
 router = APIRouter(prefix="/api-keys", tags=["API Keys"])
 
@@ -77,3 +77,5 @@ async def delete_api_key(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="API key not found",
         )
+    # Stop accepting the key in this worker right away
+    api_key_cache.invalidate()
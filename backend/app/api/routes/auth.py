@@ -1,19 +1,33 @@
 from fastapi import APIRouter, HTTPException, status
-import bcrypt
 
 from app.models.schemas import UserCreate, UserLogin, UserResponse, TokenResponse
 from app.adapters import db
 from app.auth.jwt import create_access_token
+from app.auth.passwords import PasswordHasherBusy, password_hasher
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
-def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+async def hash_password(password: str) -> str:
+    try:
+        return await password_hasher.hash(password)
+    except PasswordHasherBusy:
+        raise _busy()
 
 
-def verify_password(password: str, password_hash: str) -> bool:
-    return bcrypt.checkpw(password.encode(), password_hash.encode())
+async def verify_password(password: str, password_hash: str) -> bool:
+    try:
+        return await password_hasher.verify(password, password_hash)
+    except PasswordHasherBusy:
+        raise _busy()
+
+
+def _busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many authentication requests, try again shortly",
+        headers={"Retry-After": "1"},
+    )
 
 
 @router.post(
@@ -32,7 +46,7 @@ async def signup(request: UserCreate):
             detail="Email already registered",
         )
 
-    password_hash = hash_password(request.password)
+    password_hash = await hash_password(request.password)
     user = await db.create_user(
         email=request.email,
         password_hash=password_hash,
@@ -66,7 +80,7 @@ async def login(request: UserLogin):
             detail="Invalid email or password",
         )
 
-    if not verify_password(request.password, user["password_hash"]):
+    if not await verify_password(request.password, user["password_hash"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
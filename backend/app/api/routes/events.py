@@ -1,5 +1,5 @@
 from typing import Optional
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 
 from app.models.schemas import EventResponse
 from app.adapters import db
@@ -13,15 +13,28 @@ async def get_events(
     user_id: Optional[str] = Query(None, description="Filter by user ID"),
     limit: int = Query(100, ge=1, le=1000),
     offset: int = Query(0, ge=0),
+    before: Optional[str] = Query(
+        None, description="Cursor: only events older than this event ID"
+    ),
+    after: Optional[str] = Query(
+        None, description="Cursor: only events newer than this event ID"
+    ),
     current_user: dict = Depends(get_current_user),
 ):
     """
-    Get audit log events.
+    Get audit log events, newest first.
 
     Events are immutable - append only, never updated or deleted.
+    Page with `before=<id of the last event received>`; offset still works
+    but is ignored when a cursor is given.
     Requires JWT authentication.
     """
-    events = await db.get_events(user_id=user_id, limit=limit, offset=offset)
+    try:
+        events = await db.get_events(
+            user_id=user_id, limit=limit, offset=offset, before=before, after=after
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return [
         EventResponse(
             id=e.id,
@@ -1,8 +1,25 @@
-from fastapi import APIRouter, Depends
+from datetime import datetime, timedelta
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
 
-from app.models.schemas import MetricsResponse
+from app.models.schemas import (
+    ActionDecision,
+    AuditSketchesResponse,
+    BreakdownDimension,
+    BreakdownResponse,
+    MetricsResponse,
+    AIAdvisorStatsResponse,
+    AuthCacheStatsResponse,
+    EventWriterStatsResponse,
+    TimeseriesResponse,
+)
 from app.adapters import db
-from app.auth.jwt import get_current_user
+from app.auth.api_key import api_key_cache
+from app.auth.jwt import get_current_user, principal_cache
+from app.auth.passwords import password_hasher
+from app.core.ai_advisor import ai_advisor
+from app.core.event_writer import event_writer
+from app.core.metric_sync import metric_sync
 
 router = APIRouter(prefix="/metrics", tags=["Metrics"])
 
@@ -21,8 +38,137 @@ async def get_metrics(
     - reject_rate
     - ai_unavailable_count
 
-    Calculated via aggregation, no cache required.
+    Read from running counters updated on every event write, so the cost
+    does not grow with the size of the event log.
     Requires JWT authentication.
     """
     metrics = await db.get_metrics()
     return MetricsResponse(**metrics)
+
+
+@router.get("/timeseries", response_model=TimeseriesResponse)
+async def get_metrics_timeseries(
+    start: Optional[datetime] = Query(None, description="Default: one hour ago"),
+    end: Optional[datetime] = Query(None, description="Default: now"),
+    step: int = Query(60, ge=60, description="Bucket size in seconds"),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Get decision counts and approve/reject/AI-unavailable rates over time.
+
+    Served from rollups maintained as events are logged (minute buckets for
+    the last day, hourly for the last month, daily for the last year by
+    default), never from raw events. `step` must be a multiple of 60; the
+    coarsest resolution that fits the step and still covers `start` is used.
+    Counts cover every worker sharing the database (refreshed every
+    METRICS_SYNC_INTERVAL_SECONDS); a stopped worker's counts are folded
+    into a retired total, so they outlast restarts. With the in-memory or
+    log backend they are this worker's, rebuilt from the stored events on
+    startup.
+    Requires JWT authentication.
+    """
+    end = end or datetime.utcnow()
+    start = start or end - timedelta(hours=1)
+    try:
+        points = metric_sync.rollups.timeseries(start, end, step)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return TimeseriesResponse(start=start, end=end, step_seconds=step, points=points)
+
+
+@router.get("/breakdown", response_model=BreakdownResponse)
+async def get_metrics_breakdown(
+    dimension: BreakdownDimension = Query(...),
+    decision: Optional[ActionDecision] = Query(
+        None, description="Rank by this decision's count instead of the total"
+    ),
+    limit: int = Query(10, ge=1, le=1000),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Get the top values of action_type, triggered policy or user_id by
+    decision count - e.g. which policies drive rejections.
+
+    Maintained as events are logged, never computed from raw events. Each
+    dimension tracks at most BREAKDOWN_MAX_KEYS distinct values; past that
+    the value with the fewest events makes room for a new one, whose count
+    then includes up to `overcount` events of the values it replaced.
+    Requests decided without a policy are keyed "__none__". Counts cover
+    every worker sharing the database, as for /metrics/timeseries.
+    Requires JWT authentication.
+    """
+    return BreakdownResponse(
+        **metric_sync.breakdowns.breakdown(
+            dimension, limit, decision.value if decision else None
+        )
+    )
+
+
+@router.get("/sketches", response_model=AuditSketchesResponse)
+async def get_metrics_sketches(
+    days: int = Query(7, ge=1, le=366, description="Window ending today (UTC)"),
+    top: int = Query(50, ge=1, le=1000),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Get approximate audit analytics over the last `days` days.
+
+    Returns distinct users and resources per day and over the whole window
+    (HyperLogLog, ~1% error), plus the resources with the most rejections
+    (count-min sketch + top-k, may slightly overcount). Memory per day is
+    fixed; per-day sketches are merged to answer the window. Counts cover
+    every worker sharing the database, as for /metrics/timeseries.
+    Requires JWT authentication.
+    """
+    window = metric_sync.sketches.window(days)
+    window["top_rejected_resources"] = window["top_rejected_resources"][:top]
+    return AuditSketchesResponse(**window)
+
+
+@router.get("/ai-advisor", response_model=AIAdvisorStatsResponse)
+async def get_ai_advisor_stats(
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Get AI advisor statistics for this worker.
+
+    Returns recommendation cache hits, misses, evictions and expirations,
+    how many requests were coalesced onto an in-flight AI call, and the
+    circuit breaker state with its error rate and latency percentiles.
+    Requires JWT authentication.
+    """
+    return AIAdvisorStatsResponse(**ai_advisor.stats())
+
+
+@router.get("/event-writer", response_model=EventWriterStatsResponse)
+async def get_event_writer_stats(
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Get write-behind event logger statistics for this worker.
+
+    Returns queue depth, flush counts and latencies, and how many
+    producers were blocked by a full queue or had events dropped.
+    Requires JWT authentication.
+    """
+    return EventWriterStatsResponse(**event_writer.stats())
+
+
+@router.get("/auth-cache", response_model=AuthCacheStatsResponse)
+async def get_auth_cache_stats(
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Get authentication cache statistics for this worker.
+
+    Returns size, hits, misses, evictions and expirations of the API key
+    cache and of the verified JWT cache, plus the bcrypt pool's hashes in
+    progress and how many completed, failed or were rejected because no
+    slot freed up within the queue timeout.
+    Requires JWT authentication.
+    """
+    return AuthCacheStatsResponse(
+        api_keys=api_key_cache.stats(),
+        tokens=principal_cache.stats(),
+        password_hasher=password_hasher.stats(),
+    )
@@ -2,7 +2,8 @@ from fastapi import APIRouter, HTTPException, status
 from typing import List
 
 from app.models.schemas import Policy, PolicyCreate, PolicyUpdate
-from app.adapters.memory_db import db
+from app.adapters import policy_db as db
+from app.core.policies import policy_engine
 from app.auth.jwt import require_jwt
 
 router = APIRouter(prefix="/policies", tags=["Policies"])
@@ -18,6 +19,7 @@ async def create_policy(
     Requires authentication.
     """
     policy = await db.create_policy(policy_data)
+    policy_engine.schedule_refresh()
     return policy
 
 
@@ -60,6 +62,7 @@ async def update_policy(
     policy = await db.update_policy(policy_id, policy_data)
     if not policy:
         raise HTTPException(status_code=404, detail="Policy not found")
+    policy_engine.schedule_refresh()
     return policy
 
 
@@ -75,4 +78,5 @@ async def delete_policy(
     deleted = await db.delete_policy(policy_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Policy not found")
+    policy_engine.schedule_refresh()
     return
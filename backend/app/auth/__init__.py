@@ -3,16 +3,31 @@ from .jwt import (
     decode_token,
     get_current_user,
     get_current_user_optional,
+    principal_cache,
 )
-from .api_key import generate_api_key, hash_api_key, get_api_key_user, require_api_key
+from .api_key import (
+    APIKeyCache,
+    api_key_cache,
+    generate_api_key,
+    hash_api_key,
+    get_api_key_user,
+    require_api_key,
+)
+from .passwords import PasswordHasher, PasswordHasherBusy, password_hasher
 
 __all__ = [
     "create_access_token",
     "decode_token",
     "get_current_user",
     "get_current_user_optional",
+    "principal_cache",
+    "APIKeyCache",
+    "api_key_cache",
     "generate_api_key",
     "hash_api_key",
     "get_api_key_user",
     "require_api_key",
+    "PasswordHasher",
+    "PasswordHasherBusy",
+    "password_hasher",
 ]
@@ -1,10 +1,13 @@
 import secrets
 import hashlib
+import time
 from typing import Optional
 from fastapi import HTTPException, Depends, status
 from fastapi.security import APIKeyHeader
 
 from app.adapters import db
+from app.config import settings
+from app.core.cache import SingleFlight, TTLCache
 
 api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
@@ -22,6 +25,81 @@ def hash_api_key(key: str) -> str:
     return hashlib.sha256(key.encode()).hexdigest()
 
 
+_MISSING = object()
+
+
+class APIKeyCache:
+    """
+    Key hash -> user cache in front of the two lookups behind every API key.
+
+    - Valid keys are cached for ttl, unknown keys (None) for the shorter
+      negative_ttl, so guessing traffic mostly stays off the database.
+      Concurrent misses for the same hash share one lookup.
+    - invalidate() drops everything; call it after deleting a key.
+    - Other workers' deletes are picked up through db.get_api_key_version(),
+      re-read at most every version_check_interval seconds.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        negative_ttl: float,
+        version_check_interval: float,
+    ):
+        self._cache = TTLCache(maxsize, ttl)
+        self.negative_ttl = negative_ttl
+        self.version_check_interval = version_check_interval
+        self._flights = SingleFlight()
+        self._version: Optional[int] = None
+        self._version_checked = float("-inf")
+        # Bumped by invalidate(); lookups that started before it don't store
+        self._generation = 0
+
+    def invalidate(self) -> None:
+        self._cache.clear()
+        self._generation += 1
+
+    async def _check_version(self) -> None:
+        now = time.monotonic()
+        if now - self._version_checked < self.version_check_interval:
+            return
+        self._version_checked = now
+        version = await db.get_api_key_version()
+        if self._version is not None and version != self._version:
+            self.invalidate()
+        self._version = version
+
+    async def _load(self, key_hash: str) -> Optional[dict]:
+        generation = self._generation
+        api_key_record = await db.get_api_key_by_hash(key_hash)
+        user = None
+        if api_key_record:
+            user = await db.get_user_by_id(api_key_record["user_id"])
+        if generation == self._generation:
+            ttl = None if user else self.negative_ttl
+            self._cache.set(key_hash, user, ttl)
+        return user
+
+    async def lookup(self, key_hash: str) -> Optional[dict]:
+        await self._check_version()
+        user = self._cache.get(key_hash, _MISSING)
+        if user is _MISSING:
+            user = await self._flights.do(key_hash, lambda: self._load(key_hash))
+        return user
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+api_key_cache = APIKeyCache(
+    maxsize=settings.AUTH_CACHE_SIZE,
+    ttl=settings.AUTH_CACHE_TTL_SECONDS,
+    negative_ttl=settings.AUTH_NEGATIVE_TTL_SECONDS,
+    version_check_interval=settings.AUTH_VERSION_CHECK_SECONDS,
+)
+
+
 async def get_api_key_user(
     api_key: Optional[str] = Depends(api_key_header),
 ) -> Optional[dict]:
@@ -29,14 +107,7 @@ async def get_api_key_user(
     if not api_key:
         return None
 
-    key_hash = hash_api_key(api_key)
-    api_key_record = await db.get_api_key_by_hash(key_hash)
-
-    if not api_key_record:
-        return None
-
-    user = await db.get_user_by_id(api_key_record["user_id"])
-    return user
+    return await api_key_cache.lookup(hash_api_key(api_key))
 
 
 async def require_api_key(api_key: Optional[str] = Depends(api_key_header)) -> dict:
@@ -1,14 +1,22 @@
 from datetime import datetime, timedelta
 from typing import Optional
+import time
 import jwt
 from fastapi import HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 from app.config import settings
 from app.adapters import db
+from app.core.cache import TTLCache
 
 security = HTTPBearer()
 
+# Verified token -> user. Entries never outlive the token's own exp claim,
+# so an expired token is always re-verified (and rejected).
+principal_cache = TTLCache(
+    maxsize=settings.JWT_CACHE_SIZE, ttl=settings.JWT_CACHE_TTL_SECONDS
+)
+
 
 def create_access_token(user_id: str, email: str) -> str:
     payload = {
@@ -42,6 +50,10 @@ async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
 ) -> dict:
     token = credentials.credentials
+    user = principal_cache.get(token)
+    if user is not None:
+        return user
+
     payload = decode_token(token)
     user_id = payload.get("sub")
 
@@ -58,6 +70,9 @@ async def get_current_user(
             detail="User not found",
         )
 
+    ttl = min(principal_cache.ttl, payload.get("exp", 0) - time.time())
+    if ttl > 0:
+        principal_cache.set(token, user, ttl)
     return user
 
 
@@ -0,0 +1,107 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+import asyncio
+
+import bcrypt
+
+from app.config import settings
+
+T = TypeVar("T")
+
+
+class PasswordHasherBusy(Exception):
+    """No hashing slot became free within the queue timeout."""
+
+
+class PasswordHasher:
+    """
+    bcrypt hashing and verification on a dedicated thread pool.
+
+    A bcrypt call holds a CPU for 100ms or more (bcrypt releases the GIL
+    meanwhile), so running it inline froze every other request on the
+    worker. Here at most max_workers run at once; further calls queue for a
+    slot and give up with PasswordHasherBusy after queue_timeout, so a login
+    burst degrades into fast rejections instead of unbounded latency.
+    A slot is held until its bcrypt call finishes, even if the request that
+    started it is cancelled first.
+    """
+
+    def __init__(self, rounds: int, max_workers: int, queue_timeout: float):
+        self.rounds = rounds
+        self.max_workers = max_workers
+        self.queue_timeout = queue_timeout
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._slots = asyncio.Semaphore(max_workers)
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    async def _run(self, func: Callable[..., T], *args) -> T:
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise PasswordHasherBusy() from None
+        try:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="bcrypt"
+                )
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._executor, func, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        self.running += 1
+        future.add_done_callback(self._finished)
+        # Shielded: a cancelled caller stops waiting, but the future (and the
+        # slot) only completes when the thread is done with the hash
+        return await asyncio.shield(future)
+
+    def _finished(self, future: asyncio.Future) -> None:
+        self._slots.release()
+        self.running -= 1
+        if future.cancelled():
+            return  # Never started (executor shut down)
+        if future.exception() is None:
+            self.completed += 1
+        else:
+            self.failed += 1
+
+    def _hash(self, password: str) -> str:
+        salt = bcrypt.gensalt(rounds=self.rounds)
+        return bcrypt.hashpw(password.encode(), salt).decode()
+
+    @staticmethod
+    def _verify(password: str, password_hash: str) -> bool:
+        # The cost factor comes from the hash, so older hashes still verify
+        return bcrypt.checkpw(password.encode(), password_hash.encode())
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self._hash, password)
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        return await self._run(self._verify, password, password_hash)
+
+    def stats(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        """Stop the worker threads (called on shutdown; restarted on next use)."""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher(
+    rounds=settings.BCRYPT_ROUNDS,
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    queue_timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS,
+)
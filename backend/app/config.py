@@ -19,17 +19,135 @@ class Settings:
     JWT_SECRET: str = get_jwt_secret()
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRATION_HOURS: int = 24
+    # Verified token -> user cache, per worker (entries also end at token exp)
+    JWT_CACHE_SIZE: int = int(os.getenv("JWT_CACHE_SIZE", "10000"))
+    JWT_CACHE_TTL_SECONDS: float = float(os.getenv("JWT_CACHE_TTL_SECONDS", "300"))
+
+    # Password hashing: bcrypt cost factor, concurrent hashes per worker and
+    # how long a login may wait for a free slot before getting a 503
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS: float = float(
+        os.getenv("PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS", "2")
+    )
+
+    # API key -> user cache; deletes by other workers show up within
+    # AUTH_VERSION_CHECK_SECONDS, unknown keys are remembered for
+    # AUTH_NEGATIVE_TTL_SECONDS
+    AUTH_CACHE_SIZE: int = int(os.getenv("AUTH_CACHE_SIZE", "10000"))
+    AUTH_CACHE_TTL_SECONDS: float = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))
+    AUTH_NEGATIVE_TTL_SECONDS: float = float(
+        os.getenv("AUTH_NEGATIVE_TTL_SECONDS", "5")
+    )
+    AUTH_VERSION_CHECK_SECONDS: float = float(
+        os.getenv("AUTH_VERSION_CHECK_SECONDS", "1")
+    )
 
     STRIPE_SECRET_KEY: str = os.getenv("STRIPE_SECRET_KEY", "")
     STRIPE_WEBHOOK_SECRET: str = os.getenv("STRIPE_WEBHOOK_SECRET", "")
 
     AI_API_KEY: str = os.getenv("AI_API_KEY", "")
     AI_ENABLED: bool = os.getenv("AI_ENABLED", "true").lower() == "true"
+    AI_API_URL: str = os.getenv("AI_API_URL", "")
+    AI_TIMEOUT_SECONDS: float = float(os.getenv("AI_TIMEOUT_SECONDS", "10"))
+    AI_HTTP2: bool = os.getenv("AI_HTTP2", "true").lower() == "true"
+    AI_MAX_CONNECTIONS: int = int(os.getenv("AI_MAX_CONNECTIONS", "100"))
+    AI_MAX_KEEPALIVE_CONNECTIONS: int = int(
+        os.getenv("AI_MAX_KEEPALIVE_CONNECTIONS", "20")
+    )
+    AI_KEEPALIVE_EXPIRY_SECONDS: float = float(
+        os.getenv("AI_KEEPALIVE_EXPIRY_SECONDS", "30")
+    )
+    AI_CACHE_SIZE: int = int(os.getenv("AI_CACHE_SIZE", "1024"))
+    AI_CACHE_TTL_SECONDS: float = float(os.getenv("AI_CACHE_TTL_SECONDS", "300"))
+
+    # Per-request deadline; the AI wait may use at most AI_BUDGET_SHARE of it
+    ACTION_DEADLINE_SECONDS: float = float(os.getenv("ACTION_DEADLINE_SECONDS", "5"))
+    AI_BUDGET_SHARE: float = float(os.getenv("AI_BUDGET_SHARE", "0.5"))
+
+    AI_BREAKER_WINDOW: int = int(os.getenv("AI_BREAKER_WINDOW", "50"))
+    AI_BREAKER_MIN_REQUESTS: int = int(os.getenv("AI_BREAKER_MIN_REQUESTS", "10"))
+    AI_BREAKER_ERROR_RATE: float = float(os.getenv("AI_BREAKER_ERROR_RATE", "0.5"))
+    AI_BREAKER_LATENCY_SECONDS: float = float(
+        os.getenv("AI_BREAKER_LATENCY_SECONDS", "2")
+    )
+    AI_BREAKER_LATENCY_PERCENTILE: float = float(
+        os.getenv("AI_BREAKER_LATENCY_PERCENTILE", "0.95")
+    )
+    AI_BREAKER_OPEN_SECONDS: float = float(os.getenv("AI_BREAKER_OPEN_SECONDS", "30"))
+    AI_BREAKER_HALF_OPEN_PROBES: int = int(
+        os.getenv("AI_BREAKER_HALF_OPEN_PROBES", "3")
+    )
+
+    ACTION_BATCH_MAX_SIZE: int = int(os.getenv("ACTION_BATCH_MAX_SIZE", "1000"))
+
+    # Write-behind event logging (events are appended by a background flusher)
+    EVENT_WRITE_BEHIND: bool = (
+        os.getenv("EVENT_WRITE_BEHIND", "false").lower() == "true"
+    )
+    EVENT_QUEUE_SIZE: int = int(os.getenv("EVENT_QUEUE_SIZE", "10000"))
+    EVENT_BATCH_SIZE: int = int(os.getenv("EVENT_BATCH_SIZE", "500"))
+    EVENT_FLUSH_INTERVAL_SECONDS: float = float(
+        os.getenv("EVENT_FLUSH_INTERVAL_SECONDS", "0.05")
+    )
+    # 0 = producers wait for queue space indefinitely; >0 = fail with 503 after
+    EVENT_ENQUEUE_TIMEOUT_SECONDS: float = float(
+        os.getenv("EVENT_ENQUEUE_TIMEOUT_SECONDS", "0")
+    )
+    # Failed flushes are retried until they succeed, backing off up to this
+    EVENT_FLUSH_MAX_BACKOFF_SECONDS: float = float(
+        os.getenv("EVENT_FLUSH_MAX_BACKOFF_SECONDS", "5")
+    )
+    # Attempts at shutdown before events that can't be stored are dropped
+    EVENT_SHUTDOWN_FLUSH_RETRIES: int = int(
+        os.getenv("EVENT_SHUTDOWN_FLUSH_RETRIES", "3")
+    )
+
+    # Time-bucketed decision rollups (ring sizes per tier)
+    ROLLUP_MINUTE_SLOTS: int = int(os.getenv("ROLLUP_MINUTE_SLOTS", "1440"))
+    ROLLUP_HOUR_SLOTS: int = int(os.getenv("ROLLUP_HOUR_SLOTS", "720"))
+    ROLLUP_DAY_SLOTS: int = int(os.getenv("ROLLUP_DAY_SLOTS", "365"))
+    ROLLUP_MAX_POINTS: int = int(os.getenv("ROLLUP_MAX_POINTS", "1440"))
+    # Distinct values tracked per breakdown dimension (Space-Saving past that)
+    BREAKDOWN_MAX_KEYS: int = int(os.getenv("BREAKDOWN_MAX_KEYS", "10000"))
+    # Approximate audit analytics (HyperLogLog / count-min / top-k, per day)
+    SKETCH_HLL_PRECISION: int = int(os.getenv("SKETCH_HLL_PRECISION", "14"))
+    SKETCH_CMS_WIDTH: int = int(os.getenv("SKETCH_CMS_WIDTH", "2048"))
+    SKETCH_CMS_DEPTH: int = int(os.getenv("SKETCH_CMS_DEPTH", "4"))
+    SKETCH_TOP_K: int = int(os.getenv("SKETCH_TOP_K", "50"))
+    SKETCH_RETENTION_DAYS: int = int(os.getenv("SKETCH_RETENTION_DAYS", "30"))
+    # Rollups, breakdowns and sketches shared between workers via the database
+    METRICS_SYNC_INTERVAL_SECONDS: float = float(
+        os.getenv("METRICS_SYNC_INTERVAL_SECONDS", "5")
+    )
+    # A worker whose heartbeat hasn't moved this long has its metrics retired
+    METRICS_SYNC_STALE_SECONDS: float = float(
+        os.getenv("METRICS_SYNC_STALE_SECONDS", "30")
+    )
 
     DB_BACKEND: str = os.getenv("DB_BACKEND", "inmemory")
 
+    # DB_BACKEND=log: durable append-only event log on local disk
+    LOG_DIR: str = os.getenv("LOG_DIR", "data/eventlog")
+    LOG_SEGMENT_BYTES: int = int(os.getenv("LOG_SEGMENT_BYTES", str(64 * 2**20)))
+    LOG_FSYNC: bool = os.getenv("LOG_FSYNC", "true").lower() == "true"
+
+    # DB_BACKEND=sqlite: one WAL-mode database file shared by all workers
+    SQLITE_PATH: str = os.getenv("SQLITE_PATH", "data/ulucore.db")
+    SQLITE_READERS: int = int(os.getenv("SQLITE_READERS", "4"))
+
+    # DB_BACKEND=postgres: direct connection via psycopg's async pool
+    DATABASE_URL: str = os.getenv("DATABASE_URL", "")
+    PG_POOL_MIN_SIZE: int = int(os.getenv("PG_POOL_MIN_SIZE", "1"))
+    PG_POOL_MAX_SIZE: int = int(os.getenv("PG_POOL_MAX_SIZE", "10"))
+
     SUPABASE_URL: str = os.getenv("SUPABASE_URL", "")
     SUPABASE_KEY: str = os.getenv("SUPABASE_KEY", "")
+    # Requests in flight to PostgREST at once (also the connection pool size)
+    SUPABASE_MAX_CONCURRENCY: int = int(os.getenv("SUPABASE_MAX_CONCURRENCY", "20"))
+    SUPABASE_TIMEOUT_SECONDS: float = float(
+        os.getenv("SUPABASE_TIMEOUT_SECONDS", "10")
+    )
 
     CORS_ORIGINS: list[str] = os.getenv("CORS_ORIGINS", "*").split(",")
 
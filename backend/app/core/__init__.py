@@ -1,6 +1,11 @@
 from .engine import ActionEngine, action_engine
 from .policies import PolicyEngine, policy_engine
 from .ai_advisor import AIAdvisor, ai_advisor
+from .event_writer import EventWriter, event_writer
+from .rollups import MetricRollups, metric_rollups
+from .breakdowns import MetricBreakdowns, metric_breakdowns
+from .sketches import AuditSketches, audit_sketches
+from .metric_sync import MetricSync, metric_sync
 
 __all__ = [
     "ActionEngine",
@@ -9,4 +14,14 @@ __all__ = [
     "policy_engine",
     "AIAdvisor",
     "ai_advisor",
+    "EventWriter",
+    "event_writer",
+    "MetricRollups",
+    "metric_rollups",
+    "MetricBreakdowns",
+    "metric_breakdowns",
+    "AuditSketches",
+    "audit_sketches",
+    "MetricSync",
+    "metric_sync",
 ]
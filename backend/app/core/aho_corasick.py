@@ -0,0 +1,77 @@
+from collections import deque
+from typing import Iterable
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick automaton over a fixed list of patterns.
+
+    search() scans a text once and returns the ids (list positions) of every
+    pattern occurring in it, independent of how many patterns there are.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[list[int]] = [[]]
+        # Nearest node on the fail chain that ends a pattern (0 = none)
+        self._dict_link: list[int] = [0]
+
+        count = 0
+        for pattern_id, pattern in enumerate(patterns):
+            self._add(pattern, pattern_id)
+            count += 1
+        self._pattern_count = count
+        self._build_links()
+
+    def __len__(self) -> int:
+        return self._pattern_count
+
+    def _add(self, pattern: str, pattern_id: int) -> None:
+        state = 0
+        for char in pattern:
+            nxt = self._goto[state].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._dict_link.append(0)
+            state = nxt
+        self._out[state].append(pattern_id)
+
+    def _build_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+                if fail == nxt:
+                    fail = 0
+                self._fail[nxt] = fail
+                self._dict_link[nxt] = (
+                    fail if self._out[fail] else self._dict_link[fail]
+                )
+
+    def search(self, text: str) -> set[int]:
+        """Return the ids of all patterns that occur in text."""
+        goto, fail, out, dict_link = self._goto, self._fail, self._out, self._dict_link
+        found = set(out[0])  # the empty pattern matches everything
+        seen: set[int] = set()
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            node = state if out[state] else dict_link[state]
+            # Nodes already reported had their whole dict chain reported too
+            while node and node not in seen:
+                seen.add(node)
+                found.update(out[node])
+                node = dict_link[node]
+        return found
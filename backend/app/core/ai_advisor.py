@@ -1,8 +1,14 @@
 from typing import Optional
+import asyncio
+import hashlib
+import json
 import logging
+import time
 import httpx
 
 from app.config import settings
+from app.core.cache import SingleFlight, TTLCache
+from app.core.circuit_breaker import CircuitBreaker, CircuitOpenError, CircuitState
 from app.models.schemas import ActionRequest
 
 logger = logging.getLogger(__name__)
@@ -23,17 +29,68 @@ class AIAdvisor:
     def __init__(self):
         self._enabled = settings.AI_ENABLED
         self._api_key = settings.AI_API_KEY
+        self._api_url = settings.AI_API_URL or GROK_API_URL
+        self._client: Optional[httpx.AsyncClient] = None
+        self._cache = TTLCache(
+            maxsize=settings.AI_CACHE_SIZE, ttl=settings.AI_CACHE_TTL_SECONDS
+        )
+        self._inflight = SingleFlight()
+        self._breaker = CircuitBreaker(
+            name="AI",
+            window_size=settings.AI_BREAKER_WINDOW,
+            min_requests=settings.AI_BREAKER_MIN_REQUESTS,
+            error_rate_threshold=settings.AI_BREAKER_ERROR_RATE,
+            latency_threshold=settings.AI_BREAKER_LATENCY_SECONDS,
+            latency_percentile=settings.AI_BREAKER_LATENCY_PERCENTILE,
+            open_seconds=settings.AI_BREAKER_OPEN_SECONDS,
+            half_open_probes=settings.AI_BREAKER_HALF_OPEN_PROBES,
+        )
+
+    def _build_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            timeout=settings.AI_TIMEOUT_SECONDS,
+            http2=settings.AI_HTTP2,
+            limits=httpx.Limits(
+                max_connections=settings.AI_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.AI_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.AI_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+            headers={
+                "Authorization": f"Bearer {self._api_key}",
+                "Content-Type": "application/json",
+            },
+        )
+
+    async def start(self) -> None:
+        """Open the pooled keep-alive client (called on app startup)."""
+        if self._client is None:
+            self._client = self._build_client()
+
+    async def aclose(self) -> None:
+        """Close the pooled client and its connections (called on shutdown)."""
+        client, self._client = self._client, None
+        if client is not None:
+            await client.aclose()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # Opened lazily when used outside the app lifespan (scripts, workers)
+        if self._client is None:
+            self._client = self._build_client()
+        return self._client
 
     async def get_recommendation(
-        self, request: ActionRequest
+        self, request: ActionRequest, deadline: Optional[float] = None
     ) -> tuple[Optional[str], bool]:
         """
         Get AI recommendation for an action.
 
+        deadline is a time.monotonic() instant the AI wait must not pass.
+
         Returns:
             tuple[Optional[str], bool]: (recommendation, ai_available)
 
-        If AI fails or is disabled, returns (None, False) - system continues!
+        If AI fails, is disabled, is over budget or its circuit is open,
+        returns (None, False) - system continues!
         """
         if not self._enabled:
             logger.info("AI advisor is disabled")
@@ -43,18 +100,81 @@ class AIAdvisor:
             logger.warning("AI API key not configured - continuing without AI")
             return None, False
 
+        key = self._fingerprint(request)
+        recommendation = self._cache.get(key)
+        if recommendation is not None:
+            return recommendation, True
+
         try:
-            recommendation = await self._call_grok_api(request)
+            recommendation = await self._inflight.do(
+                key, lambda: self._fetch(key, request, deadline)
+            )
             return recommendation, True
+        except CircuitOpenError:
+            return None, False
         except Exception as e:
-            logger.error(f"AI service error (fail-safe activated): {e}")
+            logger.error(f"AI service error (fail-safe activated): {e!r}")
             return None, False
 
+    @staticmethod
+    def _fingerprint(request: ActionRequest) -> str:
+        """Normalized key over every request field the prompt uses."""
+        payload = json.dumps(
+            [
+                request.action_type,
+                request.resource_id,
+                request.user_id,
+                request.metadata or None,
+            ],
+            sort_keys=True,
+            separators=(",", ":"),
+            default=str,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    async def _fetch(
+        self, key: str, request: ActionRequest, deadline: Optional[float]
+    ) -> str:
+        started = time.monotonic()
+        timeout = None if deadline is None else deadline - started
+        if timeout is not None and timeout <= 0:
+            # Nothing was sent, so the breaker doesn't hear about it
+            raise asyncio.TimeoutError("AI latency budget exhausted")
+        admission = self._breaker.allow()
+        if admission is None:
+            raise CircuitOpenError("AI circuit is open")
+
+        try:
+            recommendation = await asyncio.wait_for(
+                self._call_grok_api(request), timeout
+            )
+        except asyncio.CancelledError:
+            # Abandoned (e.g. a policy decided) - not a verdict on the AI
+            self._breaker.release(admission)
+            raise
+        except asyncio.TimeoutError:
+            # Cut short by the caller's budget: only a verdict on the AI if
+            # it had already taken longer than the breaker tolerates
+            elapsed = time.monotonic() - started
+            if elapsed >= self._breaker.latency_threshold:
+                self._breaker.record_failure(admission, elapsed)
+            else:
+                self._breaker.release(admission)
+            raise
+        except Exception:
+            self._breaker.record_failure(admission, time.monotonic() - started)
+            raise
+        self._breaker.record_success(admission, time.monotonic() - started)
+
+        # Only successful answers are cached - failures stay fail-safe
+        self._cache.set(key, recommendation)
+        return recommendation
+
     async def _call_grok_api(self, request: ActionRequest) -> str:
         """
         Call Grok API for AI recommendation.
 
-        Uses OpenAI-compatible API format.
+        Uses OpenAI-compatible API format over the shared pooled client.
         """
         prompt = f"""You are a security advisor for an action decision engine. 
 Analyze this action request and provide a brief recommendation (1-2 sentences).
@@ -71,33 +191,41 @@ Respond with either:
 
 Be concise and focus on security implications."""
 
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.post(
-                GROK_API_URL,
-                headers={
-                    "Authorization": f"Bearer {self._api_key}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": "grok-beta",
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": "You are a security advisor. Be concise.",
-                        },
-                        {"role": "user", "content": prompt},
-                    ],
-                    "max_tokens": 100,
-                    "temperature": 0.3,
-                },
-            )
-            response.raise_for_status()
-            data = response.json()
-            return data["choices"][0]["message"]["content"].strip()
+        response = await self._get_client().post(
+            self._api_url,
+            json={
+                "model": "grok-beta",
+                "messages": [
+                    {
+                        "role": "system",
+                        "content": "You are a security advisor. Be concise.",
+                    },
+                    {"role": "user", "content": prompt},
+                ],
+                "max_tokens": 100,
+                "temperature": 0.3,
+            },
+        )
+        response.raise_for_status()
+        data = response.json()
+        return data["choices"][0]["message"]["content"].strip()
 
     def is_available(self) -> bool:
         """Check if AI service is available"""
-        return self._enabled and bool(self._api_key)
+        return (
+            self._enabled
+            and bool(self._api_key)
+            and self._breaker.state != CircuitState.OPEN
+        )
+
+    def stats(self) -> dict:
+        """Cache, request coalescing and circuit breaker counters"""
+        return {
+            "cache": self._cache.stats(),
+            "circuit_breaker": self._breaker.stats(),
+            "coalesced_requests": self._inflight.coalesced,
+            "in_flight": len(self._inflight),
+        }
 
 
 ai_advisor = AIAdvisor()
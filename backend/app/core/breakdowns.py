@@ -0,0 +1,193 @@
+from typing import Callable, Iterable, Optional
+import heapq
+import json
+
+from app.config import settings
+from app.core.rollups import (
+    AI_UNAVAILABLE,
+    APPROVED,
+    REJECTED,
+    TOTAL,
+    decision_counts,
+)
+from app.domain.event import Event
+from app.models.schemas import BreakdownDimension
+
+NO_POLICY_KEY = "__none__"
+
+_SORT_INDEX = {None: TOTAL, "approve": APPROVED, "reject": REJECTED}
+
+
+def _policy_key(event: Event) -> str:
+    if event.trace and event.trace.triggered_policy:
+        return event.trace.triggered_policy.id
+    return NO_POLICY_KEY
+
+
+_KEY_FUNCS: dict[BreakdownDimension, Callable[[Event], str]] = {
+    BreakdownDimension.ACTION_TYPE: lambda event: event.action_type,
+    BreakdownDimension.POLICY: _policy_key,
+    BreakdownDimension.USER: lambda event: event.user_id,
+}
+
+
+class DimensionCounter:
+    """
+    Decision counts per value of one dimension, for at most max_keys values.
+
+    Space-Saving: once max_keys values are tracked, a new value takes over
+    the slot of the value with the fewest events, inheriting its counts as
+    error. Memory stays bounded however many distinct users or action types
+    show up, counts never undercount and overcount by at most the recorded
+    error, and any value with more events than the smallest tracked count
+    is tracked - so the top values stay right whenever they show up.
+    """
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._counts: dict[str, list[int]] = {}
+        self._errors: dict[str, list[int]] = {}
+        # (total, key) per tracked key; totals only grow, so an entry may be
+        # stale (too low) but never too high, and is refreshed when popped
+        self._heap: list[tuple[int, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def add(self, key: str, counts: list[int]) -> None:
+        slot = self._counts.get(key)
+        if slot is None:
+            if len(self._counts) >= self.max_keys:
+                slot = self._evict_min(key)
+            else:
+                slot = self._counts[key] = [0, 0, 0, 0]
+                heapq.heappush(self._heap, (0, key))
+        for i, value in enumerate(counts):
+            slot[i] += value
+
+    def _evict_min(self, key: str) -> list[int]:
+        """Hand the slot of the value with the fewest events over to key."""
+        heap = self._heap
+        while True:
+            total, victim = heap[0]
+            current = self._counts[victim][TOTAL]
+            if current == total:
+                break
+            heapq.heapreplace(heap, (current, victim))
+        slot = self._counts.pop(victim)
+        self._errors.pop(victim, None)
+        self._counts[key] = slot
+        self._errors[key] = list(slot)
+        heapq.heapreplace(heap, (total, key))
+        return slot
+
+    def to_dict(self) -> dict:
+        return {"counts": self._counts, "errors": self._errors}
+
+    def merge(self, snapshot: dict) -> None:
+        """
+        Add a to_dict() snapshot: counts and errors of shared values add up,
+        and past max_keys the values with the fewest events are let go.
+        """
+        for key, counts in snapshot["counts"].items():
+            slot = self._counts.setdefault(key, [0, 0, 0, 0])
+            for i, value in enumerate(counts):
+                slot[i] += value
+        for key, errors in snapshot["errors"].items():
+            slot = self._errors.setdefault(key, [0, 0, 0, 0])
+            for i, value in enumerate(errors):
+                slot[i] += value
+        if len(self._counts) > self.max_keys:
+            kept = heapq.nlargest(
+                self.max_keys, self._counts.items(), key=lambda item: item[1][TOTAL]
+            )
+            self._counts = dict(kept)
+            self._errors = {
+                key: errors
+                for key, errors in self._errors.items()
+                if key in self._counts
+            }
+        self._heap = [(counts[TOTAL], key) for key, counts in self._counts.items()]
+        heapq.heapify(self._heap)
+
+    def top(self, limit: int, decision: Optional[str] = None) -> list[dict]:
+        """The `limit` values with the most events (of `decision`, if given)."""
+        index = _SORT_INDEX[decision]
+        top = heapq.nlargest(
+            limit,
+            (item for item in self._counts.items() if item[1][index]),
+            key=lambda item: item[1][index],
+        )
+        return [self._row(key, counts, index) for key, counts in top]
+
+    def _row(self, key: str, counts: list[int], index: int) -> dict:
+        error = self._errors.get(key)
+        return {
+            "key": key,
+            "total_actions": counts[TOTAL],
+            "approved_count": counts[APPROVED],
+            "rejected_count": counts[REJECTED],
+            "ai_unavailable_count": counts[AI_UNAVAILABLE],
+            "overcount": error[index] if error else 0,
+        }
+
+
+class MetricBreakdowns:
+    """
+    Decision counts broken down by action_type, triggered policy and user,
+    updated as events are logged. Per worker process, reset on restart;
+    workers sharing a database combine theirs with to_bytes/merge.
+    """
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self.dimensions = {
+            dimension: DimensionCounter(max_keys) for dimension in BreakdownDimension
+        }
+        # Bumped on every change, so unchanged state isn't republished
+        self.version = 0
+
+    def record(self, events: Iterable[Event]) -> None:
+        for event in events:
+            counts = decision_counts(event)
+            for dimension, counter in self.dimensions.items():
+                counter.add(_KEY_FUNCS[dimension](event), counts)
+        self.version += 1
+
+    def clear(self) -> None:
+        self.dimensions = self.empty().dimensions
+        self.version += 1
+
+    def empty(self) -> "MetricBreakdowns":
+        return MetricBreakdowns(self.max_keys)
+
+    def to_bytes(self) -> bytes:
+        return json.dumps(
+            {
+                dimension.value: counter.to_dict()
+                for dimension, counter in self.dimensions.items()
+            }
+        ).encode()
+
+    def merge(self, data: bytes) -> None:
+        """Add the counts of a to_bytes() snapshot."""
+        for dimension, snapshot in json.loads(data).items():
+            self.dimensions[BreakdownDimension(dimension)].merge(snapshot)
+
+    def breakdown(
+        self,
+        dimension: BreakdownDimension,
+        limit: int = 10,
+        decision: Optional[str] = None,
+    ) -> dict:
+        counter = self.dimensions[dimension]
+        return {
+            "dimension": dimension,
+            "decision": decision,
+            "tracked_keys": len(counter),
+            "max_keys": counter.max_keys,
+            "items": counter.top(limit, decision),
+        }
+
+
+metric_breakdowns = MetricBreakdowns(max_keys=settings.BREAKDOWN_MAX_KEYS)
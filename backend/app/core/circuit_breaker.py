@@ -0,0 +1,193 @@
+from collections import deque
+from enum import Enum
+from typing import Callable, Optional
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is refused because the circuit is open."""
+
+
+class Admission:
+    """
+    A call let through by CircuitBreaker.allow(); hand it back with the
+    outcome. probe_round is the half-open round whose probe slot it holds,
+    0 for a call admitted while closed.
+    """
+
+    __slots__ = ("probe_round",)
+
+    def __init__(self, probe_round: int = 0):
+        self.probe_round = probe_round
+
+
+def _percentile(sorted_values: list[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[rank]
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker over a rolling window of call outcomes.
+
+    - CLOSED: calls flow; the circuit trips once the window holds at least
+      min_requests outcomes and either the error rate or the latency
+      percentile crosses its threshold.
+    - OPEN: calls are refused immediately for open_seconds.
+    - HALF_OPEN: up to half_open_probes calls are let through; if all of
+      them succeed within the latency threshold the circuit closes, any
+      failure or slow probe re-opens it.
+
+    allow() returns an Admission (or None when refused) that goes back with
+    the call's outcome, so a call admitted before the circuit opened that
+    finishes during a half-open round neither frees nor counts as a probe.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window_size: int = 50,
+        min_requests: int = 10,
+        error_rate_threshold: float = 0.5,
+        latency_threshold: float = 5.0,
+        latency_percentile: float = 0.95,
+        open_seconds: float = 30.0,
+        half_open_probes: int = 3,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.min_requests = min_requests
+        self.error_rate_threshold = error_rate_threshold
+        self.latency_threshold = latency_threshold
+        self.latency_percentile = latency_percentile
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self._clock = clock
+
+        self._window: deque[tuple[bool, float]] = deque(maxlen=window_size)
+        self._state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        self._round = 0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+
+        self.times_opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> CircuitState:
+        if (
+            self._state == CircuitState.OPEN
+            and self._clock() - self._opened_at >= self.open_seconds
+        ):
+            self._state = CircuitState.HALF_OPEN
+            self._round += 1
+            self._probes_in_flight = 0
+            self._probe_successes = 0
+        return self._state
+
+    def allow(self) -> Optional[Admission]:
+        """
+        Admit a call now (reserving a probe slot if half-open), or None if
+        the circuit refuses it.
+        """
+        state = self.state
+        if state == CircuitState.CLOSED:
+            return Admission()
+        if (
+            state == CircuitState.HALF_OPEN
+            and self._probes_in_flight < self.half_open_probes
+        ):
+            self._probes_in_flight += 1
+            return Admission(self._round)
+        self.rejected += 1
+        return None
+
+    def _holds_probe(self, admission: Admission) -> bool:
+        return (
+            self._state == CircuitState.HALF_OPEN
+            and admission.probe_round == self._round
+        )
+
+    def release(self, admission: Admission) -> None:
+        """Give back the probe slot of a call abandoned without an outcome."""
+        if self._holds_probe(admission) and self._probes_in_flight:
+            self._probes_in_flight -= 1
+        admission.probe_round = 0
+
+    def record_success(self, admission: Admission, latency: float) -> None:
+        self._record(admission, True, latency)
+
+    def record_failure(self, admission: Admission, latency: float) -> None:
+        self._record(admission, False, latency)
+
+    def _record(self, admission: Admission, ok: bool, latency: float) -> None:
+        if self._state == CircuitState.HALF_OPEN:
+            if not self._holds_probe(admission):
+                # Admitted before the circuit opened: says nothing about
+                # whether the service has recovered since
+                return
+            self.release(admission)
+            if not ok or latency >= self.latency_threshold:
+                self._trip("probe failed")
+                return
+            self._probe_successes += 1
+            if self._probe_successes >= self.half_open_probes:
+                self._state = CircuitState.CLOSED
+                self._window.clear()
+                logger.info(f"{self.name} circuit breaker closed")
+            return
+
+        if self._state == CircuitState.OPEN:
+            return
+
+        self._window.append((ok, latency))
+        if len(self._window) < self.min_requests:
+            return
+        error_rate = self._error_rate()
+        if error_rate >= self.error_rate_threshold:
+            self._trip(f"error rate {error_rate:.0%}")
+            return
+        latency_pct = _percentile(self._sorted_latencies(), self.latency_percentile)
+        if latency_pct >= self.latency_threshold:
+            self._trip(f"p{self.latency_percentile * 100:g} latency {latency_pct:.2f}s")
+
+    def _trip(self, cause: str) -> None:
+        self._state = CircuitState.OPEN
+        self._opened_at = self._clock()
+        self._probes_in_flight = 0
+        self.times_opened += 1
+        logger.warning(f"{self.name} circuit breaker opened: {cause}")
+
+    def _error_rate(self) -> float:
+        if not self._window:
+            return 0.0
+        return sum(1 for ok, _ in self._window if not ok) / len(self._window)
+
+    def _sorted_latencies(self) -> list[float]:
+        return sorted(latency for _, latency in self._window)
+
+    def stats(self) -> dict:
+        latencies = self._sorted_latencies()
+        return {
+            "state": self.state.value,
+            "window_size": len(self._window),
+            "error_rate": self._error_rate(),
+            "latency_p50": _percentile(latencies, 0.50),
+            "latency_p95": _percentile(latencies, 0.95),
+            "latency_p99": _percentile(latencies, 0.99),
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
+
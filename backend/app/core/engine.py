@@ -1,16 +1,26 @@
 from datetime import datetime
-import uuid
+from typing import Optional
+import asyncio
+import time
 
 from app.models.schemas import (
+    ActionDecision,
     ActionRequest,
     ActionResponse,
     DecisionTrace,
+    Policy,
     TriggeredPolicyInfo,
 )
 from app.domain.event import Event
+from app.domain.ids import new_ulid
 from app.adapters import db
 from app.core.policies import policy_engine
 from app.core.ai_advisor import ai_advisor
+from app.core.event_writer import event_writer
+from app.core.rollups import metric_rollups
+from app.core.breakdowns import metric_breakdowns
+from app.core.sketches import audit_sketches
+from app.config import settings
 
 
 class ActionEngine:
@@ -19,29 +29,93 @@ class ActionEngine:
 
     Flow:
     1. Receive action request
-    2. Get AI recommendation (fail-safe if unavailable)
-    3. Policy Engine makes decision
-    4. Log immutable event
+    2. Start AI recommendation in the background (fail-safe if unavailable,
+       bounded by a share of the request deadline)
+    3. Policy Engine matches deterministic policies
+       - match: AI call is cancelled, its answer would be ignored anyway
+       - no match: await the AI recommendation for the fallback decision
+    4. Log immutable event (inline, or queued when EVENT_WRITE_BEHIND is on)
+       and feed it to the time-bucketed, dimensional and sketch metrics
     5. Return response
     """
 
-    async def process_action(self, request: ActionRequest) -> ActionResponse:
-        """Process an action request and return decision"""
+    def __init__(self):
+        # Queued events only count towards the metrics once they're stored
+        event_writer.add_listener(self._record_metrics)
+
+    async def _log_events(self, events: list[Event]) -> None:
+        if settings.EVENT_WRITE_BEHIND:
+            await event_writer.submit(events)
+        else:
+            await db.create_events(events)
+            self._record_metrics(events)
+
+    @staticmethod
+    def _record_metrics(events: list[Event]) -> None:
+        metric_rollups.record(events)
+        metric_breakdowns.record(events)
+        audit_sketches.record(events)
 
-        ai_recommendation, ai_available = await ai_advisor.get_recommendation(request)
+    def _ai_deadline(self) -> float:
+        """Monotonic instant by which the AI wait must be over."""
+        budget = settings.ACTION_DEADLINE_SECONDS * settings.AI_BUDGET_SHARE
+        return time.monotonic() + budget
 
-        decision, reason, policy_id = await policy_engine.evaluate(
-            request, ai_recommendation
+    def _start_recommendation(
+        self, request: ActionRequest, deadline: float
+    ) -> asyncio.Task:
+        return asyncio.create_task(ai_advisor.get_recommendation(request, deadline))
+
+    def _skip_recommendation(self, task: asyncio.Task) -> tuple[Optional[str], bool]:
+        """Cancel an AI call a deterministic policy made redundant."""
+        task.cancel()
+        # Skipped is not the same as unavailable - don't count it as an outage
+        return None, ai_advisor.is_available()
+
+    def _decide_by_policy(
+        self, request: ActionRequest, policy: Policy, ai_task: asyncio.Task
+    ) -> tuple[Event, ActionResponse]:
+        ai_recommendation, ai_available = self._skip_recommendation(ai_task)
+        return self._build_decision(
+            request,
+            policy.decision,
+            policy.reason,
+            policy.id,
+            ai_recommendation,
+            ai_available,
         )
 
+    def _decide_by_fallback(
+        self,
+        request: ActionRequest,
+        ai_recommendation: Optional[str],
+        ai_available: bool,
+    ) -> tuple[Event, ActionResponse]:
+        decision, reason, policy_id = policy_engine.fallback(ai_recommendation)
+        return self._build_decision(
+            request, decision, reason, policy_id, ai_recommendation, ai_available
+        )
+
+    def _build_decision(
+        self,
+        request: ActionRequest,
+        decision: ActionDecision,
+        reason: str,
+        policy_id: Optional[str],
+        ai_recommendation: Optional[str],
+        ai_available: bool,
+    ) -> tuple[Event, ActionResponse]:
+        """Build the immutable event and the response for one decision"""
+
         # Create the decision trace
         trace = DecisionTrace(ai_recommendation_summary=ai_recommendation)
         if policy_id:
             trace.triggered_policy = TriggeredPolicyInfo(id=policy_id, reason=reason)
 
-        # Log the immutable event
+        # ULID ids sort in decision order, which keyset pagination relies on
+        timestamp = datetime.utcnow()
         event = Event(
-            id=str(uuid.uuid4()),
+            id=new_ulid(timestamp),
             action_type=request.action_type,
             resource_id=request.resource_id,
             user_id=request.user_id,
@@ -50,20 +124,88 @@ class ActionEngine:
             ai_recommendation=ai_recommendation,
             ai_available=ai_available,
             metadata=request.metadata,
-            timestamp=datetime.utcnow(),
+            timestamp=timestamp,
             trace=trace,
         )
 
-        await db.create_event(event)
-
-        # Return the structured response
-        return ActionResponse(
+        response = ActionResponse(
             decision_id=event.id,
             decision=decision,
             trace=trace,
             ai_available=ai_available,
             timestamp=event.timestamp,
         )
+        return event, response
+
+    async def process_action(self, request: ActionRequest) -> ActionResponse:
+        """Process an action request and return decision"""
+
+        ai_task = self._start_recommendation(request, self._ai_deadline())
+        try:
+            snapshot = await policy_engine.get_snapshot()
+        except BaseException:
+            ai_task.cancel()
+            raise
+
+        policy = policy_engine.match(snapshot, request)
+        if policy:
+            event, response = self._decide_by_policy(request, policy, ai_task)
+        else:
+            ai_recommendation, ai_available = await ai_task
+            event, response = self._decide_by_fallback(
+                request, ai_recommendation, ai_available
+            )
+
+        # Log the immutable event
+        await self._log_events([event])
+
+        return response
+
+    async def process_actions(
+        self, requests: list[ActionRequest]
+    ) -> list[ActionResponse]:
+        """
+        Process a batch of action requests, returning decisions in order.
+
+        One policy snapshot is used for the whole batch, AI lookups run
+        concurrently (only for requests no policy decides) and all events are
+        appended in a single bulk write.
+        """
+        if not requests:
+            return []
+
+        deadline = self._ai_deadline()
+        ai_tasks = [
+            self._start_recommendation(request, deadline) for request in requests
+        ]
+        try:
+            snapshot = await policy_engine.get_snapshot()
+        except BaseException:
+            for task in ai_tasks:
+                task.cancel()
+            raise
+
+        decisions: list[Optional[tuple[Event, ActionResponse]]] = []
+        undecided: list[int] = []
+        for position, (request, ai_task) in enumerate(zip(requests, ai_tasks)):
+            policy = policy_engine.match(snapshot, request)
+            if policy:
+                decisions.append(self._decide_by_policy(request, policy, ai_task))
+            else:
+                decisions.append(None)
+                undecided.append(position)
+
+        recommendations = await asyncio.gather(*(ai_tasks[i] for i in undecided))
+        for position, (ai_recommendation, ai_available) in zip(
+            undecided, recommendations
+        ):
+            decisions[position] = self._decide_by_fallback(
+                requests[position], ai_recommendation, ai_available
+            )
+
+        await self._log_events([event for event, _ in decisions])
+
+        return [response for _, response in decisions]
 
 
 action_engine = ActionEngine()
@@ -0,0 +1,303 @@
+from typing import Callable, Optional
+import asyncio
+import logging
+import time
+
+from app.adapters import db
+from app.adapters.base_db import BaseDatabase
+from app.config import settings
+from app.domain.event import Event
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class EventQueueFull(Exception):
+    """The queue stayed full for longer than the enqueue timeout."""
+
+
+class EventWriter:
+    """
+    Write-behind event logger.
+
+    Decisions enqueue their events into a bounded in-process queue and a
+    background task appends them to the database in batches - flushed when
+    a batch is full or flush_interval has passed. Events are only ever
+    appended (in submission order) and an accepted event is never given
+    up while the app runs, so the immutable audit log guarantee holds;
+    events simply land a few milliseconds later.
+
+    - A failed batch is held and retried with backoff (capped at
+      max_backoff) until the database takes it. Meanwhile the queue fills
+      up and producers wait, so an outage turns into backpressure instead
+      of lost events. Inserts are idempotent (by event id), so retrying a
+      write that did commit stores nothing twice.
+    - A failed batch is retried one event at a time, so a row the database
+      rejects holds back only itself; such rows are parked and retried
+      every max_backoff.
+    - A submit() is queued as one unit: it waits until the queue has room
+      for all of its events (max_queue counts events; a submit bigger
+      than that only needs an empty queue). With a positive
+      enqueue_timeout it gives up after that long with EventQueueFull,
+      having queued none of them, and the decisions are not returned.
+    - Events are only dropped on shutdown: stop() retries what is left
+      shutdown_retries times, then drops it and logs every dropped id.
+
+    Listeners (add_listener) are called with events once they are stored.
+    """
+
+    def __init__(
+        self,
+        database: BaseDatabase,
+        max_queue: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 0.05,
+        enqueue_timeout: float = 0.0,
+        max_backoff: float = 5.0,
+        shutdown_retries: int = 3,
+    ):
+        self._db = database
+        self._max_queue = max_queue
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._enqueue_timeout = enqueue_timeout
+        self._max_backoff = max_backoff
+        self._shutdown_retries = shutdown_retries
+        # Lists of events, one per submit(); _queued counts the events
+        self._queue: Optional[asyncio.Queue] = None
+        self._queued = 0
+        self._space: Optional[asyncio.Condition] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self._parked: list[Event] = []
+        self._parked_retry_at = 0.0
+        self._listeners: list[Callable[[list[Event]], None]] = []
+
+        self.enqueued = 0
+        self.blocked = 0
+        self.rejected = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.flushed_events = 0
+        self.failed_flushes = 0
+        self.last_flush_latency = 0.0
+        self.max_flush_latency = 0.0
+        self._total_flush_latency = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def add_listener(self, listener: Callable[[list[Event]], None]) -> None:
+        """Call listener with every group of events once they are stored."""
+        self._listeners.append(listener)
+
+    def _stored(self, events: list[Event]) -> None:
+        for listener in self._listeners:
+            listener(events)
+
+    async def start(self) -> None:
+        """Start the background flusher (called on app startup)."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._queued = 0
+        self._space = asyncio.Condition()
+        self._closing = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Drain every queued event, then stop the flusher (called on shutdown)."""
+        if not self.running:
+            return
+        self._closing = True
+        # Producers waiting for room write inline instead
+        async with self._space:
+            self._space.notify_all()
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+    async def submit(self, events: list[Event]) -> None:
+        """Queue events for writing; writes inline if the flusher isn't running."""
+        if not events:
+            return
+        if not self.running or self._closing or not await self._reserve(len(events)):
+            await self._db.create_events(events)
+            self._stored(events)
+            return
+        self._queue.put_nowait(list(events))
+        self.enqueued += len(events)
+
+    def _fits(self, count: int) -> bool:
+        return self._queued == 0 or self._queued + count <= self._max_queue
+
+    async def _reserve(self, count: int) -> bool:
+        """
+        Take room for count events, all or none. False if the writer began
+        shutting down meanwhile (nothing is taken then).
+        """
+        if not self._fits(count):
+            self.blocked += 1
+            timeout = self._enqueue_timeout if self._enqueue_timeout > 0 else None
+
+            def room() -> bool:
+                return self._closing or self._fits(count)
+
+            async with self._space:
+                try:
+                    await asyncio.wait_for(self._space.wait_for(room), timeout)
+                except asyncio.TimeoutError:
+                    self.rejected += count
+                    raise EventQueueFull() from None
+            if self._closing:
+                return False
+        self._queued += count
+        return True
+
+    async def _take(self, events: list[Event]) -> list[Event]:
+        """Account for events leaving the queue and wake producers waiting for room."""
+        self._queued -= len(events)
+        async with self._space:
+            self._space.notify_all()
+        return events
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+            batch = await self._take(item)
+            deadline = time.monotonic() + self._flush_interval
+            while len(batch) < self._batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch += await self._take(item)
+            await self._flush(batch)
+
+        # Producers that got room just before stop() may have got in behind _STOP
+        leftover = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not _STOP:
+                leftover += await self._take(item)
+        self._parked_retry_at = 0.0
+        await self._flush(leftover)
+        if self._parked:
+            self._drop(self._parked)
+            self._parked = []
+
+    async def _flush(self, batch: list[Event]) -> None:
+        """Store batch (and retry parked events); only returns once it's stored."""
+        if self._parked and time.monotonic() >= self._parked_retry_at:
+            parked, self._parked = self._parked, []
+            self._parked.extend(await self._write_each(parked))
+            self._parked_retry_at = time.monotonic() + self._max_backoff
+        attempt = shutdown_attempts = 0
+        while batch:
+            started = time.monotonic()
+            try:
+                await self._db.create_events(batch)
+            except Exception as e:
+                self.failed_flushes += 1
+                attempt += 1
+                logger.error(
+                    f"Event flush failed (attempt {attempt}, {len(batch)} events "
+                    f"held): {e!r}"
+                )
+                batch = await self._write_each(batch)
+                if not batch:
+                    return
+                if self._closing:
+                    shutdown_attempts += 1
+                    if shutdown_attempts >= self._shutdown_retries:
+                        self._drop(batch)
+                        return
+                await asyncio.sleep(min(0.1 * 2**attempt, self._max_backoff))
+                continue
+            self._flushed(batch, time.monotonic() - started)
+            return
+
+    async def _write_each(self, events: list[Event]) -> list[Event]:
+        """
+        Write events one at a time, parking any the database rejects.
+
+        A failed write is told apart by reading the event back: found means
+        it was stored after all, not found means the database is up but
+        won't take the row, and a failed read means the database is down -
+        then the events from there on are returned, still to be written.
+        """
+        for i, event in enumerate(events):
+            started = time.monotonic()
+            try:
+                await self._db.create_event(event)
+            except Exception as e:
+                try:
+                    stored = await self._db.get_event_by_id(event.id)
+                except Exception:
+                    return events[i:]
+                if stored is None:
+                    logger.error(f"Event {event.id} rejected, parked: {e!r}")
+                    self._parked.append(event)
+                    continue
+            self._flushed([event], time.monotonic() - started)
+        return []
+
+    def _flushed(self, events: list[Event], latency: float) -> None:
+        self.flushes += 1
+        self.flushed_events += len(events)
+        self.last_flush_latency = latency
+        self.max_flush_latency = max(self.max_flush_latency, latency)
+        self._total_flush_latency += latency
+        self._stored(events)
+
+    def _drop(self, events: list[Event]) -> None:
+        self.dropped += len(events)
+        logger.critical(
+            f"Shutting down with {len(events)} events not stored, dropping them: "
+            + ", ".join(event.id for event in events)
+        )
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "queue_depth": self._queued,
+            "max_queue": self._max_queue,
+            "enqueued": self.enqueued,
+            "blocked": self.blocked,
+            "rejected": self.rejected,
+            "dropped": self.dropped,
+            "parked": len(self._parked),
+            "flushes": self.flushes,
+            "flushed_events": self.flushed_events,
+            "failed_flushes": self.failed_flushes,
+            "last_flush_latency": self.last_flush_latency,
+            "avg_flush_latency": (
+                self._total_flush_latency / self.flushes if self.flushes else 0.0
+            ),
+            "max_flush_latency": self.max_flush_latency,
+        }
+
+
+event_writer = EventWriter(
+    db,
+    max_queue=settings.EVENT_QUEUE_SIZE,
+    batch_size=settings.EVENT_BATCH_SIZE,
+    flush_interval=settings.EVENT_FLUSH_INTERVAL_SECONDS,
+    enqueue_timeout=settings.EVENT_ENQUEUE_TIMEOUT_SECONDS,
+    max_backoff=settings.EVENT_FLUSH_MAX_BACKOFF_SECONDS,
+    shutdown_retries=settings.EVENT_SHUTDOWN_FLUSH_RETRIES,
+)
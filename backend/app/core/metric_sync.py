@@ -0,0 +1,378 @@
+from datetime import date, datetime, timedelta
+from typing import Optional
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+
+from app.adapters import db
+from app.config import settings
+from app.core.breakdowns import MetricBreakdowns, metric_breakdowns
+from app.core.rollups import MetricRollups, metric_rollups
+from app.core.sketches import AuditSketches, DaySketches, audit_sketches
+
+logger = logging.getLogger(__name__)
+
+_ALIVE = "alive"
+_ROLLUPS = "rollups"
+_BREAKDOWNS = "breakdowns"
+_SKETCHES = "sketches:"  # + ISO day
+# Pseudo-worker whose snapshots hold the merged counts of stopped workers
+_RETIRED = "retired"
+# Events read per page when rebuilding from the store
+_REPLAY_PAGE = 1000
+
+
+class MetricSync:
+    """
+    Shares the per-process metrics (rollups, breakdowns, daily sketches)
+    between the workers of one database.
+
+    Every interval each worker publishes what changed in its own metrics to
+    the database as versioned snapshots (one per worker and kind), reads
+    back the snapshots whose version moved and rebuilds merged views, which
+    the /metrics endpoints then serve - so every worker gives the same
+    answer, at most one interval old. A worker whose heartbeat stops moving
+    for stale_after is taken to be gone and its snapshots are merged into
+    the "retired" ones, so its counts outlast it (and restarts). Both writes
+    are conditional on the versions they were computed from: a worker that
+    was retired while stalled can't publish again under its old name, and
+    starts over as a new worker.
+
+    Needs a database with put_metric_snapshots, get_metric_snapshot_versions,
+    get_metric_snapshots, delete_metric_snapshots and retire_metric_snapshots
+    (SQLite, Postgres, Supabase). Otherwise every worker has its own store
+    anyway: the local metrics are rebuilt from its events on startup and
+    served as they are.
+    """
+
+    def __init__(
+        self,
+        database,
+        rollups: MetricRollups,
+        breakdowns: MetricBreakdowns,
+        sketches: AuditSketches,
+        interval: float,
+        stale_after: float,
+    ):
+        self._db = database
+        self._rollups = rollups
+        self._breakdowns = breakdowns
+        self._sketches = sketches
+        self._interval = interval
+        self._stale_after = stale_after
+        self.shared = hasattr(database, "put_metric_snapshots")
+        self.worker = self._new_worker()
+        self._task: Optional[asyncio.Task] = None
+
+        self._heartbeat = 0
+        self._published: dict[str, int] = {}
+        # (worker, kind) -> version and data of every snapshot read so far
+        self._snapshots: dict[tuple[str, str], tuple[int, bytes]] = {}
+        # worker -> (last heartbeat version seen, monotonic time it moved)
+        self._heartbeats: dict[str, tuple[int, float]] = {}
+        self._rollups_view: Optional[MetricRollups] = None
+        self._breakdowns_view: Optional[MetricBreakdowns] = None
+        self._sketches_view: Optional[AuditSketches] = None
+
+    @staticmethod
+    def _new_worker() -> str:
+        return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def rollups(self) -> MetricRollups:
+        return self._rollups_view or self._rollups
+
+    @property
+    def breakdowns(self) -> MetricBreakdowns:
+        return self._breakdowns_view or self._breakdowns
+
+    @property
+    def sketches(self) -> AuditSketches:
+        return self._sketches_view or self._sketches
+
+    async def start(self) -> None:
+        """Sync once, then every interval (called on app startup)."""
+        if self.running:
+            return
+        if not self.shared:
+            self._task = asyncio.create_task(self._replay())
+            return
+        try:
+            await self.sync()
+        except Exception as e:
+            logger.error(f"Metric sync failed: {e!r}")
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop syncing after a last publish (called on shutdown)."""
+        if not self.running:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if not self.shared:
+            return
+        try:
+            # Publish the final state first: the other workers keep serving
+            # it until they notice this worker is gone
+            await self._publish()
+        except Exception as e:
+            logger.error(f"Metric sync failed: {e!r}")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval)
+            try:
+                await self.sync()
+            except Exception as e:
+                logger.error(f"Metric sync failed: {e!r}")
+
+    async def _replay(self) -> None:
+        """Record the events already in the store, newest first."""
+        try:
+            # Paging back from the newest event at startup: the ones logged
+            # from then on are recorded as they are stored
+            page = await self._db.get_events(limit=1)
+            replayed = 0
+            while page:
+                self._rollups.record(page)
+                self._breakdowns.record(page)
+                self._sketches.record(page)
+                replayed += len(page)
+                page = await self._db.get_events(
+                    limit=_REPLAY_PAGE, before=page[-1].id
+                )
+        except Exception as e:
+            logger.error(f"Rebuilding metrics from the event store failed: {e!r}")
+            return
+        if replayed:
+            logger.info(f"Rebuilt metrics from {replayed} stored events")
+
+    async def sync(self) -> None:
+        await self._publish()
+        changed = await self._fetch()
+        changed |= await self._retire()
+        if changed or self._rollups_view is None:
+            await self._rebuild(changed)
+
+    # --- Publishing ---
+
+    def _local_snapshots(self) -> dict[str, tuple[int, object]]:
+        """kind -> (version, source of to_bytes()) for this worker."""
+        local: dict[str, tuple[int, object]] = {
+            _ROLLUPS: (self._rollups.version, self._rollups),
+            _BREAKDOWNS: (self._breakdowns.version, self._breakdowns),
+        }
+        for day, sketches in self._sketches.days().items():
+            local[_SKETCHES + day.isoformat()] = (sketches.version, sketches)
+        return local
+
+    async def _publish(self) -> None:
+        # Still the heartbeat last published (None: none yet), unless another
+        # worker took this one for stopped and retired it
+        expected = {_ALIVE: self._published.get(_ALIVE)}
+        self._heartbeat += 1
+        snapshots = {_ALIVE: (self._heartbeat, b"")}
+        local = self._local_snapshots()
+        for kind, (version, source) in local.items():
+            if self._published.get(kind) != version:
+                snapshots[kind] = (version, source.to_bytes())
+        if not await self._db.put_metric_snapshots(self.worker, snapshots, expected):
+            self._rejoin()
+            return
+        for kind, (version, _) in snapshots.items():
+            self._published[kind] = version
+
+        # Days that aged out of retention here
+        gone = [kind for kind in self._published if kind.startswith(_SKETCHES)]
+        gone = [kind for kind in gone if kind not in local]
+        if gone:
+            await self._db.delete_metric_snapshots(self.worker, gone)
+            for kind in gone:
+                del self._published[kind]
+
+    def _rejoin(self) -> None:
+        """Start over as a new worker after this one was retired."""
+        # The retired snapshots hold what it had published; counts recorded
+        # since can't be told apart from those, so they are dropped
+        logger.warning(
+            f"Metrics of worker {self.worker} were retired while it was stalled, "
+            "starting over; counts not yet published are lost"
+        )
+        self._rollups.clear()
+        self._breakdowns.clear()
+        self._sketches.clear()
+        self.worker = self._new_worker()
+        self._heartbeat = 0
+        self._published = {}
+
+    # --- Reading ---
+
+    async def _fetch(self) -> set[str]:
+        """Read every snapshot whose version moved; returns the changed kinds."""
+        versions = await self._db.get_metric_snapshot_versions()
+        now = time.monotonic()
+        stale: dict[str, list[str]] = {}
+        for (worker, kind), version in versions.items():
+            if kind == _ALIVE:
+                seen = self._heartbeats.get(worker)
+                if seen is None or seen[0] != version:
+                    self._heartbeats[worker] = (version, now)
+                continue
+            held = self._snapshots.get((worker, kind))
+            if held is None or held[0] != version:
+                stale.setdefault(worker, []).append(kind)
+
+        changed = set()
+        for worker, kinds in stale.items():
+            snapshots = await self._db.get_metric_snapshots(worker, kinds)
+            for kind, snapshot in snapshots.items():
+                self._snapshots[worker, kind] = snapshot
+                changed.add(kind)
+
+        # Snapshots deleted by their worker (or retired by another worker)
+        for key in [key for key in self._snapshots if key not in versions]:
+            del self._snapshots[key]
+            changed.add(key[1])
+        for worker in [w for w in self._heartbeats if (w, _ALIVE) not in versions]:
+            del self._heartbeats[worker]
+        return changed
+
+    async def _retire(self) -> set[str]:
+        """
+        Merge the snapshots of workers whose heartbeat stopped into the
+        retired ones; returns the changed kinds.
+        """
+        now = time.monotonic()
+        changed = set()
+        for worker, (heartbeat, moved) in list(self._heartbeats.items()):
+            if worker == self.worker or now - moved < self._stale_after:
+                continue
+            held = {k: s for (w, k), s in self._snapshots.items() if w == worker}
+            versions = {kind: version for kind, (version, _) in held.items()}
+            versions[_ALIVE] = heartbeat
+            expected, merged = {}, {}
+            for kind, (_, data) in held.items():
+                if self._aged_out(kind):
+                    continue  # Dropped with the worker
+                retired = self._snapshots.get((_RETIRED, kind))
+                datas = [data]
+                expected[kind] = None
+                if retired is not None:
+                    expected[kind] = retired[0]
+                    datas.insert(0, retired[1])
+                merged[kind] = (
+                    (expected[kind] or 0) + 1,
+                    await asyncio.to_thread(self._merged_bytes, kind, datas),
+                )
+            # Fails if it came back or another worker retired it first; the
+            # next fetch tells which
+            if not await self._db.retire_metric_snapshots(
+                worker, versions, _RETIRED, merged, expected
+            ):
+                continue
+            logger.info(f"Retired metrics of stopped worker {worker}")
+            del self._heartbeats[worker]
+            for kind in held:
+                del self._snapshots[worker, kind]
+                changed.add(kind)
+            for kind, snapshot in merged.items():
+                self._snapshots[_RETIRED, kind] = snapshot
+                changed.add(kind)
+
+        # Retired days past retention; any worker may drop them
+        aged = [k for w, k in self._snapshots if w == _RETIRED and self._aged_out(k)]
+        if aged:
+            await self._db.delete_metric_snapshots(_RETIRED, aged)
+            for kind in aged:
+                del self._snapshots[_RETIRED, kind]
+                changed.add(kind)
+        return changed
+
+    def _aged_out(self, kind: str) -> bool:
+        """Whether kind is a day of sketches past retention."""
+        if not kind.startswith(_SKETCHES):
+            return False
+        day = date.fromisoformat(kind[len(_SKETCHES) :])
+        return day <= self._oldest_day()
+
+    def _oldest_day(self) -> date:
+        """The newest day already past sketch retention."""
+        return datetime.utcnow().date() - timedelta(
+            days=self._sketches.retention_days
+        )
+
+    def _merged_bytes(self, kind: str, datas: list[bytes]) -> bytes:
+        if kind == _ROLLUPS:
+            return self._merged(self._rollups.empty(), datas).to_bytes()
+        if kind == _BREAKDOWNS:
+            return self._merged(self._breakdowns.empty(), datas).to_bytes()
+        return self._merged_day(datas).to_bytes()
+
+    # --- Views ---
+
+    def _datas(self, kind: str) -> list[bytes]:
+        return [data for (_, k), (_, data) in self._snapshots.items() if k == kind]
+
+    async def _rebuild(self, changed: set[str]) -> None:
+        # Parsing and merging other workers' snapshots is the costly part;
+        # it runs on a thread and the finished views are swapped in here
+        rebuild_all = self._rollups_view is None
+        if rebuild_all or _ROLLUPS in changed:
+            self._rollups_view = await asyncio.to_thread(
+                self._merged, self._rollups.empty(), self._datas(_ROLLUPS)
+            )
+        if rebuild_all or _BREAKDOWNS in changed:
+            self._breakdowns_view = await asyncio.to_thread(
+                self._merged, self._breakdowns.empty(), self._datas(_BREAKDOWNS)
+            )
+
+        if rebuild_all:
+            self._sketches_view = AuditSketches(self._sketches.retention_days)
+            changed = changed | {k for _, k in self._snapshots}
+        oldest = self._oldest_day()
+        for kind in changed:
+            if not kind.startswith(_SKETCHES):
+                continue
+            day = date.fromisoformat(kind[len(_SKETCHES) :])
+            merged = None
+            if day > oldest:
+                merged = await asyncio.to_thread(self._merged_day, self._datas(kind))
+            self._sketches_view.set_day(day, merged)
+
+    @staticmethod
+    def _merged(view, datas: list[bytes]):
+        for data in datas:
+            view.merge(data)
+        return view
+
+    @staticmethod
+    def _merged_day(datas: list[bytes]) -> Optional[DaySketches]:
+        merged = None
+        for data in datas:
+            sketches = DaySketches.from_bytes(data)
+            if merged is None:
+                merged = sketches
+            else:
+                merged.merge(sketches)
+        return merged
+
+
+metric_sync = MetricSync(
+    db,
+    metric_rollups,
+    metric_breakdowns,
+    audit_sketches,
+    interval=settings.METRICS_SYNC_INTERVAL_SECONDS,
+    stale_after=settings.METRICS_SYNC_STALE_SECONDS,
+)
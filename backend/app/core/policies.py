@@ -1,11 +1,38 @@
+from dataclasses import dataclass
 from typing import Optional, Any
+import asyncio
+import logging
+
 from app.models.schemas import (
     ActionRequest,
     ActionDecision,
+    Policy,
     PolicyCondition,
-    PolicyConditionOperator,
 )
-from app.adapters.memory_db import db
+from app.adapters import policy_db as db
+from app.core.policy_index import (
+    CompiledCondition,
+    PolicyIndex,
+    RequestView,
+    field_accessor,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PolicySnapshot:
+    """
+    Immutable, compiled policy set tagged with the generation it was built from.
+    Swapped in atomically - in-flight requests keep the snapshot they started with.
+    """
+
+    generation: int
+    index: PolicyIndex
+
+    @property
+    def policies(self) -> tuple[Policy, ...]:
+        return self.index.policies
 
 
 class PolicyEngine:
@@ -14,54 +41,77 @@ class PolicyEngine:
     Makes the final decision - AI only advises, never decides.
     """
 
+    def __init__(self):
+        self._snapshot: Optional[PolicySnapshot] = None
+        self._rebuild_task: Optional[asyncio.Task] = None
+
     def _get_field_value(self, request: ActionRequest, field: str) -> Optional[Any]:
         """Dynamically get a value from the request, including nested metadata."""
-        if field.startswith("metadata."):
-            key = field.split("metadata.")[1]
-            return (request.metadata or {}).get(key)
-        return getattr(request, field, None)
+        return field_accessor(field)(request)
 
     def _check_condition(
         self, request: ActionRequest, condition: PolicyCondition
     ) -> bool:
         """Evaluate a single policy condition against the request."""
-        request_value = self._get_field_value(request, condition.field)
-        if request_value is None:
-            return False
-
-        # Ensure we're comparing strings
-        request_value_str = str(request_value).lower()
-        condition_value_str = condition.value.lower()
-
-        op = condition.operator
-        if op == PolicyConditionOperator.EQUALS:
-            return request_value_str == condition_value_str
-        if op == PolicyConditionOperator.NOT_EQUALS:
-            return request_value_str != condition_value_str
-        if op == PolicyConditionOperator.CONTAINS:
-            return condition_value_str in request_value_str
-        if op == PolicyConditionOperator.NOT_CONTAINS:
-            return condition_value_str not in request_value_str
-        if op == PolicyConditionOperator.STARTS_WITH:
-            return request_value_str.startswith(condition_value_str)
-        if op == PolicyConditionOperator.ENDS_WITH:
-            return request_value_str.endswith(condition_value_str)
-        return False
+        return CompiledCondition(condition).matches(RequestView(request))
+
+    async def _rebuild(self) -> PolicySnapshot:
+        while True:
+            # Read the generation before loading: a mutation racing with the
+            # load leaves the snapshot marked stale and we go round again.
+            generation = db.policy_generation
+            policies = await db.get_all_policies()
+            index = await asyncio.to_thread(PolicyIndex, policies)
+            current = self._snapshot
+            if current is None or current.generation < generation:
+                self._snapshot = PolicySnapshot(generation=generation, index=index)
+                logger.info(
+                    f"Policy snapshot rebuilt: generation={generation} "
+                    f"policies={len(index)}"
+                )
+            if db.policy_generation == generation:
+                return self._snapshot
+
+    def schedule_refresh(self) -> asyncio.Task:
+        """Start a background rebuild unless one is already running."""
+        task = self._rebuild_task
+        if task is None or task.done():
+            task = self._rebuild_task = asyncio.create_task(self._rebuild())
+        return task
+
+    async def get_snapshot(self) -> PolicySnapshot:
+        """
+        Current policy snapshot. Only the very first call waits for a build;
+        afterwards a stale snapshot is served while the rebuild runs.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            return await asyncio.shield(self.schedule_refresh())
+        if snapshot.generation != db.policy_generation:
+            self.schedule_refresh()
+        return snapshot
 
     async def evaluate(
         self, request: ActionRequest, ai_recommendation: Optional[str] = None
     ) -> tuple[ActionDecision, str, Optional[str]]:
         """
-        Evaluate request against dynamically loaded policies from the database.
+        Evaluate request against the cached policy snapshot.
         Returns (decision, reason, policy_id).
         """
-        policies = await db.get_all_policies()
+        snapshot = await self.get_snapshot()
+        return self.decide(snapshot, request, ai_recommendation)
 
-        for policy in policies:
-            # All conditions must be met for a policy to trigger (AND logic)
-            if all(self._check_condition(request, cond) for cond in policy.conditions):
-                return policy.decision, policy.reason, policy.id
+    def match(
+        self, snapshot: PolicySnapshot, request: ActionRequest
+    ) -> Optional[Policy]:
+        """First deterministic policy matching the request, if any (no I/O)."""
+        # All conditions must be met for a policy to trigger (AND logic)
+        return snapshot.index.match(request)
 
+    def fallback(
+        self, ai_recommendation: Optional[str] = None
+    ) -> tuple[ActionDecision, str, Optional[str]]:
+        """Decision when no deterministic policy matched."""
         # Fallback to AI recommendation if no deterministic policy matched
         if ai_recommendation:
             if (
@@ -73,5 +123,17 @@ class PolicyEngine:
 
         return ActionDecision.APPROVE, "Action approved by default", None
 
+    def decide(
+        self,
+        snapshot: PolicySnapshot,
+        request: ActionRequest,
+        ai_recommendation: Optional[str] = None,
+    ) -> tuple[ActionDecision, str, Optional[str]]:
+        """Evaluate request against a given snapshot (no I/O)."""
+        policy = self.match(snapshot, request)
+        if policy:
+            return policy.decision, policy.reason, policy.id
+        return self.fallback(ai_recommendation)
+
 
 policy_engine = PolicyEngine()
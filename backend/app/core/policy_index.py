@@ -0,0 +1,288 @@
+from functools import lru_cache
+from typing import Any, Callable, Iterable, Optional
+
+from app.core.aho_corasick import AhoCorasick
+from app.models.schemas import (
+    ActionRequest,
+    Policy,
+    PolicyCondition,
+    PolicyConditionOperator,
+)
+
+# Operator implementations applied to (lowered request value, lowered constant)
+_OPERATORS: dict[PolicyConditionOperator, Callable[[str, str], bool]] = {
+    PolicyConditionOperator.EQUALS: str.__eq__,
+    PolicyConditionOperator.NOT_EQUALS: str.__ne__,
+    PolicyConditionOperator.CONTAINS: lambda value, const: const in value,
+    PolicyConditionOperator.NOT_CONTAINS: lambda value, const: const not in value,
+    PolicyConditionOperator.STARTS_WITH: str.startswith,
+    PolicyConditionOperator.ENDS_WITH: str.endswith,
+}
+
+# Operators answered from one Aho-Corasick scan per field
+_SUBSTRING = (
+    PolicyConditionOperator.CONTAINS,
+    PolicyConditionOperator.NOT_CONTAINS,
+)
+
+_INDEXABLE = (
+    PolicyConditionOperator.EQUALS,
+    PolicyConditionOperator.CONTAINS,
+    PolicyConditionOperator.STARTS_WITH,
+    PolicyConditionOperator.ENDS_WITH,
+)
+
+
+def _never(value: str, const: str) -> bool:
+    return False
+
+
+@lru_cache(maxsize=4096)
+def field_accessor(field: str) -> Callable[[ActionRequest], Optional[Any]]:
+    """Build a getter for a condition field, including nested metadata."""
+    if field.startswith("metadata."):
+        key = field.split("metadata.")[1]
+        return lambda request: (request.metadata or {}).get(key)
+    return lambda request: getattr(request, field, None)
+
+
+class RequestView(dict):
+    """
+    Lowered string values of a request, computed at most once per field.
+    Missing fields resolve to None so conditions on them never match.
+    """
+
+    __slots__ = ("_request", "_automata", "_hits")
+
+    def __init__(
+        self,
+        request: ActionRequest,
+        automata: Optional[dict[str, AhoCorasick]] = None,
+    ):
+        super().__init__()
+        self._request = request
+        self._automata = automata or {}
+        self._hits: dict[str, set[int]] = {}
+
+    def __missing__(self, field: str) -> Optional[str]:
+        value = field_accessor(field)(self._request)
+        lowered = None if value is None else str(value).lower()
+        self[field] = lowered
+        return lowered
+
+    def hits(self, field: str) -> set[int]:
+        """Ids of the field's substring patterns found in its value (one scan)."""
+        found = self._hits.get(field)
+        if found is None:
+            value = self[field]
+            automaton = self._automata.get(field)
+            if value is None or automaton is None:
+                found = set()
+            else:
+                found = automaton.search(value)
+            self._hits[field] = found
+        return found
+
+
+class CompiledCondition:
+    """A policy condition with its constant lowered and operator resolved."""
+
+    __slots__ = ("field", "operator", "value", "pattern_id", "_test")
+
+    def __init__(self, condition: PolicyCondition):
+        self.field = condition.field
+        self.operator = condition.operator
+        self.value = condition.value.lower()
+        # Set by PolicyIndex when the needle is part of a field automaton
+        self.pattern_id: Optional[int] = None
+        self._test = _OPERATORS.get(condition.operator, _never)
+
+    def matches(self, values: RequestView) -> bool:
+        value = values[self.field]
+        if value is None:
+            return False
+        if self.pattern_id is not None:
+            found = self.pattern_id in values.hits(self.field)
+            if self.operator == PolicyConditionOperator.CONTAINS:
+                return found
+            return not found
+        return self._test(value, self.value)
+
+
+class CompiledPolicy:
+    """A policy with all of its conditions compiled (AND logic)."""
+
+    __slots__ = ("position", "policy", "conditions")
+
+    def __init__(self, position: int, policy: Policy):
+        self.position = position
+        self.policy = policy
+        self.conditions = tuple(CompiledCondition(c) for c in policy.conditions)
+
+    def matches(self, values: RequestView) -> bool:
+        for condition in self.conditions:
+            if not condition.matches(values):
+                return False
+        return True
+
+
+class _TrieNode:
+    __slots__ = ("children", "positions")
+
+    def __init__(self):
+        self.children: dict[str, "_TrieNode"] = {}
+        self.positions: list[int] = []
+
+
+class _Trie:
+    """Character trie returning every stored key that is a prefix of a text."""
+
+    def __init__(self):
+        self._root = _TrieNode()
+
+    def add(self, key: str, position: int) -> None:
+        node = self._root
+        for char in key:
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = _TrieNode()
+            node = child
+        node.positions.append(position)
+
+    def collect(self, text: Iterable[str], out: list[int]) -> None:
+        node = self._root
+        out.extend(node.positions)
+        for char in text:
+            node = node.children.get(char)
+            if node is None:
+                return
+            out.extend(node.positions)
+
+
+class PolicyIndex:
+    """
+    Immutable, compiled view of an ordered policy list.
+
+    Each policy is filed under one "anchor" condition - the indexable one
+    whose key is shared by the fewest policies:
+    - EQUALS -> hash bucket keyed on the lowered constant
+    - CONTAINS -> needle id in its field's Aho-Corasick automaton
+    - STARTS_WITH -> prefix trie of its field
+    - ENDS_WITH -> suffix trie of its field
+    Policies without an indexable condition are always candidates.
+
+    All CONTAINS / NOT_CONTAINS needles on a field share one automaton, so
+    the field value is scanned once per request whatever the needle count.
+
+    A request is only checked against its candidates, in original policy
+    order, so the first-match result is identical to a linear scan.
+    """
+
+    def __init__(self, policies: Iterable[Policy]):
+        self._compiled: list[CompiledPolicy] = []
+        self._equals: dict[str, dict[str, list[int]]] = {}
+        self._contains: dict[str, dict[int, list[int]]] = {}
+        self._automata: dict[str, AhoCorasick] = {}
+        self._prefixes: dict[str, _Trie] = {}
+        self._suffixes: dict[str, _Trie] = {}
+        self._unindexed: list[int] = []
+
+        for position, policy in enumerate(policies):
+            self._compiled.append(CompiledPolicy(position, policy))
+        self._build_automata()
+
+        # How many policies share each anchor key - used to pick the most
+        # selective anchor for every policy.
+        key_counts: dict[tuple, int] = {}
+        for compiled in self._compiled:
+            for condition in compiled.conditions:
+                key = self._anchor_key(condition)
+                if key is not None:
+                    key_counts[key] = key_counts.get(key, 0) + 1
+
+        for compiled in self._compiled:
+            self._file(compiled, self._choose_anchor(compiled.conditions, key_counts))
+
+        self.policies: tuple[Policy, ...] = tuple(c.policy for c in self._compiled)
+
+    def __len__(self) -> int:
+        return len(self._compiled)
+
+    def _build_automata(self) -> None:
+        needles: dict[str, dict[str, int]] = {}
+        for compiled in self._compiled:
+            for condition in compiled.conditions:
+                if condition.operator in _SUBSTRING:
+                    ids = needles.setdefault(condition.field, {})
+                    condition.pattern_id = ids.setdefault(condition.value, len(ids))
+        for field, ids in needles.items():
+            self._automata[field] = AhoCorasick(ids)
+
+    @staticmethod
+    def _anchor_key(condition: CompiledCondition) -> Optional[tuple]:
+        if condition.operator in _INDEXABLE:
+            return (condition.operator, condition.field, condition.value)
+        return None
+
+    def _choose_anchor(
+        self, conditions: tuple[CompiledCondition, ...], key_counts: dict[tuple, int]
+    ) -> Optional[CompiledCondition]:
+        """Pick the indexable condition whose key is shared by fewest policies."""
+        best, best_count = None, 0
+        for condition in conditions:
+            key = self._anchor_key(condition)
+            if key is None:
+                continue
+            count = key_counts[key]
+            if best is None or count < best_count:
+                best, best_count = condition, count
+        return best
+
+    def _file(
+        self, compiled: CompiledPolicy, anchor: Optional[CompiledCondition]
+    ) -> None:
+        position = compiled.position
+        if anchor is None:
+            self._unindexed.append(position)
+        elif anchor.operator == PolicyConditionOperator.EQUALS:
+            bucket = self._equals.setdefault(anchor.field, {})
+            bucket.setdefault(anchor.value, []).append(position)
+        elif anchor.operator == PolicyConditionOperator.CONTAINS:
+            by_pattern = self._contains.setdefault(anchor.field, {})
+            by_pattern.setdefault(anchor.pattern_id, []).append(position)
+        elif anchor.operator == PolicyConditionOperator.STARTS_WITH:
+            trie = self._prefixes.setdefault(anchor.field, _Trie())
+            trie.add(anchor.value, position)
+        else:
+            trie = self._suffixes.setdefault(anchor.field, _Trie())
+            trie.add(anchor.value[::-1], position)
+
+    def candidates(self, values: RequestView) -> list[int]:
+        """Positions of policies that may match, in policy order."""
+        positions = list(self._unindexed)
+        for field, bucket in self._equals.items():
+            value = values[field]
+            if value is not None:
+                positions.extend(bucket.get(value, ()))
+        for field, by_pattern in self._contains.items():
+            for pattern_id in values.hits(field):
+                positions.extend(by_pattern.get(pattern_id, ()))
+        for field, trie in self._prefixes.items():
+            value = values[field]
+            if value is not None:
+                trie.collect(value, positions)
+        for field, trie in self._suffixes.items():
+            value = values[field]
+            if value is not None:
+                trie.collect(reversed(value), positions)
+        positions.sort()
+        return positions
+
+    def match(self, request: ActionRequest) -> Optional[Policy]:
+        """Return the first policy (in order) whose conditions all match."""
+        values = RequestView(request, self._automata)
+        compiled = self._compiled
+        for position in self.candidates(values):
+            if compiled[position].matches(values):
+                return compiled[position].policy
+        return None
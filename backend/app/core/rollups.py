@@ -0,0 +1,190 @@
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+import json
+
+from app.config import settings
+from app.domain.event import Event
+
+# Per-bucket counter layout
+TOTAL, APPROVED, REJECTED, AI_UNAVAILABLE = range(4)
+
+
+def decision_counts(event: Event) -> list[int]:
+    """The counter increments one event contributes, in bucket layout."""
+    return [
+        1,
+        int(event.decision == "approve"),
+        int(event.decision == "reject"),
+        int(not event.ai_available),
+    ]
+
+
+def _epoch_seconds(timestamp: datetime) -> int:
+    if timestamp.tzinfo is None:
+        # Naive timestamps in this codebase are UTC (datetime.utcnow)
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return int(timestamp.timestamp())
+
+
+class RollupTier:
+    """
+    Fixed-size ring of counter buckets at one resolution.
+
+    Slot i holds bucket number b (epoch_seconds // step) where b % slots == i;
+    a newer bucket landing on the slot resets it, so the ring always covers
+    the most recent `slots` buckets and its memory never grows.
+    """
+
+    def __init__(self, step: int, slots: int):
+        self.step = step
+        self.slots = slots
+        self._bucket_ids = [-1] * slots
+        self._counts = [[0, 0, 0, 0] for _ in range(slots)]
+
+    @property
+    def retention(self) -> int:
+        """Seconds of history the ring can hold."""
+        return self.step * self.slots
+
+    def add(self, epoch_seconds: int, counts: list[int]) -> None:
+        bucket = epoch_seconds // self.step
+        slot = bucket % self.slots
+        held = self._bucket_ids[slot]
+        if bucket > held:
+            self._bucket_ids[slot] = bucket
+            self._counts[slot] = list(counts)
+        elif bucket == held:
+            slot_counts = self._counts[slot]
+            for i, value in enumerate(counts):
+                slot_counts[i] += value
+        # else: older than anything this ring still covers - dropped
+
+    def get(self, bucket: int) -> Optional[list[int]]:
+        slot = bucket % self.slots
+        if self._bucket_ids[slot] != bucket:
+            return None
+        return self._counts[slot]
+
+    def oldest_bucket(self, now: int) -> int:
+        return now // self.step - self.slots + 1
+
+    def buckets(self) -> list[list[int]]:
+        """[bucket, *counts] for every bucket held."""
+        return [
+            [bucket, *counts]
+            for bucket, counts in zip(self._bucket_ids, self._counts)
+            if bucket >= 0
+        ]
+
+
+class MetricRollups:
+    """
+    Decision counters rolled up at ingest into minute, hour and day tiers.
+
+    Every event bumps one bucket per tier, so a time series query never
+    reads raw events: recent ranges come from the fine-grained minute ring,
+    older ones from the coarser (compacted) hour and day rings.
+    Counts are per worker process and start at zero on restart; workers
+    sharing a database combine theirs with to_bytes/merge (MetricSync).
+    """
+
+    def __init__(self, minute_slots: int, hour_slots: int, day_slots: int):
+        self.tiers = [
+            RollupTier(60, minute_slots),
+            RollupTier(3600, hour_slots),
+            RollupTier(86400, day_slots),
+        ]
+        # Bumped on every change, so unchanged state isn't republished
+        self.version = 0
+
+    def record(self, events: Iterable[Event]) -> None:
+        for event in events:
+            counts = decision_counts(event)
+            epoch_seconds = _epoch_seconds(event.timestamp)
+            for tier in self.tiers:
+                tier.add(epoch_seconds, counts)
+        self.version += 1
+
+    def clear(self) -> None:
+        self.tiers = self.empty().tiers
+        self.version += 1
+
+    def empty(self) -> "MetricRollups":
+        """A rollup with the same tiers and no counts."""
+        return MetricRollups(*(tier.slots for tier in self.tiers))
+
+    def to_bytes(self) -> bytes:
+        return json.dumps([tier.buckets() for tier in self.tiers]).encode()
+
+    def merge(self, data: bytes) -> None:
+        """Add the counts of a to_bytes() snapshot of the same tiers."""
+        for tier, buckets in zip(self.tiers, json.loads(data)):
+            for bucket, *counts in buckets:
+                tier.add(bucket * tier.step, counts)
+
+    def _pick_tier(self, start: int, step: int, now: int) -> RollupTier:
+        # Coarsest tier that lines up with the step and still covers `start`
+        aligned = [tier for tier in self.tiers if step % tier.step == 0]
+        if not aligned:
+            raise ValueError(f"step must be a multiple of {self.tiers[0].step}")
+        for tier in reversed(aligned):
+            if start // tier.step >= tier.oldest_bucket(now):
+                return tier
+        raise ValueError("start is older than the retained history for this step")
+
+    def timeseries(
+        self,
+        start: datetime,
+        end: datetime,
+        step: int,
+        now: Optional[datetime] = None,
+    ) -> list[dict]:
+        """
+        Decision counts and rates per `step` seconds over [start, end).
+        Buckets are aligned to the step; empty buckets are returned as zeros.
+        """
+        now_s = _epoch_seconds(now or datetime.utcnow())
+        start_s = _epoch_seconds(start) // step * step
+        end_s = _epoch_seconds(end)
+        if end_s <= start_s:
+            raise ValueError("end must be after start")
+        if (end_s - start_s) // step > settings.ROLLUP_MAX_POINTS:
+            raise ValueError(
+                f"Range holds more than {settings.ROLLUP_MAX_POINTS} points; "
+                "use a larger step"
+            )
+
+        tier = self._pick_tier(start_s, step, now_s)
+        per_point = step // tier.step
+        points = []
+        for point_start in range(start_s, end_s, step):
+            totals = [0, 0, 0, 0]
+            first_bucket = point_start // tier.step
+            for bucket in range(first_bucket, first_bucket + per_point):
+                counts = tier.get(bucket)
+                if counts:
+                    for i, value in enumerate(counts):
+                        totals[i] += value
+            total = totals[TOTAL]
+            points.append(
+                {
+                    "timestamp": datetime.fromtimestamp(point_start, timezone.utc),
+                    "total_actions": total,
+                    "approved_count": totals[APPROVED],
+                    "rejected_count": totals[REJECTED],
+                    "ai_unavailable_count": totals[AI_UNAVAILABLE],
+                    "approve_rate": totals[APPROVED] / total if total else 0.0,
+                    "reject_rate": totals[REJECTED] / total if total else 0.0,
+                    "ai_unavailable_rate": (
+                        totals[AI_UNAVAILABLE] / total if total else 0.0
+                    ),
+                }
+            )
+        return points
+
+
+metric_rollups = MetricRollups(
+    minute_slots=settings.ROLLUP_MINUTE_SLOTS,
+    hour_slots=settings.ROLLUP_HOUR_SLOTS,
+    day_slots=settings.ROLLUP_DAY_SLOTS,
+)
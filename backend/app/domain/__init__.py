@@ -1,3 +1,4 @@
 from .event import Event
+from .ids import decode_ulid, encode_ulid, new_ulid
 
-__all__ = ["Event"]
+__all__ = ["Event", "decode_ulid", "encode_ulid", "new_ulid"]
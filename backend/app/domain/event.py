@@ -1,8 +1,8 @@
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Optional
-import uuid
 
+from app.domain.ids import new_ulid
 from app.models.schemas import DecisionTrace
 
 
@@ -13,7 +13,7 @@ class Event:
     Events are APPEND-ONLY - never updated or deleted.
     """
 
-    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = field(default_factory=new_ulid)
     action_type: str = ""
     resource_id: str = ""
     user_id: str = ""
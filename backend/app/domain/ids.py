@@ -0,0 +1,61 @@
+from datetime import datetime, timezone
+from typing import Optional
+import os
+import threading
+import time
+
+# Crockford's base32, as used by the ULID spec
+_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_ALPHABET_SET = frozenset(_ALPHABET)
+# Crockford digit -> the digit int(..., 32) expects for the same value
+_TO_INT_DIGITS = str.maketrans(_ALPHABET, "0123456789abcdefghijklmnopqrstuv")
+# Encoding works two characters (10 bits) at a time
+_PAIRS = [_ALPHABET[i >> 5] + _ALPHABET[i & 31] for i in range(1024)]
+_PAIR_SHIFTS = range(120, -1, -10)
+_RANDOM_BITS = 80
+
+_lock = threading.Lock()
+_last_ms = -1
+_last_random = 0
+
+
+def _to_ms(timestamp: datetime) -> int:
+    if timestamp.tzinfo is None:
+        # Naive timestamps in this codebase are UTC (datetime.utcnow)
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return int(timestamp.timestamp() * 1000)
+
+
+def new_ulid(timestamp: Optional[datetime] = None) -> str:
+    """
+    Generate a ULID: 48-bit millisecond timestamp + 80 random bits, encoded
+    as 26 Crockford base32 characters, so string order is creation order.
+    IDs minted within the same millisecond increment the random part and
+    stay strictly increasing.
+    """
+    global _last_ms, _last_random
+
+    ms = _to_ms(timestamp) if timestamp else time.time_ns() // 1_000_000
+    with _lock:
+        if ms == _last_ms and _last_random + 1 < 1 << _RANDOM_BITS:
+            random = _last_random + 1
+        else:
+            random = int.from_bytes(os.urandom(10), "big")
+        _last_ms, _last_random = ms, random
+
+    return encode_ulid((ms << _RANDOM_BITS) | random)
+
+
+def encode_ulid(value: int) -> str:
+    """The 26-character text form of a 128-bit ULID value."""
+    return "".join([_PAIRS[(value >> shift) & 1023] for shift in _PAIR_SHIFTS])
+
+
+def decode_ulid(text: str) -> Optional[int]:
+    """
+    The 128-bit value of a canonical ULID string, or None if text is not one
+    (so that encode_ulid(decode_ulid(text)) == text whenever it isn't None).
+    """
+    if len(text) != 26 or text[0] > "7" or not _ALPHABET_SET.issuperset(text):
+        return None
+    return int(text.translate(_TO_INT_DIGITS), 32)
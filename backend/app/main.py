@@ -1,13 +1,39 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.adapters import db
 from app.api import api_router
+from app.auth.passwords import password_hasher
 from app.config import settings
+from app.core.ai_advisor import ai_advisor
+from app.core.event_writer import event_writer
+from app.core.metric_sync import metric_sync
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await ai_advisor.start()
+    if settings.EVENT_WRITE_BEHIND:
+        await event_writer.start()
+    await metric_sync.start()
+    try:
+        yield
+    finally:
+        # Drain queued events before anything else shuts down
+        await event_writer.stop()
+        await metric_sync.stop()
+        await ai_advisor.aclose()
+        await db.close()
+        password_hasher.shutdown()
+
 
 app = FastAPI(
     title="UluCore",
     description="Action decision engine with AI advisory and immutable audit logging",
     version=settings.VERSION,
+    lifespan=lifespan,
 )
 
 # CORS configuration - configurable via CORS_ORIGINS env var
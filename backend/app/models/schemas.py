@@ -1,7 +1,7 @@
 import uuid
 from pydantic import BaseModel, Field
 from typing import Optional
-from datetime import datetime
+from datetime import date, datetime
 from enum import Enum
 
 
@@ -10,6 +10,12 @@ class ActionDecision(str, Enum):
     REJECT = "reject"
 
 
+class BreakdownDimension(str, Enum):
+    ACTION_TYPE = "action_type"
+    POLICY = "policy"
+    USER = "user_id"
+
+
 class ActionRequest(BaseModel):
     action_type: str = Field(..., description="Type of action being requested")
     resource_id: str = Field(..., description="ID of the resource being acted upon")
@@ -71,6 +77,121 @@ class MetricsResponse(BaseModel):
     ai_unavailable_count: int
 
 
+class CacheStats(BaseModel):
+    size: int
+    maxsize: int
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+
+
+class CircuitBreakerStats(BaseModel):
+    state: str
+    window_size: int
+    error_rate: float
+    latency_p50: float
+    latency_p95: float
+    latency_p99: float
+    times_opened: int
+    rejected: int
+
+
+class AIAdvisorStatsResponse(BaseModel):
+    cache: CacheStats
+    circuit_breaker: CircuitBreakerStats
+    coalesced_requests: int
+    in_flight: int
+
+
+class PasswordHasherStats(BaseModel):
+    max_workers: int
+    running: int
+    completed: int
+    failed: int
+    rejected: int
+
+
+class AuthCacheStatsResponse(BaseModel):
+    api_keys: CacheStats
+    tokens: CacheStats
+    password_hasher: PasswordHasherStats
+
+
+class EventWriterStatsResponse(BaseModel):
+    running: bool
+    queue_depth: int
+    max_queue: int
+    enqueued: int
+    blocked: int
+    rejected: int
+    dropped: int
+    parked: int
+    flushes: int
+    flushed_events: int
+    failed_flushes: int
+    last_flush_latency: float
+    avg_flush_latency: float
+    max_flush_latency: float
+
+
+class TimeseriesPoint(BaseModel):
+    timestamp: datetime
+    total_actions: int
+    approved_count: int
+    rejected_count: int
+    ai_unavailable_count: int
+    approve_rate: float
+    reject_rate: float
+    ai_unavailable_rate: float
+
+
+class TimeseriesResponse(BaseModel):
+    start: datetime
+    end: datetime
+    step_seconds: int
+    points: list[TimeseriesPoint]
+
+
+class BreakdownItem(BaseModel):
+    key: str
+    total_actions: int
+    approved_count: int
+    rejected_count: int
+    ai_unavailable_count: int
+    # The ranked count may be this much too high (events of values evicted
+    # before this one was tracked)
+    overcount: int = 0
+
+
+class BreakdownResponse(BaseModel):
+    dimension: BreakdownDimension
+    decision: Optional[ActionDecision] = None
+    tracked_keys: int
+    max_keys: int
+    items: list[BreakdownItem]
+
+
+class SketchDay(BaseModel):
+    day: date
+    distinct_users: int
+    distinct_resources: int
+
+
+class HeavyHitter(BaseModel):
+    key: str
+    count: int
+
+
+class AuditSketchesResponse(BaseModel):
+    start: date
+    end: date
+    days: list[SketchDay]
+    distinct_users: int
+    distinct_resources: int
+    top_rejected_resources: list[HeavyHitter]
+
+
 class UserCreate(BaseModel):
     email: str
     password: str
@@ -0,0 +1,104 @@
+"""
+AI advisor HTTP client benchmark: client-per-request vs. pooled keep-alive client.
+
+Runs a local stub of the chat-completions endpoint and fires concurrent
+recommendation requests through both client strategies.
+
+Run from backend/:
+    python -m benchmarks.bench_ai_client
+
+The stub speaks plain HTTP/1.1, so the numbers show connection reuse (plus
+the SSL context every fresh httpx client builds) only. Against the real
+endpoint each new connection also pays a TLS handshake, and HTTP/2
+multiplexes requests over one connection, so the gap is larger in production.
+"""
+
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+from app.config import settings
+from app.core.ai_advisor import AIAdvisor
+from app.models.schemas import ActionRequest
+from benchmarks.stub_server import start_stub
+
+TOTAL_REQUESTS = 500
+CONCURRENCY = [1, 10, 50]
+STUB_DELAY_S = 0.002
+
+RESPONSE_BODY = json.dumps(
+    {"choices": [{"message": {"content": "Recommend approval: stub"}}]}
+).encode()
+
+
+def _respond(method: str, path: str, body: bytes) -> tuple[str, bytes]:
+    return "200 OK", RESPONSE_BODY
+
+
+async def per_request_call(url: str, request: ActionRequest) -> None:
+    """The previous behaviour: a fresh client (and connection) per call."""
+    async with httpx.AsyncClient(timeout=10.0) as client:
+        response = await client.post(
+            url,
+            headers={"Authorization": "Bearer bench"},
+            json={"messages": [{"role": "user", "content": request.action_type}]},
+        )
+        response.raise_for_status()
+        response.json()
+
+
+async def run_load(call, concurrency: int) -> tuple[float, list[float]]:
+    request = ActionRequest(action_type="read", resource_id="r", user_id="u")
+    latencies: list[float] = []
+    remaining = TOTAL_REQUESTS
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            await call(request)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - started, latencies
+
+
+def report(label: str, concurrency: int, elapsed: float, latencies: list[float]):
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1e3
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1e3
+    print(
+        f"{label:<12} c={concurrency:<3} | {len(latencies) / elapsed:8.0f} req/s | "
+        f"p50 {p50:7.2f} ms | p99 {p99:7.2f} ms"
+    )
+
+
+async def main():
+    url = start_stub(_respond, STUB_DELAY_S) + "/v1/chat/completions"
+    settings.AI_API_KEY = "bench"
+    settings.AI_API_URL = url
+    advisor = AIAdvisor()
+    await advisor.start()
+
+    async def pooled_call(request: ActionRequest) -> None:
+        await advisor._call_grok_api(request)
+
+    try:
+        for concurrency in CONCURRENCY:
+            elapsed, latencies = await run_load(
+                lambda r: per_request_call(url, r), concurrency
+            )
+            report("per-request", concurrency, elapsed, latencies)
+            elapsed, latencies = await run_load(pooled_call, concurrency)
+            report("pooled", concurrency, elapsed, latencies)
+    finally:
+        await advisor.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,73 @@
+"""
+JWT auth throughput: get_current_user with and without the principal cache.
+
+Simulates a dashboard page load fanning out FANOUT concurrent requests per
+user token across USERS users, and reports how many authenticated requests
+per second the auth layer sustains. The user lookup runs against the
+in-memory adapter and, to stand in for a remote database, with an added
+DB_RTT_S round trip.
+
+Run from backend/:
+    python -m benchmarks.bench_auth_cache
+"""
+
+import asyncio
+import time
+
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.adapters.memory_db import InMemoryDatabase
+from app.auth import jwt as jwt_auth
+from app.auth.jwt import create_access_token, get_current_user
+from app.config import settings
+from app.core.cache import TTLCache
+
+USERS = 50
+FANOUT = 4
+PAGE_LOADS = 2000
+DB_RTT_S = 0.001
+
+
+class SlowDatabase(InMemoryDatabase):
+    async def get_user_by_id(self, user_id: str):
+        await asyncio.sleep(DB_RTT_S)
+        return await super().get_user_by_id(user_id)
+
+
+async def measure(label: str, database: InMemoryDatabase, cached: bool) -> None:
+    jwt_auth.db = database
+    jwt_auth.principal_cache = TTLCache(
+        maxsize=10_000 if cached else 0, ttl=settings.JWT_CACHE_TTL_SECONDS
+    )
+
+    credentials = []
+    for i in range(USERS):
+        user = await database.create_user(f"user{i}@example.com", "hash")
+        token = create_access_token(user["id"], user["email"])
+        credentials.append(
+            HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+        )
+
+    started = time.perf_counter()
+    for page in range(PAGE_LOADS):
+        token = credentials[page % USERS]
+        await asyncio.gather(*(get_current_user(token) for _ in range(FANOUT)))
+    elapsed = time.perf_counter() - started
+
+    stats = jwt_auth.principal_cache.stats()
+    print(
+        f"{label:<12} cache={'on ' if cached else 'off'} | "
+        f"{PAGE_LOADS * FANOUT / elapsed:9.0f} req/s | "
+        f"hits {stats['hits']:6} | misses {stats['misses']:6}"
+    )
+
+
+async def main():
+    databases = (("memory", InMemoryDatabase), ("db-1ms", SlowDatabase))
+    for label, make_database in databases:
+        for cached in (False, True):
+            await measure(label, make_database(), cached)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
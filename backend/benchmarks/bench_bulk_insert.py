@@ -0,0 +1,87 @@
+"""
+Event insert benchmark: one create_event per row vs. one create_events call.
+
+Measures both the in-memory adapter and the Supabase adapter, the latter
+against a local PostgREST stub (one HTTP round trip per insert call) with a
+simulated network round trip of STUB_RTT_S.
+
+Run from backend/:
+    python -m benchmarks.bench_bulk_insert
+"""
+
+import asyncio
+import time
+import uuid
+from datetime import datetime
+
+from app.adapters.base_db import BaseDatabase
+from app.adapters.memory_db import InMemoryDatabase
+from app.config import settings
+from app.domain.event import Event
+from benchmarks.stub_server import start_stub
+
+BATCH_SIZES = [1, 10, 100, 1000]
+TOTAL_EVENTS = 2000
+STUB_RTT_S = 0.001
+
+
+def make_events(count: int) -> list[Event]:
+    return [
+        Event(
+            id=str(uuid.uuid4()),
+            action_type="read",
+            resource_id=f"resource-{i}",
+            user_id="bench-user",
+            decision="approve",
+            reason="bench",
+            ai_available=True,
+            timestamp=datetime.utcnow(),
+        )
+        for i in range(count)
+    ]
+
+
+async def single_rows(database: BaseDatabase, batch: list[Event]) -> None:
+    for event in batch:
+        await database.create_event(event)
+
+
+async def bulk(database: BaseDatabase, batch: list[Event]) -> None:
+    await database.create_events(batch)
+
+
+async def measure(database: BaseDatabase, insert, batch_size: int) -> float:
+    """Insert TOTAL_EVENTS events in batches, return events per second."""
+    events = make_events(TOTAL_EVENTS)
+    started = time.perf_counter()
+    for i in range(0, len(events), batch_size):
+        await insert(database, events[i : i + batch_size])
+    return len(events) / (time.perf_counter() - started)
+
+
+def _respond(method: str, path: str, body: bytes) -> tuple[str, bytes]:
+    return "201 Created", b"[]"
+
+
+async def run(label: str, make_database) -> None:
+    for batch_size in BATCH_SIZES:
+        single = await measure(make_database(), single_rows, batch_size)
+        many = await measure(make_database(), bulk, batch_size)
+        print(
+            f"{label:<9} batch={batch_size:<5} | single {single:10.0f} ev/s | "
+            f"bulk {many:10.0f} ev/s | x{many / single:6.1f}"
+        )
+
+
+async def main():
+    await run("memory", InMemoryDatabase)
+
+    settings.SUPABASE_URL = start_stub(_respond, STUB_RTT_S)
+    settings.SUPABASE_KEY = "bench"
+    from app.adapters.supabase_db import SupabaseDatabase
+
+    await run("supabase", SupabaseDatabase)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,125 @@
+"""
+In-memory event storage footprint: Event objects vs. the columnar EventStore.
+
+Builds the same synthetic audit log both ways and reports the memory that
+stays allocated per million events (tracemalloc), plus read cost.
+
+Run from backend/:
+    python -m benchmarks.bench_event_memory [events]
+"""
+
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+from app.adapters.event_store import EventStore
+from app.domain.event import Event
+from app.domain.ids import encode_ulid
+from app.models.schemas import DecisionTrace, TriggeredPolicyInfo
+
+DEFAULT_EVENTS = 1_000_000
+ACTION_TYPES = 20
+USERS = 10_000
+# Resource ids and AI summaries are close to unique per event in real logs;
+# a small pool would let dictionary encoding hide their growth
+RESOURCES = 2**64
+POLICIES = 50
+AI_SUMMARIES = 2**64
+
+
+def millis(timestamp: datetime) -> int:
+    return int(timestamp.replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def generate(count: int):
+    """
+    Synthetic events shaped like the engine's: every string is a fresh
+    object, as it would be after JSON parsing, and every event has a trace.
+    The same count always yields the same events (ids included).
+    """
+    rng = random.Random(42)
+    timestamp = datetime(2026, 1, 1)
+    for _ in range(count):
+        timestamp += timedelta(microseconds=rng.randint(1, 2000))
+        policy = rng.randrange(POLICIES) if rng.random() < 0.6 else None
+        if policy is not None:
+            reason = f"Blocked by policy number {policy}"
+            ai_recommendation = None
+        else:
+            reason = "Action approved by default"
+            summary = rng.randrange(AI_SUMMARIES)
+            ai_recommendation = f"Recommend approval: routine access, ref {summary:x}"
+        trace = DecisionTrace(ai_recommendation_summary=ai_recommendation)
+        if policy is not None:
+            trace.triggered_policy = TriggeredPolicyInfo(
+                id=f"policy-{policy}", reason=reason
+            )
+        yield Event(
+            id=encode_ulid(millis(timestamp) << 80 | rng.getrandbits(80)),
+            action_type=f"action.{rng.randrange(ACTION_TYPES)}",
+            resource_id=f"resource-{rng.randrange(RESOURCES):016x}",
+            user_id=f"user-{rng.randrange(USERS)}",
+            decision="reject" if policy is not None and policy % 2 else "approve",
+            reason=reason,
+            ai_recommendation=ai_recommendation,
+            ai_available=rng.random() < 0.9,
+            metadata=(
+                {"ip": f"10.0.{rng.randrange(256)}.{rng.randrange(256)}"}
+                if rng.random() < 0.2
+                else None
+            ),
+            timestamp=timestamp,
+            trace=trace,
+        )
+
+
+class ObjectStore:
+    """The previous layout: Event objects in a list plus id and user indexes."""
+
+    def __init__(self):
+        self.events: list[Event] = []
+        self.by_id: dict[str, Event] = {}
+        self.by_user: dict[str, list[Event]] = {}
+
+    def append(self, event: Event) -> None:
+        self.events.append(event)
+        self.by_id[event.id] = event
+        self.by_user.setdefault(event.user_id, []).append(event)
+
+    def get(self, event_id: str):
+        return self.by_id.get(event_id)
+
+
+def measure(label: str, store, count: int) -> None:
+    tracemalloc.start()
+    started = time.perf_counter()
+    for event in generate(count):
+        store.append(event)
+    build = time.perf_counter() - started
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    probe = [event.id for event in generate(min(count, 10_000))]
+    started = time.perf_counter()
+    for event_id in probe:
+        store.get(event_id)
+    lookup = (time.perf_counter() - started) / len(probe)
+
+    per_million = size * 1_000_000 / count
+    print(
+        f"{label:<8} | {per_million / 2**20:8.1f} MiB per 1M events | "
+        f"{size / count:6.0f} B/event | build {build:6.1f} s | "
+        f"get {lookup * 1e6:5.1f} us"
+    )
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_EVENTS
+    measure("objects", ObjectStore(), count)
+    measure("columns", EventStore(), count)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Durable event log: write throughput under concurrency and recovery time.
+
+Writes events from concurrent producers (one create_event each, as the
+engine does per request) with fsync on and off, reporting events/s and
+events per fsync (group commit), then reopens the log and times recovery
+from .idx sidecars and from a full scan.
+
+Run from backend/:
+    python -m benchmarks.bench_log_db [events]
+"""
+
+import asyncio
+import glob
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from app.adapters.log_db import LogDatabase
+from benchmarks.bench_event_memory import generate
+
+DEFAULT_EVENTS = 50_000
+PRODUCERS = (1, 16, 256)
+SEGMENT_BYTES = 4 * 2**20
+
+
+async def write(directory: str, events: list, producers: int, fsync: bool) -> None:
+    db = LogDatabase(directory, SEGMENT_BYTES, fsync)
+    queue = iter(events)
+
+    async def producer():
+        for event in queue:
+            await db.create_event(event)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(producer() for _ in range(producers)))
+    elapsed = time.perf_counter() - started
+    await db.close()
+    print(
+        f"fsync={'on ' if fsync else 'off'} producers={producers:<4} | "
+        f"{len(events) / elapsed:9.0f} events/s | "
+        f"{len(events) / db.fsyncs:7.1f} events/flush"
+    )
+
+
+def recover(directory: str, label: str) -> None:
+    started = time.perf_counter()
+    db = LogDatabase(directory, SEGMENT_BYTES)
+    elapsed = time.perf_counter() - started
+    print(f"recovery ({label}) | {len(db._events)} events in {elapsed:6.2f} s")
+    asyncio.run(db.close())
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_EVENTS
+    events = list(generate(count))
+    directory = tempfile.mkdtemp(prefix="ulucore-log-")
+    try:
+        for fsync in (True, False):
+            for producers in PRODUCERS:
+                shutil.rmtree(directory)
+                asyncio.run(write(directory, events, producers, fsync))
+
+        recover(directory, "idx")
+        for path in glob.glob(os.path.join(directory, "*.idx")):
+            os.remove(path)
+        recover(directory, "scan")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
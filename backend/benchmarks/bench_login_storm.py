@@ -0,0 +1,111 @@
+"""
+/action latency during a login storm: inline bcrypt vs. the hashing pool.
+
+Drives the app in-process over ASGI (same event loop, no network):
+ACTION_CLIENTS clients call /action back to back while LOGIN_CLIENTS
+clients log in LOGINS times in total. "inline" runs bcrypt in the handler
+as the routes used to; "pool" goes through password_hasher. Reports /action
+p50/p99/max and how the logins fared (200 = ok, 503 = queue timeout).
+
+Run from backend/:
+    python -m benchmarks.bench_login_storm
+"""
+
+import asyncio
+import statistics
+import time
+from collections import Counter
+
+import httpx
+
+from app.api.routes import auth as auth_routes
+from app.auth.passwords import PasswordHasher
+from app.config import settings
+from app.main import app
+
+ACTION_CLIENTS = 4
+LOGIN_CLIENTS = 8
+LOGINS = 24
+PASSWORD = "correct horse battery staple"
+
+
+class InlineHasher(PasswordHasher):
+    """The previous behaviour: bcrypt on the event loop thread."""
+
+    async def _run(self, func, *args):
+        return func(*args)
+
+
+async def storm(client: httpx.AsyncClient, api_key: str, email: str) -> None:
+    latencies: list[float] = []
+    logins: Counter = Counter()
+    done = asyncio.Event()
+    remaining = [LOGINS]
+
+    async def action_client():
+        body = {"action_type": "read", "resource_id": "doc-1", "user_id": "bench"}
+        while not done.is_set():
+            started = time.perf_counter()
+            await client.post("/action", json=body, headers={"X-API-Key": api_key})
+            latencies.append(time.perf_counter() - started)
+
+    async def login_client():
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            response = await client.post(
+                "/auth/login", json={"email": email, "password": PASSWORD}
+            )
+            logins[response.status_code] += 1
+
+    actions = [asyncio.create_task(action_client()) for _ in range(ACTION_CLIENTS)]
+    started = time.perf_counter()
+    await asyncio.gather(*(login_client() for _ in range(LOGIN_CLIENTS)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await asyncio.gather(*actions)
+
+    latencies.sort()
+    label = type(auth_routes.password_hasher).__name__
+    print(
+        f"{label:<15} | /action n={len(latencies):<6} "
+        f"p50 {statistics.median(latencies) * 1000:7.1f} ms | "
+        f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:7.1f} ms | "
+        f"max {latencies[-1] * 1000:7.1f} ms | "
+        f"logins {dict(logins)} in {elapsed:5.1f} s"
+    )
+
+
+async def main():
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench"
+        ) as client:
+            email = "storm@example.com"
+            signup = await client.post(
+                "/auth/signup", json={"email": email, "password": PASSWORD}
+            )
+            token = signup.json()["access_token"]
+            created = await client.post(
+                "/api-keys",
+                json={"name": "bench"},
+                headers={"Authorization": f"Bearer {token}"},
+            )
+            api_key = created.json()["key"]
+
+            pooled = auth_routes.password_hasher
+            print(
+                f"bcrypt rounds={settings.BCRYPT_ROUNDS} "
+                f"pool workers={pooled.max_workers} "
+                f"queue timeout={pooled.queue_timeout}s"
+            )
+            auth_routes.password_hasher = InlineHasher(
+                settings.BCRYPT_ROUNDS, 1, pooled.queue_timeout
+            )
+            await storm(client, api_key, email)
+            auth_routes.password_hasher = pooled
+            await storm(client, api_key, email)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,174 @@
+"""
+Policy evaluation benchmark: compiled PolicyIndex vs. linear scan.
+
+Run from backend/:
+    python -m benchmarks.bench_policy_index
+"""
+
+import random
+import time
+from typing import Optional
+
+from app.core.policy_index import PolicyIndex
+from app.models.schemas import (
+    ActionDecision,
+    ActionRequest,
+    Policy,
+    PolicyCondition,
+    PolicyConditionOperator,
+)
+
+SIZES = [10, 1_000, 100_000]
+REQUESTS = 200
+ACTION_TYPES = [f"action_{i}" for i in range(50)]
+TEAMS = [f"team_{i}" for i in range(20)]
+
+
+def linear_scan(policies: list[Policy], request: ActionRequest) -> Optional[Policy]:
+    """The original PolicyEngine.evaluate loop, kept as the reference."""
+
+    def check(condition: PolicyCondition) -> bool:
+        field = condition.field
+        if field.startswith("metadata."):
+            value = (request.metadata or {}).get(field.split("metadata.")[1])
+        else:
+            value = getattr(request, field, None)
+        if value is None:
+            return False
+        value_str = str(value).lower()
+        const = condition.value.lower()
+        op = condition.operator
+        if op == PolicyConditionOperator.EQUALS:
+            return value_str == const
+        if op == PolicyConditionOperator.NOT_EQUALS:
+            return value_str != const
+        if op == PolicyConditionOperator.CONTAINS:
+            return const in value_str
+        if op == PolicyConditionOperator.NOT_CONTAINS:
+            return const not in value_str
+        if op == PolicyConditionOperator.STARTS_WITH:
+            return value_str.startswith(const)
+        if op == PolicyConditionOperator.ENDS_WITH:
+            return value_str.endswith(const)
+        return False
+
+    for policy in policies:
+        if all(check(c) for c in policy.conditions):
+            return policy
+    return None
+
+
+def make_policy(i: int, rng: random.Random) -> Policy:
+    kind = i % 5
+    if kind == 0:
+        conditions = [
+            PolicyCondition(
+                field="resource_id",
+                operator=PolicyConditionOperator.EQUALS,
+                value=f"RES-{i}",
+            )
+        ]
+    elif kind == 1:
+        conditions = [
+            PolicyCondition(
+                field="resource_id",
+                operator=PolicyConditionOperator.STARTS_WITH,
+                value=f"/prod/{i}/",
+            ),
+            PolicyCondition(
+                field="action_type",
+                operator=PolicyConditionOperator.EQUALS,
+                value=rng.choice(ACTION_TYPES),
+            ),
+        ]
+    elif kind == 2:
+        conditions = [
+            PolicyCondition(
+                field="resource_id",
+                operator=PolicyConditionOperator.ENDS_WITH,
+                value=f".secret{i}",
+            )
+        ]
+    elif kind == 3:
+        conditions = [
+            PolicyCondition(
+                field="metadata.path",
+                operator=PolicyConditionOperator.CONTAINS,
+                value=f"/blocked{i}/",
+            ),
+            PolicyCondition(
+                field="metadata.path",
+                operator=PolicyConditionOperator.NOT_CONTAINS,
+                value="/public/",
+            ),
+        ]
+    else:
+        conditions = [
+            PolicyCondition(
+                field="metadata.team",
+                operator=PolicyConditionOperator.EQUALS,
+                value=rng.choice(TEAMS),
+            ),
+            PolicyCondition(
+                field="user_id",
+                operator=PolicyConditionOperator.STARTS_WITH,
+                value=f"usr_{i}",
+            ),
+        ]
+    return Policy(
+        id=f"pol_{i}",
+        name=f"policy {i}",
+        conditions=conditions,
+        decision=ActionDecision.REJECT,
+        reason=f"blocked by policy {i}",
+    )
+
+
+def make_request(size: int, rng: random.Random) -> ActionRequest:
+    i = rng.randrange(size)
+    resource = rng.choice(
+        [f"res-{i}", f"/prod/{i}/db", f"config.secret{i}", f"other-{i}"]
+    )
+    path = rng.choice([f"/srv/blocked{i}/x", f"/public/blocked{i}/", "/srv"])
+    return ActionRequest(
+        action_type=rng.choice(ACTION_TYPES),
+        resource_id=resource,
+        user_id=f"usr_{rng.randrange(size)}",
+        metadata={"team": rng.choice(TEAMS), "path": path},
+    )
+
+
+def run(size: int) -> None:
+    rng = random.Random(size)
+    policies = [make_policy(i, rng) for i in range(size)]
+    requests = [make_request(size, rng) for _ in range(REQUESTS)]
+
+    started = time.perf_counter()
+    index = PolicyIndex(policies)
+    compile_s = time.perf_counter() - started
+
+    # Fewer linear iterations at large sizes - it is the slow path.
+    linear_requests = requests if size <= 1_000 else requests[:20]
+
+    started = time.perf_counter()
+    expected = [linear_scan(policies, r) for r in linear_requests]
+    linear_us = (time.perf_counter() - started) / len(linear_requests) * 1e6
+
+    started = time.perf_counter()
+    for r in requests:
+        index.match(r)
+    indexed_us = (time.perf_counter() - started) / len(requests) * 1e6
+
+    actual = [index.match(r) for r in linear_requests]
+    assert actual == expected, "index result differs from linear scan"
+
+    print(
+        f"{size:>8} policies | compile {compile_s * 1e3:9.1f} ms | "
+        f"linear {linear_us:11.1f} us/req | indexed {indexed_us:8.1f} us/req | "
+        f"speedup {linear_us / indexed_us:8.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    for size in SIZES:
+        run(size)
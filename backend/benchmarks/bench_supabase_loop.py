@@ -0,0 +1,83 @@
+"""
+Event-loop lag under concurrent Supabase queries: sync vs. async client.
+
+Runs CONCURRENCY coroutines issuing get_event_by_id-style lookups against a
+local PostgREST stub with a simulated round trip of STUB_RTT_S, while a
+ticker task measures how late the loop wakes it (event-loop lag). "sync"
+calls the blocking client's .execute() from the coroutines, as the adapter
+used to; "async" goes through SupabaseDatabase.
+
+Run from backend/:
+    python -m benchmarks.bench_supabase_loop
+"""
+
+import asyncio
+import statistics
+import time
+
+from supabase import create_client
+
+from app.config import settings
+from benchmarks.stub_server import start_stub
+
+CONCURRENCY = 50
+REQUESTS = 1000
+STUB_RTT_S = 0.005
+TICK_S = 0.001
+
+
+def _respond(method: str, path: str, body: bytes) -> tuple[str, bytes]:
+    return "200 OK", b"[]"
+
+
+async def monitor(lags: list[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK_S)
+        lags.append(time.perf_counter() - started - TICK_S)
+
+
+async def measure(label: str, lookup) -> None:
+    lags: list[float] = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(monitor(lags, stop))
+
+    async def worker(offset: int):
+        for i in range(offset, REQUESTS, CONCURRENCY):
+            await lookup(f"event-{i}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(offset) for offset in range(CONCURRENCY)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await ticker
+
+    lags.sort()
+    print(
+        f"{label:<6} | {REQUESTS / elapsed:7.0f} req/s | loop lag "
+        f"p50 {statistics.median(lags) * 1000:7.2f} ms | "
+        f"p99 {lags[int(len(lags) * 0.99)] * 1000:7.2f} ms | "
+        f"max {lags[-1] * 1000:7.2f} ms"
+    )
+
+
+async def main():
+    settings.SUPABASE_URL = start_stub(_respond, STUB_RTT_S)
+    settings.SUPABASE_KEY = "bench"
+
+    client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+
+    async def blocking_lookup(event_id: str):
+        client.table("events").select("*").eq("id", event_id).execute()
+
+    await measure("sync", blocking_lookup)
+
+    from app.adapters.supabase_db import SupabaseDatabase
+
+    database = SupabaseDatabase()
+    await measure("async", database.get_event_by_id)
+    await database.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,64 @@
+"""
+Minimal HTTP/1.1 keep-alive stub server shared by the benchmarks.
+
+It runs its own event loop on a daemon thread so the benchmark's loop (or
+synchronous clients) measure only the client side.
+"""
+
+import asyncio
+import threading
+from typing import Callable
+
+# (method, path, body) -> (status line, response body)
+Responder = Callable[[str, str, bytes], tuple[str, bytes]]
+
+
+def _handler(respond: Responder, delay: float):
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                lines = head.split(b"\r\n")
+                method, path = lines[0].decode().split(" ")[:2]
+                length = 0
+                for line in lines[1:]:
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":", 1)[1])
+                body = await reader.readexactly(length) if length else b""
+                if delay:
+                    await asyncio.sleep(delay)
+                status, payload = respond(method, path, body)
+                writer.write(
+                    f"HTTP/1.1 {status}\r\n".encode()
+                    + b"Content-Type: application/json\r\n"
+                    + b"Content-Length: " + str(len(payload)).encode() + b"\r\n"
+                    + b"\r\n" + payload
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    return handle
+
+
+def start_stub(respond: Responder, delay: float = 0.0) -> str:
+    """Start the stub server on a background thread, return its base URL."""
+    ready = threading.Event()
+    address: dict = {}
+
+    def run():
+        async def main():
+            server = await asyncio.start_server(
+                _handler(respond, delay), "127.0.0.1", 0, backlog=1024
+            )
+            address["port"] = server.sockets[0].getsockname()[1]
+            ready.set()
+            await server.serve_forever()
+
+        asyncio.run(main())
+
+    threading.Thread(target=run, daemon=True).start()
+    ready.wait()
+    return f"http://127.0.0.1:{address['port']}"
@@ -0,0 +1,45 @@
+-- Tables and indexes behind SupabaseDatabase and PostgresDatabase.
+--
+-- Idempotent: safe to run against a database that already has the tables
+-- (missing columns and indexes are added).
+
+create table if not exists events (
+    id text primary key,
+    action_type text not null,
+    resource_id text not null,
+    user_id text not null,
+    decision text not null,
+    reason text not null,
+    ai_recommendation text,
+    ai_available boolean not null default true,
+    metadata jsonb,
+    timestamp timestamptz not null default now(),
+    trace jsonb
+);
+alter table events add column if not exists trace jsonb;
+
+-- get_events pages newest first on (timestamp, id), optionally per user;
+-- both keyset and offset paging read these indexes backwards
+create index if not exists events_timestamp_id on events (timestamp, id);
+create index if not exists events_user_timestamp_id
+    on events (user_id, timestamp, id);
+
+create table if not exists users (
+    id text primary key,
+    email text not null,
+    password_hash text not null,
+    name text,
+    created_at timestamptz not null default now()
+);
+create unique index if not exists users_email on users (email);
+
+create table if not exists api_keys (
+    id text primary key,
+    user_id text not null,
+    name text not null,
+    key_hash text not null,
+    key_prefix text not null,
+    created_at timestamptz not null default now()
+);
+create unique index if not exists api_keys_key_hash on api_keys (key_hash);
+create index if not exists api_keys_user_id on api_keys (user_id);
@@ -0,0 +1,73 @@
+-- Running totals behind GET /metrics.
+--
+-- Events are append-only, so an AFTER INSERT trigger is enough to keep the
+-- counters exact. The trigger is statement-level: a bulk insert of N rows
+-- updates one counters row once, not N times.
+--
+-- The totals are split over 16 shard rows and each insert bumps the shard
+-- of its backend (pg_backend_pid() % 16), so concurrent inserts from
+-- different connections don't queue on one row lock until commit. Readers
+-- sum the shards.
+
+create table if not exists event_counters (
+    id smallint primary key,
+    total_actions bigint not null default 0,
+    approved_count bigint not null default 0,
+    rejected_count bigint not null default 0,
+    ai_unavailable_count bigint not null default 0
+);
+-- Earlier versions kept a single row pinned to id = 1
+alter table event_counters alter column id drop default;
+alter table event_counters drop constraint if exists event_counters_id_check;
+alter table event_counters add constraint event_counters_id_check
+    check (id >= 0 and id < 16);
+
+create or replace function bump_event_counters() returns trigger
+language plpgsql as $$
+begin
+    insert into event_counters as c (
+        id, total_actions, approved_count, rejected_count, ai_unavailable_count
+    )
+    select
+        pg_backend_pid() % 16,
+        count(*),
+        count(*) filter (where decision = 'approve'),
+        count(*) filter (where decision = 'reject'),
+        count(*) filter (where not ai_available)
+    from new_events
+    having count(*) > 0
+    on conflict (id) do update set
+        total_actions = c.total_actions + excluded.total_actions,
+        approved_count = c.approved_count + excluded.approved_count,
+        rejected_count = c.rejected_count + excluded.rejected_count,
+        ai_unavailable_count = c.ai_unavailable_count + excluded.ai_unavailable_count;
+    return null;
+end;
+$$;
+
+begin;
+
+-- Block writers while backfilling so no insert is counted twice or missed
+lock table events in share row exclusive mode;
+
+-- Start over from exact totals, all in shard 0; the other shards are
+-- created by the trigger as backends write
+delete from event_counters;
+insert into event_counters (
+    id, total_actions, approved_count, rejected_count, ai_unavailable_count
+)
+select
+    0,
+    count(*),
+    count(*) filter (where decision = 'approve'),
+    count(*) filter (where decision = 'reject'),
+    count(*) filter (where not ai_available)
+from events;
+
+drop trigger if exists events_bump_counters on events;
+create trigger events_bump_counters
+    after insert on events
+    referencing new table as new_events
+    for each statement execute function bump_event_counters();
+
+commit;
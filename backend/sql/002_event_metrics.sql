@@ -0,0 +1,32 @@
+-- GET /metrics as one RPC: POST /rest/v1/rpc/event_metrics.
+--
+-- Returns a single row of counts whatever the size of events. The counter
+-- shards from 001_event_counters.sql (at most 16 rows) answer in O(1); if
+-- they are missing the counts are aggregated in the database instead,
+-- never row by row in the client (where PostgREST's max-rows cap would
+-- also truncate them).
+
+create or replace function event_metrics()
+returns table (
+    total_actions bigint,
+    approved_count bigint,
+    rejected_count bigint,
+    ai_unavailable_count bigint
+)
+language sql stable as $$
+    select
+        sum(total_actions)::bigint,
+        sum(approved_count)::bigint,
+        sum(rejected_count)::bigint,
+        sum(ai_unavailable_count)::bigint
+    from event_counters
+    having count(*) > 0
+    union all
+    select
+        count(*),
+        count(*) filter (where decision = 'approve'),
+        count(*) filter (where decision = 'reject'),
+        count(*) filter (where not ai_available)
+    from events
+    where not exists (select 1 from event_counters)
+$$;
@@ -0,0 +1,25 @@
+-- Version stamp behind the API key auth cache.
+--
+-- Every worker caches key hash -> user and re-reads this counter about once
+-- a second; when it has moved, the worker drops its cache. Bumped by a
+-- trigger, so deletes made through any client invalidate every worker.
+
+create table if not exists api_key_version (
+    id smallint primary key default 1 check (id = 1),
+    version bigint not null default 0
+);
+
+insert into api_key_version (id) values (1) on conflict (id) do nothing;
+
+create or replace function bump_api_key_version() returns trigger
+language plpgsql as $$
+begin
+    update api_key_version set version = version + 1 where id = 1;
+    return null;
+end;
+$$;
+
+drop trigger if exists api_keys_bump_version on api_keys;
+create trigger api_keys_bump_version
+    after delete on api_keys
+    for each statement execute function bump_api_key_version();
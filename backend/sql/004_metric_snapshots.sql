@@ -0,0 +1,94 @@
+-- Per-worker metric state behind /metrics/timeseries, /metrics/breakdown and
+-- /metrics/sketches.
+--
+-- Each worker keeps its rollups, breakdowns and daily sketches in memory and
+-- publishes them here (one row per worker and kind, replaced when its
+-- version moves); every worker merges all rows into the view it serves.
+-- Rows of workers that stopped publishing are folded by the others into
+-- the rows of the 'retired' worker, so restarts don't lose their counts.
+--
+-- Both writes go through the functions below (called as RPCs by the
+-- Supabase adapter): each checks the versions it was computed from and
+-- applies nothing if another worker got there first.
+
+create table if not exists metric_snapshots (
+    worker text not null,
+    kind text not null,
+    version bigint not null,
+    data bytea not null,
+    primary key (worker, kind)
+);
+
+-- Whether p_worker's rows of the kinds in p_expected ({kind: version}) have
+-- those versions; a null version means there must be no row
+create or replace function metric_snapshot_versions_match(
+    p_worker text, p_expected jsonb
+)
+returns boolean
+language sql stable as $$
+    select not exists (
+        select 1
+        from jsonb_each(p_expected) as expected (kind, version)
+        left join metric_snapshots as held
+            on held.worker = p_worker and held.kind = expected.kind
+        where held.version is distinct from (expected.version #>> '{}')::bigint
+    )
+$$;
+
+-- Upsert a worker's snapshots unless it was retired since its last publish
+create or replace function put_metric_snapshots(
+    p_worker text,
+    p_kinds text[],
+    p_versions bigint[],
+    p_datas bytea[],
+    p_expected jsonb
+)
+returns boolean
+language plpgsql as $$
+begin
+    -- Serialises with retire_metric_snapshots
+    perform pg_advisory_xact_lock(hashtext('metric_snapshots'));
+    if not metric_snapshot_versions_match(p_worker, p_expected) then
+        return false;
+    end if;
+    insert into metric_snapshots (worker, kind, version, data)
+    select p_worker, kind, version, data
+    from unnest(p_kinds, p_versions, p_datas) as snapshot (kind, version, data)
+    on conflict (worker, kind) do update set
+        version = excluded.version, data = excluded.data;
+    return true;
+end
+$$;
+
+-- Replace a stopped worker's rows (still at p_versions, {kind: version})
+-- with the merged rows of p_retired, whose rows must be at p_expected
+create or replace function retire_metric_snapshots(
+    p_worker text,
+    p_versions jsonb,
+    p_retired text,
+    p_kinds text[],
+    p_merged_versions bigint[],
+    p_datas bytea[],
+    p_expected jsonb
+)
+returns boolean
+language plpgsql as $$
+begin
+    perform pg_advisory_xact_lock(hashtext('metric_snapshots'));
+    if (
+        select coalesce(jsonb_object_agg(kind, version), '{}')
+        from metric_snapshots
+        where worker = p_worker
+    ) <> p_versions
+    or not metric_snapshot_versions_match(p_retired, p_expected) then
+        return false;
+    end if;
+    insert into metric_snapshots (worker, kind, version, data)
+    select p_retired, kind, version, data
+    from unnest(p_kinds, p_merged_versions, p_datas) as snapshot (kind, version, data)
+    on conflict (worker, kind) do update set
+        version = excluded.version, data = excluded.data;
+    delete from metric_snapshots where worker = p_worker;
+    return true;
+end
+$$;
@@ -0,0 +1,59 @@
+import asyncio
+import time
+import unittest
+
+from app.core.ai_advisor import AIAdvisor
+from app.core.circuit_breaker import CircuitState
+from app.models.schemas import ActionRequest
+
+
+class SlowAdvisor(AIAdvisor):
+    """An advisor whose AI answers after `delay` seconds, counting calls."""
+
+    def __init__(self, delay: float):
+        super().__init__()
+        self._enabled = True
+        self._api_key = "test"
+        self.delay = delay
+        self.calls = 0
+
+    async def _call_grok_api(self, request: ActionRequest) -> str:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return "Recommend approval: test"
+
+
+def _request(i: int) -> ActionRequest:
+    return ActionRequest(action_type="read", resource_id=f"doc-{i}", user_id="u")
+
+
+class DeadlineTest(unittest.IsolatedAsyncioTestCase):
+    async def test_spent_budget_sends_nothing_and_spares_the_breaker(self):
+        advisor = SlowAdvisor(delay=0)
+        for i in range(50):
+            deadline = time.monotonic() - 1
+            self.assertEqual(
+                await advisor.get_recommendation(_request(i), deadline), (None, False)
+            )
+        self.assertEqual(advisor.calls, 0)
+        stats = advisor.stats()["circuit_breaker"]
+        self.assertEqual(stats["state"], CircuitState.CLOSED.value)
+        self.assertEqual(stats["window_size"], 0)
+
+    async def test_short_budget_on_a_healthy_ai_keeps_the_circuit_closed(self):
+        # The AI answers well within the breaker's latency threshold; only the
+        # callers' budgets are too tight to wait for it
+        advisor = SlowAdvisor(delay=0.05)
+        for i in range(30):
+            deadline = time.monotonic() + 0.01
+            await advisor.get_recommendation(_request(i), deadline)
+        self.assertEqual(advisor.calls, 30)
+        self.assertEqual(advisor.stats()["circuit_breaker"]["times_opened"], 0)
+        self.assertEqual(
+            await advisor.get_recommendation(_request(99)),
+            ("Recommend approval: test", True),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+
+from app.core.circuit_breaker import CircuitBreaker, CircuitState
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class CircuitBreakerTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker(
+            "test",
+            window_size=4,
+            min_requests=4,
+            open_seconds=10,
+            half_open_probes=2,
+            clock=self.clock,
+        )
+
+    def _open(self):
+        for _ in range(4):
+            self.breaker.record_failure(self.breaker.allow(), 0.1)
+        self.assertEqual(self.breaker.state, CircuitState.OPEN)
+
+    def test_call_straddling_the_state_change_is_not_a_probe(self):
+        # Admitted while closed, still running when the circuit half-opens
+        straddler = self.breaker.allow()
+        self._open()
+        self.clock.now += 10
+        self.assertEqual(self.breaker.state, CircuitState.HALF_OPEN)
+        probes = [self.breaker.allow(), self.breaker.allow()]
+        self.assertIsNone(self.breaker.allow())
+
+        # Neither its outcome nor abandoning it frees a probe slot
+        self.breaker.record_success(straddler, 0.1)
+        self.assertIsNone(self.breaker.allow())
+        self.breaker.release(straddler)
+        self.assertIsNone(self.breaker.allow())
+        # ...and a late failure doesn't re-open the circuit
+        self.breaker.record_failure(straddler, 0.1)
+        self.assertEqual(self.breaker.state, CircuitState.HALF_OPEN)
+
+        for probe in probes:
+            self.breaker.record_success(probe, 0.1)
+        self.assertEqual(self.breaker.state, CircuitState.CLOSED)
+
+    def test_probe_from_an_earlier_round_is_not_counted(self):
+        self._open()
+        self.clock.now += 10
+        stale = self.breaker.allow()
+        self.breaker.record_failure(self.breaker.allow(), 0.1)
+        self.assertEqual(self.breaker.state, CircuitState.OPEN)
+
+        self.clock.now += 10
+        probes = [self.breaker.allow(), self.breaker.allow()]
+        self.breaker.release(stale)
+        self.assertIsNone(self.breaker.allow())
+        self.breaker.record_success(stale, 0.1)
+        self.assertEqual(self.breaker.state, CircuitState.HALF_OPEN)
+
+        self.breaker.release(probes[0])
+        self.assertIsNotNone(self.breaker.allow())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import asyncio
+import unittest
+from typing import Optional
+
+from app.core.event_writer import EventQueueFull, EventWriter
+from app.domain.event import Event
+
+
+class GatedDatabase:
+    """Stores events once the gate opens, so the writer's queue can back up."""
+
+    def __init__(self):
+        self.gate = asyncio.Event()
+        self.events: dict[str, Event] = {}
+
+    async def create_events(self, events: list[Event]) -> list[Event]:
+        await self.gate.wait()
+        for event in events:
+            self.events.setdefault(event.id, event)
+        return events
+
+    async def create_event(self, event: Event) -> Event:
+        await self.create_events([event])
+        return event
+
+    async def get_event_by_id(self, event_id: str) -> Optional[Event]:
+        return self.events.get(event_id)
+
+
+def _events(count: int) -> list[Event]:
+    return [Event(action_type="read", decision="approve") for _ in range(count)]
+
+
+class EventWriterTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.db = GatedDatabase()
+        self.writer = EventWriter(
+            self.db,
+            max_queue=5,
+            batch_size=100,
+            flush_interval=0.01,
+            enqueue_timeout=0.05,
+        )
+        await self.writer.start()
+
+    async def asyncTearDown(self):
+        self.db.gate.set()
+        await self.writer.stop()
+
+    async def _back_up(self) -> list[Event]:
+        """A batch stuck in a flush, plus 3 events queued behind it."""
+        flushing, queued = _events(3), _events(3)
+        await self.writer.submit(flushing)
+        await asyncio.sleep(0.03)  # Picked up, now waiting on the gate
+        await self.writer.submit(queued)
+        self.assertEqual(self.writer.stats()["queue_depth"], 3)
+        return flushing + queued
+
+    async def test_batch_with_room_for_only_part_is_not_logged_at_all(self):
+        accepted = await self._back_up()
+        batch = _events(4)  # 2 of these would still have fit
+        with self.assertRaises(EventQueueFull):
+            await self.writer.submit(batch)
+        self.assertEqual(self.writer.stats()["queue_depth"], 3)
+
+        self.db.gate.set()
+        await self.writer.stop()
+        self.assertEqual(set(self.db.events), {event.id for event in accepted})
+
+    async def test_batch_waits_for_room_for_all_of_it(self):
+        accepted = await self._back_up()
+        self.writer._enqueue_timeout = 0
+        submit = asyncio.create_task(self.writer.submit(_events(4)))
+        await asyncio.sleep(0.05)
+        self.assertFalse(submit.done())
+
+        self.db.gate.set()
+        await submit
+        await self.writer.stop()
+        self.assertEqual(len(self.db.events), len(accepted) + 4)
+
+    async def test_batch_larger_than_the_queue_goes_in_when_it_is_empty(self):
+        await self.writer.submit(_events(8))
+        self.db.gate.set()
+        await self.writer.stop()
+        self.assertEqual(len(self.db.events), 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import asyncio
+import tempfile
+import unittest
+
+from app.adapters.log_db import LogDatabase
+from app.domain.event import Event
+
+
+def _event(i: int) -> Event:
+    return Event(action_type="read", resource_id=f"doc-{i}", decision="approve")
+
+
+class LogDatabaseTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.db = LogDatabase(self.dir.name, fsync=False)
+
+    async def asyncTearDown(self):
+        await self.db.close()
+        self.dir.cleanup()
+
+    async def _stored_ids(self) -> list[str]:
+        return [event.id for event in await self.db.get_events(limit=100)]
+
+    async def test_same_event_written_concurrently_is_stored_once(self):
+        event, other = _event(0), _event(1)
+        # The first write is still pending when the others arrive, and the
+        # last one carries an event twice
+        await asyncio.gather(
+            self.db.create_event(event),
+            self.db.create_events([event, other]),
+            self.db.create_events([other, event, other]),
+        )
+        expected = sorted([event.id, other.id])
+        self.assertEqual(sorted(await self._stored_ids()), expected)
+        self.assertEqual((await self.db.get_metrics())["total_actions"], 2)
+
+        await self.db.close()
+        self.db = LogDatabase(self.dir.name, fsync=False)
+        self.assertEqual(sorted(await self._stored_ids()), expected)
+        self.assertEqual((await self.db.get_metrics())["total_actions"], 2)
+
+    async def test_waiter_sees_the_failure_of_the_write_it_waited_for(self):
+        event = _event(0)
+
+        def fail(batch):
+            raise OSError("disk full")
+
+        self.db._write_batch = fail
+        results = await asyncio.gather(
+            self.db.create_event(event),
+            self.db.create_event(event),
+            return_exceptions=True,
+        )
+        self.assertTrue(all(isinstance(result, OSError) for result in results))
+
+        # Nothing of it was stored, so a retry writes it
+        del self.db._write_batch
+        await self.db.create_event(event)
+        self.assertEqual(await self._stored_ids(), [event.id])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+import asyncio
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from app.adapters.log_db import LogDatabase
+from app.adapters.sqlite_db import SQLiteDatabase
+from app.core.breakdowns import MetricBreakdowns
+from app.core.metric_sync import MetricSync
+from app.core.rollups import MetricRollups
+from app.core.sketches import AuditSketches
+from app.domain.event import Event
+from app.models.schemas import BreakdownDimension
+
+
+def _events(count: int) -> list[Event]:
+    return [
+        Event(
+            action_type="read",
+            resource_id=f"doc-{i}",
+            user_id=f"user-{i % 3}",
+            decision="reject" if i % 4 == 0 else "approve",
+        )
+        for i in range(count)
+    ]
+
+
+class Worker:
+    """One process's metrics and their sync, as main.py wires them up."""
+
+    def __init__(self, database, stale_after: float = 60):
+        self.db = database
+        self.rollups = MetricRollups(60, 24, 7)
+        self.breakdowns = MetricBreakdowns(100)
+        self.sketches = AuditSketches(7)
+        self.sync = MetricSync(
+            database,
+            self.rollups,
+            self.breakdowns,
+            self.sketches,
+            interval=60,
+            stale_after=stale_after,
+        )
+
+    async def log(self, events: list[Event]) -> None:
+        await self.db.create_events(events)
+        for metrics in (self.rollups, self.breakdowns, self.sketches):
+            metrics.record(events)
+
+    def timeseries_total(self) -> int:
+        end = datetime.utcnow() + timedelta(minutes=1)
+        points = self.sync.rollups.timeseries(end - timedelta(hours=2), end, 3600)
+        return sum(point["total_actions"] for point in points)
+
+    def breakdown_total(self) -> int:
+        breakdown = self.sync.breakdowns.breakdown(BreakdownDimension.ACTION_TYPE)
+        return sum(item["total_actions"] for item in breakdown["items"])
+
+
+class SharedRestartTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = f"{self.dir.name}/ulucore.db"
+        self.databases = []
+
+    async def asyncTearDown(self):
+        for database in self.databases:
+            await database.close()
+        self.dir.cleanup()
+
+    def _worker(self, stale_after: float = 60) -> Worker:
+        database = SQLiteDatabase(self.path)
+        self.databases.append(database)
+        return Worker(database, stale_after)
+
+    async def _assert_matches_metrics(self, worker: Worker) -> None:
+        total = (await worker.db.get_metrics())["total_actions"]
+        self.assertEqual(worker.timeseries_total(), total)
+        self.assertEqual(worker.breakdown_total(), total)
+
+    async def test_counts_outlast_restarts(self):
+        first = self._worker()
+        await first.sync.start()
+        await first.log(_events(40))
+        await first.sync.stop()
+
+        second = self._worker(stale_after=0.05)
+        await second.sync.start()
+        await self._assert_matches_metrics(second)
+        await second.log(_events(7))
+        await asyncio.sleep(0.1)
+        await second.sync.sync()  # Retires the first worker
+        versions = await second.db.get_metric_snapshot_versions()
+        self.assertNotIn(first.sync.worker, {worker for worker, _ in versions})
+        self.assertIn("retired", {worker for worker, _ in versions})
+        await self._assert_matches_metrics(second)
+        await second.sync.stop()
+
+        third = self._worker()
+        await third.sync.start()
+        await self._assert_matches_metrics(third)
+        self.assertEqual(third.timeseries_total(), 47)
+        await third.sync.stop()
+
+    async def test_worker_retired_while_stalled_is_not_counted_twice(self):
+        stalled = self._worker()
+        await stalled.sync.start()
+        await stalled.log(_events(10))
+        await stalled.sync.sync()
+
+        other = self._worker(stale_after=0.05)
+        await other.sync.start()
+        await asyncio.sleep(0.1)
+        await other.sync.sync()
+        retired_worker = stalled.sync.worker
+
+        # Back from the stall: it can't publish under the retired name
+        await stalled.log(_events(5))
+        await stalled.sync.sync()
+        self.assertNotEqual(stalled.sync.worker, retired_worker)
+        await other.sync.sync()
+        self.assertEqual(other.timeseries_total(), 10)
+        self.assertEqual(stalled.timeseries_total(), 10)
+
+        await stalled.log(_events(3))
+        await stalled.sync.sync()
+        await other.sync.sync()
+        self.assertEqual(other.timeseries_total(), 13)
+        await stalled.sync.stop()
+        await other.sync.stop()
+
+
+class LocalRestartTest(unittest.IsolatedAsyncioTestCase):
+    async def test_log_backend_rebuilds_metrics_from_stored_events(self):
+        with tempfile.TemporaryDirectory() as directory:
+            database = LogDatabase(directory, fsync=False)
+            await database.create_events(_events(2500))
+            await database.close()
+
+            database = LogDatabase(directory, fsync=False)
+            worker = Worker(database)
+            await worker.sync.start()
+            await worker.sync._task
+            await worker.log(_events(3))
+            total = (await database.get_metrics())["total_actions"]
+            self.assertEqual(total, 2503)
+            self.assertEqual(worker.timeseries_total(), total)
+            self.assertEqual(worker.breakdown_total(), total)
+            await worker.sync.stop()
+            await database.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import tempfile
+import unittest
+
+from app.adapters.sqlite_db import SQLiteDatabase
+from app.models.schemas import PolicyCreate
+
+
+def _policy() -> PolicyCreate:
+    return PolicyCreate(
+        name="No deletes",
+        conditions=[{"field": "action_type", "operator": "equals", "value": "delete"}],
+        decision="reject",
+        reason="Deletes need a ticket",
+    )
+
+
+class SQLiteDatabaseTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        path = f"{self.dir.name}/ulucore.db"
+        # Two workers on one database file
+        self.db = SQLiteDatabase(path)
+        self.other = SQLiteDatabase(path)
+
+    async def asyncTearDown(self):
+        await self.db.close()
+        await self.other.close()
+        self.dir.cleanup()
+
+    async def test_policy_generation_is_refreshed_off_the_event_loop(self):
+        before = self.other.policy_generation
+        await self.db.create_policy(_policy())
+        self.assertEqual(self.db.policy_generation, before + 1)
+
+        # Due for a re-read: the cached value comes back at once while the
+        # read runs on a reader thread
+        self.other._generation_checked -= 1
+        self.assertEqual(self.other.policy_generation, before)
+        refresh = self.other._generation_refresh
+        self.assertIsNotNone(refresh)
+        await refresh
+        self.assertEqual(self.other.policy_generation, before + 1)
+        self.assertIs(self.other._generation_refresh, refresh)
+
+    async def test_policy_created_again_under_its_id_replaces_it(self):
+        first = await self.db.create_policy(_policy())
+        data = _policy().model_dump()
+        second = await self.db.create_policy(
+            PolicyCreate(**{**data, "id": first.id, "name": "Replaced"})
+        )
+        self.assertEqual(second.id, first.id)
+        self.assertEqual(
+            [(policy.id, policy.name) for policy in await self.db.get_all_policies()],
+            [(first.id, "Replaced")],
+        )
+
+
+
+if __name__ == "__main__":
+    unittest.main()